@@ -5,12 +5,12 @@ scripts/crawler/analyze_results.py
 分析GameMonetize采集结果
 """
 
-import json
+import json_codec
 
 def analyze_results():
     """分析采集结果"""
     with open('gamemonetize_hot_games_20250615_163401.json', 'r', encoding='utf-8') as f:
-        games = json.load(f)
+        games = json_codec.load(f)
 
     print('🎮 GameMonetize采集结果分析')
     print('=' * 50)
@@ -0,0 +1,355 @@
+# scripts/crawler/async_game_crawler.py - 基于asyncio的游戏详情页高并发采集引擎
+"""
+asyncio游戏详情采集引擎
+使用aiohttp保持数百个详情页请求同时在途(按主机限制并发)，
+复用game_detail_requests中的extract_*解析函数，
+输出与BatchGameExtractorV2相同的批次文件格式
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from batch_game_extractor_v2 import BatchGameExtractorV2
+from game_detail_requests import DEFAULT_HEADERS, parse_game_details, refresh_cached_details
+from rate_limiter import get_rate_limiter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# 可重试的HTTP状态码
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 执行缓存SQLite读写的线程数，这些同步调用不在事件循环中执行
+CACHE_IO_WORKERS = 8
+
+
+def _parse_game_page(html, url, game_info):
+    """在解析进程中执行的解析函数，屏蔽extract_*函数的逐字段打印"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parse_game_details(html, url, game_info)
+
+
+class AsyncGameFetcher:
+    """基于aiohttp的详情页获取器
+
+    通过连接器限制总并发和单主机并发，对429/5xx和超时做指数退避重试
+    """
+
+    def __init__(self, max_in_flight=200, per_host_limit=50, timeout=20, retries=2, cache=None,
+                 io_executor=None):
+        """
+        初始化获取器
+
+        Args:
+            max_in_flight (int): 同时在途的请求上限
+            per_host_limit (int): 单个主机的并发连接上限
+            timeout (int): 单次请求超时时间(秒)
+            retries (int): 失败后的重试次数
+            cache (HttpCache): 条件请求缓存，None时每次完整下载
+            io_executor (Executor): 执行缓存读写的线程池，None时使用事件循环的默认线程池
+        """
+        self.max_in_flight = max_in_flight
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.cache = cache
+        self.io_executor = io_executor
+        self.session = None
+        self.rate_limiter = get_rate_limiter()
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_in_flight,
+            limit_per_host=self.per_host_limit,
+            ttl_dns_cache=300
+        )
+        # aiohttp未安装brotli时无法解码br，只声明gzip/deflate
+        headers = dict(DEFAULT_HEADERS, **{'Accept-Encoding': 'gzip, deflate'})
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    async def _run_io(self, func, *args):
+        """在线程池中执行同步的缓存读写，避免SQLite调用阻塞事件循环"""
+        return await asyncio.get_running_loop().run_in_executor(self.io_executor, func, *args)
+
+    async def fetch(self, url):
+        """
+        获取页面内容
+
+        Args:
+            url (str): 页面URL
+
+        Returns:
+            tuple: (页面原始内容, 是否为304未修改)，重试耗尽后抛出异常
+        """
+        entry = await self._run_io(self.cache.lookup, url) if self.cache else None
+        headers = self.cache.conditional_headers(entry) if entry else None
+        for attempt in range(self.retries + 1):
+            await self.rate_limiter.acquire_async(url)
+            try:
+                async with self.session.get(url, headers=headers) as response:
+                    if response.status == 304 and entry:
+                        html = await self._run_io(self.cache.load_body, url)
+                        if html is not None:
+                            return html, True
+                        # 缓存条目已被淘汰，下一次尝试完整下载
+                        entry = headers = None
+                        continue
+                    if response.status in RETRY_STATUS_CODES and attempt < self.retries:
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    response.raise_for_status()
+                    body = await response.read()
+                    if self.cache:
+                        await self._run_io(self.cache.store, url, body, response.headers.get('ETag'),
+                                           response.headers.get('Last-Modified'))
+                    return body, False
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.retries:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+        # 只有最后一次尝试遇到缓存条目被淘汰时才会到这里，此时缓存中已无条目，重新完整获取
+        return await self.fetch(url)
+
+
+class AsyncBatchGameExtractor(BatchGameExtractorV2):
+    """asyncio批量游戏数据提取器
+
+    复用BatchGameExtractorV2的编号分配、批次文件和进度摘要逻辑，只替换抓取与调度部分
+    """
+
+    def __init__(self, max_in_flight=200, per_host_limit=50, parse_workers=None,
+                 output_dir="../output", rate=50.0, burst=100, use_http_cache=True):
+        """
+        初始化asyncio提取器
+
+        Args:
+            max_in_flight (int): 同时在途的请求上限，默认200
+            per_host_limit (int): 单个主机的并发连接上限，默认50
+            parse_workers (int): HTML解析进程数，默认CPU核数
+            output_dir (str): 输出目录路径
+            rate (float): 每个主机每秒请求数上限，默认50
+            burst (int): 每个主机允许的突发请求数，默认100
+            use_http_cache (bool): 是否使用条件请求缓存，未修改的页面只需304且跳过解析
+        """
+        super().__init__(max_workers=max_in_flight, rate=rate, burst=burst, output_dir=output_dir,
+                         mode="async", use_http_cache=use_http_cache)
+        self.max_in_flight = max_in_flight
+        self.per_host_limit = per_host_limit
+        self.parse_workers = parse_workers or os.cpu_count() or 4
+
+    def batch_extract_with_file_split(self, games_list, start_game_name=None,
+                                      batch_size=300, rest_minutes=0, recrawl=False):
+        """
+        并发提取所有游戏，按批次写入与V2相同格式的文件
+
+        Args:
+            games_list (list): 游戏列表
+            start_game_name (str): 开始游戏名称，None表示从头开始
+            batch_size (int): 每个批次文件的游戏数量
+            rest_minutes (int): 兼容V2参数，asyncio模式不在批次间休息
+            recrawl (bool): 重新采集全部游戏并从批次001开始覆盖批次文件
+        """
+        if aiohttp is None:
+            print("❌ 未安装aiohttp，请先执行: pip install aiohttp")
+            return []
+
+        games_to_process = self.prepare_games_to_process(games_list, start_game_name,
+                                                         skip_processed=not recrawl)
+        if games_to_process is None:
+            return []
+
+        if not games_to_process:
+            print("✅ 所有游戏都已处理完成！")
+            self.save_progress_summary()
+            return []
+
+        print(f"🚀 需要处理 {len(games_to_process)} 个游戏")
+        print(f"📊 配置: 在途请求{self.max_in_flight} | 单主机{self.per_host_limit} | "
+              f"解析进程{self.parse_workers} | 每{batch_size}个游戏一个文件")
+        print("-" * 80)
+
+        # 全量重采时从批次001开始覆盖，保持批次布局与游戏列表顺序一致
+        start_batch_num = 1 if recrawl and not start_game_name else self.get_next_batch_number()
+        asyncio.run(self._run_all(games_to_process, batch_size, start_batch_num))
+        if self.http_cache:
+            self.http_cache.print_report()
+
+        print("\n🎉 全部批次处理完成！")
+        final_summary = self.save_progress_summary()
+        print(f"📊 查看完整摘要: {final_summary}")
+        return True
+
+    async def _run_all(self, games_to_process, batch_size, start_batch_num):
+        """调度所有游戏的抓取与解析，批次完成即写盘
+
+        缓存读写在cache_io线程池中执行；批次写盘(游戏存储事务和导出)在单线程的save_pool中
+        按完成顺序依次执行，都不阻塞事件循环
+        """
+        self.success_count = 0
+        self.error_count = 0
+        self.total_count = len(games_to_process)
+        self.start_time = time.time()
+        self.errors = []
+
+        total_batches = (len(games_to_process) + batch_size - 1) // batch_size
+        batch_results = {batch_idx: [] for batch_idx in range(total_batches)}
+        batch_pending = {
+            batch_idx: min(batch_size, len(games_to_process) - batch_idx * batch_size)
+            for batch_idx in range(total_batches)
+        }
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as parse_pool, \
+                ThreadPoolExecutor(max_workers=CACHE_IO_WORKERS, thread_name_prefix='cache-io') as cache_io, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix='batch-save') as save_pool:
+            async with AsyncGameFetcher(self.max_in_flight, self.per_host_limit, cache=self.http_cache,
+                                        io_executor=cache_io) as fetcher:
+
+                async def process(index, game):
+                    batch_idx = index // batch_size
+                    result = await self._extract_one(fetcher, parse_pool, loop, semaphore,
+                                                     game, index % batch_size + 1, cache_io)
+                    if result:
+                        batch_results[batch_idx].append(result)
+                    batch_pending[batch_idx] -= 1
+                    if batch_pending[batch_idx] == 0:
+                        await loop.run_in_executor(save_pool, self._save_completed_batch, games_to_process,
+                                                   batch_idx, batch_size, start_batch_num,
+                                                   batch_results.pop(batch_idx))
+
+                await asyncio.gather(*(process(i, game) for i, game in enumerate(games_to_process)))
+
+        duration = time.time() - self.start_time
+        rate = self.total_count / (duration / 60) if duration > 0 else 0
+        print(f"📊 全部完成: 成功{self.success_count} | 失败{self.error_count} | "
+              f"耗时{duration/60:.1f}分钟 | 速度{rate:.0f}页/分钟")
+
+    async def _extract_one(self, fetcher, parse_pool, loop, semaphore, game_info, batch_id, cache_io=None):
+        """抓取并解析单个游戏，返回与V2相同结构的结果；缓存读写在cache_io线程池中执行"""
+        global_id = game_info['global_id']
+        try:
+            async with semaphore:
+                html, not_modified = await fetcher.fetch(game_info['url'])
+            result = None
+            if self.http_cache:
+                result = await loop.run_in_executor(cache_io, self._load_cached_result, game_info, not_modified)
+            if result is None:
+                result = await loop.run_in_executor(parse_pool, _parse_game_page,
+                                                    html, game_info['url'], game_info)
+                if self.http_cache:
+                    await loop.run_in_executor(cache_io, self.http_cache.store_parsed, game_info['url'], result)
+            result['game_id'] = {
+                'global_id': global_id,
+                'batch_id': batch_id,
+                'extraction_order': global_id
+            }
+            self.success_count += 1
+            self._print_progress()
+            return result
+        except Exception as e:
+            self.error_count += 1
+            self.errors.append({
+                'game': game_info,
+                'global_id': global_id,
+                'batch_id': batch_id,
+                'error': str(e) or type(e).__name__,
+                'timestamp': datetime.now().isoformat()
+            })
+            print(f"❌ #{global_id:04d} {game_info['name']} 失败: {str(e) or type(e).__name__}")
+            return None
+
+    def _load_cached_result(self, game_info, not_modified):
+        """页面未修改时取出缓存的解析结果，并记录缓存命中情况"""
+        if not self.http_cache:
+            return None
+        result = self.http_cache.load_parsed(game_info['url']) if not_modified else None
+        self.http_cache.record(not_modified, parse_skipped=result is not None)
+        return refresh_cached_details(result, game_info) if result is not None else None
+
+    def _print_progress(self):
+        """每完成100个游戏输出一次进度"""
+        done = self.success_count + self.error_count
+        if done % 100 and done != self.total_count:
+            return
+        elapsed = time.time() - self.start_time
+        rate = done / elapsed if elapsed > 0 else 0
+        remaining = (self.total_count - done) / rate if rate > 0 else 0
+        print(f"✅ 进度: {done}/{self.total_count} ({done / self.total_count * 100:.1f}%) | "
+              f"成功: {self.success_count} | 失败: {self.error_count} | "
+              f"{rate * 60:.0f}页/分钟 | 预计剩余: {remaining/60:.1f}分钟")
+
+    def _save_completed_batch(self, games_to_process, batch_idx, batch_size, start_batch_num, results):
+        """批次内所有游戏完成后按全局编号排序写盘"""
+        batch_games = games_to_process[batch_idx * batch_size:(batch_idx + 1) * batch_size]
+        results.sort(key=lambda r: r['game_id']['global_id'])
+        self.save_batch_results(results, start_batch_num + batch_idx,
+                                batch_games[0]['global_id'], batch_games[-1]['global_id'])
+
+
+def main():
+    """
+    主函数 - 支持命令行参数
+
+    使用方法:
+    python async_game_crawler.py                       # 采集未处理的游戏
+    python async_game_crawler.py --recrawl             # 重新采集全部游戏
+    python async_game_crawler.py --in-flight 300       # 指定在途请求数
+    """
+    parser = argparse.ArgumentParser(description='asyncio游戏详情采集引擎 - 输出V2批次文件格式')
+    parser.add_argument('--start', type=str, help='开始游戏名称，不指定则从头开始')
+    parser.add_argument('--in-flight', type=int, default=200, help='同时在途请求数，默认200')
+    parser.add_argument('--per-host', type=int, default=50, help='单主机并发连接数，默认50')
+    parser.add_argument('--rate', type=float, default=50.0, help='每个主机每秒请求数上限，默认50')
+    parser.add_argument('--burst', type=int, default=100, help='每个主机允许的突发请求数，默认100')
+    parser.add_argument('--parse-workers', type=int, default=None, help='解析进程数，默认CPU核数')
+    parser.add_argument('--batch-size', type=int, default=300, help='每个批次文件的游戏数量，默认300')
+    parser.add_argument('--recrawl', action='store_true', help='重新采集全部游戏并覆盖批次文件')
+    parser.add_argument('--no-http-cache', action='store_true', help='不使用条件请求缓存，每个页面完整下载')
+
+    args = parser.parse_args()
+
+    extractor = AsyncBatchGameExtractor(
+        max_in_flight=args.in_flight,
+        per_host_limit=args.per_host,
+        parse_workers=args.parse_workers,
+        output_dir="../output",
+        rate=args.rate,
+        burst=args.burst,
+        use_http_cache=not args.no_http_cache
+    )
+
+    games_list = extractor.load_games_list("../output/all_games_continuous.json")
+    if not games_list:
+        print("❌ 未找到游戏列表数据")
+        return
+
+    print(f"📋 加载到 {len(games_list)} 个游戏")
+
+    extractor.batch_extract_with_file_split(
+        games_list=games_list,
+        start_game_name=args.start,
+        batch_size=args.batch_size,
+        recrawl=args.recrawl
+    )
+
+
+if __name__ == "__main__":
+    main()
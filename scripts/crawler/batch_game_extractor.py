@@ -1,16 +1,15 @@
 # scripts/crawler/batch_game_extractor.py
 # 多线程批量游戏数据提取器 - 使用6线程并发处理游戏详情页面数据提取
 
-import json
 import os
 import time
-import random
 import threading
 import argparse
 import sys
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from game_detail_extractor import GameDetailExtractor
+import json_codec
 
 class BatchGameExtractor:
     """批量游戏数据提取器
@@ -18,17 +17,15 @@ class BatchGameExtractor:
     使用多线程并发提取游戏详情数据，支持进度监控、错误处理和断点续传
     """
     
-    def __init__(self, max_workers=6, delay_range=(1, 3), output_dir="../output"):
+    def __init__(self, max_workers=6, output_dir="../output"):
         """
         初始化批量提取器
         
         Args:
             max_workers (int): 最大工作线程数，默认6
-            delay_range (tuple): 请求延迟范围(秒)，默认1-3秒
             output_dir (str): 输出目录路径
         """
         self.max_workers = max_workers
-        self.delay_range = delay_range
         self.output_dir = output_dir
         
         # 统计信息
@@ -59,7 +56,7 @@ class BatchGameExtractor:
         """
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                data = json_codec.load(f)
                 return data.get('games', [])
         except Exception as e:
             print(f"❌ 加载游戏列表失败: {e}")
@@ -96,7 +93,7 @@ class BatchGameExtractor:
         
         try:
             with open(main_result_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                data = json_codec.load(f)
                 processed_games = set()
                 existing_results = data.get('games', [])
                 
@@ -121,9 +118,7 @@ class BatchGameExtractor:
             dict or None: 提取结果或None(失败时)
         """
         try:
-            # 随机延迟避免请求过于频繁
-            delay = random.uniform(*self.delay_range)
-            time.sleep(delay)
+            # 限速由GameDetailExtractor导航前的共享令牌桶负责，预算耗尽时才等待
             
             # 创建提取器实例(无头模式)
             extractor = GameDetailExtractor(headless=True)
@@ -187,7 +182,7 @@ class BatchGameExtractor:
         }
         
         with open(result_file_path, 'w', encoding='utf-8') as f:
-            json.dump(result_data, f, ensure_ascii=False, indent=2)
+            json_codec.dump(result_data, f)
         
         print(f"💾 结果已保存到: {result_file_path}")
     
@@ -307,7 +302,6 @@ def main():
     # 创建提取器实例
     extractor = BatchGameExtractor(
         max_workers=args.workers,
-        delay_range=(1, 3),
         output_dir="../output"
     )
     
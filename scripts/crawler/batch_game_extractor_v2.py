@@ -1,16 +1,21 @@
 # scripts/crawler/batch_game_extractor_v2.py
 # 改进版多线程批量游戏数据提取器 - 使用10线程并发，分文件保存，支持游戏编号系统
 
-import json
 import os
 import time
-import random
 import threading
 import argparse
 import sys
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrency_controller import AdaptiveConcurrencyController, classify_exception, classify_result
+from driver_pool import DriverPool
+from game_store import GameStore, DEFAULT_STORE_FILENAME, batch_filename, parse_batch_number
 from game_detail_extractor import GameDetailExtractor
+from http_cache import get_http_cache
+from hybrid_game_extractor import HybridGameDetailExtractor
+from rate_limiter import configure_rate_limiter
+import json_codec
 
 class BatchGameExtractorV2:
     """改进版批量游戏数据提取器
@@ -18,18 +23,49 @@ class BatchGameExtractorV2:
     使用10线程并发提取游戏详情数据，按300个游戏分文件保存，支持游戏编号系统、进度监控、错误处理和断点续传
     """
     
-    def __init__(self, max_workers=10, delay_range=(1, 3), output_dir="../output"):
+    def __init__(self, max_workers=10, rate=5.0, burst=10, output_dir="../output",
+                 max_pages_per_driver=100, max_rss_mb=1024, mode="hybrid",
+                 initial_workers=None, target_p95=10.0, use_http_cache=True, tabs=1):
         """
         初始化批量提取器
         
         Args:
-            max_workers (int): 最大工作线程数，默认10
-            delay_range (tuple): 请求延迟范围(秒)，默认1-3秒
+            max_workers (int): 最大工作线程数(自适应并发的上限)，默认10
+            rate (float): 每个主机每秒请求数上限(本机所有线程和进程共享)，默认5
+            burst (int): 每个主机允许的突发请求数，默认10
             output_dir (str): 输出目录路径
+            max_pages_per_driver (int): 单个浏览器处理多少页面后回收，默认100
+            max_rss_mb (int): 单个浏览器内存上限(MB)，超过后回收，默认1024
+            mode (str): 提取模式，hybrid为HTTP优先按需回退浏览器，selenium为纯浏览器
+            initial_workers (int): 自适应并发的初始值，默认为max_workers的一半
+            target_p95 (float): 页面p95耗时目标(秒)，超过后降低并发，默认10
+            use_http_cache (bool): 是否使用条件请求缓存，未修改的页面只需304且跳过解析
+            tabs (int): selenium模式下每个浏览器同时加载的标签页数，1表示逐页处理
         """
         self.max_workers = max_workers
-        self.delay_range = delay_range
+        self.tabs = tabs
+        
+        # AIMD自适应并发：延迟和错误率健康时逐步加并发，超时/429/5xx时成倍回退
+        self.concurrency = AdaptiveConcurrencyController(
+            initial_limit=initial_workers or max(1, max_workers // 2),
+            max_limit=max_workers,
+            target_p95=target_p95
+        )
+        self.rate_limit = {"rate": rate, "burst": burst}
+        
+        # 所有页面请求都经过共享令牌桶限速，不再随机休眠
+        self.rate_limiter = configure_rate_limiter(rate=rate, burst=burst)
         self.output_dir = output_dir
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_rss_mb = max_rss_mb
+        self.mode = mode
+        
+        # 浏览器池，在批量提取开始时创建，结束或中断时关闭
+        self.driver_pool = None
+        # 混合模式提取器，仅mode为hybrid时使用
+        self.hybrid_extractor = None
+        # 条件请求缓存，重新采集时未修改的页面复用上次结果
+        self.http_cache = get_http_cache() if use_http_cache else None
         
         # 统计信息
         self.success_count = 0
@@ -54,6 +90,18 @@ class BatchGameExtractorV2:
         # 创建批次文件目录
         self.batch_dir = os.path.join(output_dir, "batches")
         os.makedirs(self.batch_dir, exist_ok=True)
+        
+        # 提取结果存储，批次文件由存储导出
+        self.game_store = GameStore(os.path.join(output_dir, DEFAULT_STORE_FILENAME))
+        self._migrate_batch_files()
+    
+    def _migrate_batch_files(self):
+        """首次使用存储时导入已有的批次文件"""
+        if not self.game_store.is_empty() or not self.get_existing_batch_files():
+            return
+        print("📦 首次使用游戏存储，导入已有批次文件...")
+        imported = self.game_store.import_batch_files(self.batch_dir)
+        print(f"📦 已导入 {imported} 个游戏到 {DEFAULT_STORE_FILENAME}")
     
     def load_games_list(self, file_path):
         """
@@ -67,7 +115,7 @@ class BatchGameExtractorV2:
         """
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                data = json_codec.load(f)
                 return data.get('games', [])
         except Exception as e:
             print(f"❌ 加载游戏列表失败: {e}")
@@ -86,7 +134,7 @@ class BatchGameExtractorV2:
         
         try:
             with open(summary_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                data = json_codec.load(f)
                 game_ids = data.get('game_id_mapping', {})
                 next_id = data.get('metadata', {}).get('next_global_id', 1)
                 return next_id, game_ids
@@ -125,39 +173,20 @@ class BatchGameExtractorV2:
             return batch_files
             
         for filename in os.listdir(self.batch_dir):
-            if filename.startswith('games_batch_') and filename.endswith('.json'):
-                try:
-                    # 提取批次号：games_batch_001.json -> 1
-                    batch_num = int(filename.split('_')[2].split('.')[0])
-                    batch_files[batch_num] = os.path.join(self.batch_dir, filename)
-                except (ValueError, IndexError):
-                    continue
+            batch_num = parse_batch_number(filename)
+            if batch_num is not None:
+                batch_files[batch_num] = os.path.join(self.batch_dir, filename)
                     
         return batch_files
     
     def load_processed_games_from_batches(self):
         """
-        从所有批次文件中加载已处理的游戏名称
+        从游戏存储中加载已处理的游戏名称(按名称索引查询，不再逐个解析批次文件)
         
         Returns:
             set: 已处理游戏名称集合
         """
-        processed_games = set()
-        batch_files = self.get_existing_batch_files()
-        
-        for batch_num, file_path in batch_files.items():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    games = data.get('games', [])
-                    for game in games:
-                        if 'basic_info' in game and 'name' in game['basic_info']:
-                            processed_games.add(game['basic_info']['name'])
-                print(f"📁 批次{batch_num:03d}: 加载{len(games)}个游戏")
-            except Exception as e:
-                print(f"⚠️ 加载批次文件{file_path}失败: {e}")
-                
-        return processed_games
+        return self.game_store.processed_names()
     
     def find_game_index_by_name(self, games_list, game_name):
         """
@@ -188,133 +217,205 @@ class BatchGameExtractorV2:
         Returns:
             dict or None: 提取结果或None(失败时)
         """
-        try:
-            # 随机延迟避免请求过于频繁
-            delay = random.uniform(*self.delay_range)
-            time.sleep(delay)
-            
-            # 创建提取器实例(无头模式)
-            extractor = GameDetailExtractor(headless=True)
-            
-            # 提取游戏详情
-            result = extractor.extract_game_details(game_info['url'], game_info)
-            
-            # 添加编号信息到结果中
-            if result:
-                result['game_id'] = {
-                    'global_id': global_id,
-                    'batch_id': batch_id,
-                    'extraction_order': global_id  # 提取顺序就是全局编号
-                }
+        # 占用一个自适应并发名额，当前上限已满时在此等待
+        with self.concurrency.slot():
+            return self._extract_with_signals(game_info, thread_id, global_id, batch_id)
+    
+    def _extract_with_signals(self, game_info, thread_id, global_id, batch_id):
+        """
+        提取单个游戏并把耗时和错误信号反馈给自适应并发控制器
+        
+        Args:
+            game_info (dict): 游戏基本信息
+            thread_id (int): 线程ID
+            global_id (int): 全局游戏编号
+            batch_id (int): 批次内编号
             
-            # 更新统计信息
-            with self.lock:
-                self.success_count += 1
-                progress = (self.success_count + self.error_count) / self.total_count * 100
-                elapsed = time.time() - self.start_time
-                avg_time = elapsed / (self.success_count + self.error_count)
-                remaining = (self.total_count - self.success_count - self.error_count) * avg_time
-                
-                print(f"✅ [线程{thread_id}] #{global_id:04d} {game_info['name']} | "
-                      f"进度: {self.success_count + self.error_count}/{self.total_count} ({progress:.1f}%) | "
-                      f"成功: {self.success_count} | 失败: {self.error_count} | "
-                      f"预计剩余: {remaining/60:.1f}分钟")
+        Returns:
+            dict or None: 提取结果或None(失败时)
+        """
+        page_start = time.time()
+        wait_start = self.rate_limiter.thread_wait_seconds()
+        try:
+            # 限速由HTTP获取和浏览器导航处的共享令牌桶负责，预算耗尽时才等待
+            if self.hybrid_extractor:
+                # HTTP优先，缺失必需字段时才借用浏览器
+                result = self.hybrid_extractor.extract_game_details(game_info['url'], game_info)
+                signal = self.hybrid_extractor.get_last_signal()
+            else:
+                # 从浏览器池借用常驻浏览器(无头模式)
+                with self.driver_pool.driver() as extractor:
+                    # 提取游戏详情
+                    result = extractor.extract_game_details(game_info['url'], game_info)
+                signal = classify_result(result)
             
-            return result
+            # 页面耗时扣除限速排队时间，只反映源站的响应情况
+            self.concurrency.record(self._page_latency(page_start, wait_start), signal)
+            return self._record_success(result, game_info, thread_id, global_id, batch_id)
             
         except Exception as e:
-            # 记录错误
-            error_info = {
-                'game': game_info,
+            self.concurrency.record(self._page_latency(page_start, wait_start), classify_exception(e))
+            self._record_error(game_info, thread_id, global_id, batch_id, str(e))
+            return None
+    
+    def extract_game_chunk(self, chunk, thread_id):
+        """
+        多标签页模式：借用一个浏览器，同时加载一组游戏页面，哪个先就绪先提取哪个
+        
+        Args:
+            chunk (list): [(game_info, batch_id)]，数量一般等于标签页数
+            thread_id (int): 线程ID
+            
+        Returns:
+            list: 成功的提取结果
+        """
+        results = []
+        done = set()
+        batch_ids = {id(game_info): batch_id for game_info, batch_id in chunk}
+        
+        with self.concurrency.slot():
+            extractor = None
+            try:
+                # 浏览器启动失败时与单个游戏模式一样按游戏记录失败，不中断整个批次
+                extractor = self.driver_pool.acquire()
+                games = [(game_info['url'], game_info) for game_info, _ in chunk]
+                for game_info, result, seconds in extractor.extract_many(games):
+                    done.add(id(game_info))
+                    # 流水线计时从导航开始，不含限速排队时间
+                    self.concurrency.record(seconds, classify_result(result))
+                    result = self._record_success(result, game_info, thread_id,
+                                                  game_info['global_id'], batch_ids[id(game_info)])
+                    if result:
+                        results.append(result)
+            except Exception as e:
+                self.concurrency.record(0.0, classify_exception(e))
+                for game_info, batch_id in chunk:
+                    if id(game_info) not in done:
+                        self._record_error(game_info, thread_id, game_info['global_id'], batch_id, str(e))
+            finally:
+                if extractor is not None:
+                    self.driver_pool.release(extractor, pages=len(done))
+        
+        return results
+    
+    def _record_success(self, result, game_info, thread_id, global_id, batch_id):
+        """
+        为提取结果添加编号信息，更新统计并输出进度
+        
+        Returns:
+            dict or None: 添加编号后的提取结果
+        """
+        # 添加编号信息到结果中
+        if result:
+            result['game_id'] = {
                 'global_id': global_id,
                 'batch_id': batch_id,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat(),
-                'thread_id': thread_id
+                'extraction_order': global_id  # 提取顺序就是全局编号
             }
+        
+        # 更新统计信息
+        with self.lock:
+            self.success_count += 1
+            progress = (self.success_count + self.error_count) / self.total_count * 100
+            elapsed = time.time() - self.start_time
+            avg_time = elapsed / (self.success_count + self.error_count)
+            remaining = (self.total_count - self.success_count - self.error_count) * avg_time
             
-            with self.lock:
-                self.error_count += 1
-                self.errors.append(error_info)
-                progress = (self.success_count + self.error_count) / self.total_count * 100
-                print(f"❌ [线程{thread_id}] #{global_id:04d} {game_info['name']} 失败: {str(e)} | "
-                      f"进度: {self.success_count + self.error_count}/{self.total_count} ({progress:.1f}%)")
-            
-            return None
+            print(f"✅ [线程{thread_id}] #{global_id:04d} {game_info['name']} | "
+                  f"进度: {self.success_count + self.error_count}/{self.total_count} ({progress:.1f}%) | "
+                  f"成功: {self.success_count} | 失败: {self.error_count} | "
+                  f"并发: {self.concurrency.limit}/{self.max_workers} | "
+                  f"预计剩余: {remaining/60:.1f}分钟")
+        
+        return result
+    
+    def _record_error(self, game_info, thread_id, global_id, batch_id, error):
+        """记录提取失败的游戏并输出进度"""
+        error_info = {
+            'game': game_info,
+            'global_id': global_id,
+            'batch_id': batch_id,
+            'error': error,
+            'timestamp': datetime.now().isoformat(),
+            'thread_id': thread_id
+        }
+        
+        with self.lock:
+            self.error_count += 1
+            self.errors.append(error_info)
+            progress = (self.success_count + self.error_count) / self.total_count * 100
+            print(f"❌ [线程{thread_id}] #{global_id:04d} {game_info['name']} 失败: {error} | "
+                  f"进度: {self.success_count + self.error_count}/{self.total_count} ({progress:.1f}%) | "
+                  f"并发: {self.concurrency.limit}/{self.max_workers}")
+    
+    def _page_latency(self, page_start, wait_start):
+        """计算页面耗时(秒)，扣除当前线程在限速器上的排队时间"""
+        waited = self.rate_limiter.thread_wait_seconds() - wait_start
+        return max(0.0, time.time() - page_start - waited)
     
-    def save_batch_results(self, batch_results, batch_number, batch_start_id, batch_end_id):
+    def save_batch_results(self, batch_results, batch_number, batch_start_id, batch_end_id,
+                           performance=None):
         """
-        保存单个批次的结果到独立文件
+        保存单个批次的结果到游戏存储，并导出为独立的批次文件
         
         Args:
             batch_results (list): 批次结果列表
             batch_number (int): 批次编号
             batch_start_id (int): 批次起始游戏编号
             batch_end_id (int): 批次结束游戏编号
+            performance (dict): 批次性能统计(页面/分钟、Chrome峰值内存等)
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"games_batch_{batch_number:03d}.json"
-        file_path = os.path.join(self.batch_dir, filename)
-        
-        batch_data = {
-            "metadata": {
-                "batch_number": batch_number,
-                "total_games": len(batch_results),
-                "success_count": len([r for r in batch_results if r.get('success', False)]),
-                "created_at": timestamp,
-                "game_id_range": {
-                    "start_id": batch_start_id,
-                    "end_id": batch_end_id
-                },
-                "extraction_info": {
-                    "thread_count": self.max_workers,
-                    "delay_range": self.delay_range
-                }
+        metadata = {
+            "batch_number": batch_number,
+            "total_games": len(batch_results),
+            "success_count": len([r for r in batch_results if r.get('success', False)]),
+            "created_at": timestamp,
+            "game_id_range": {
+                "start_id": batch_start_id,
+                "end_id": batch_end_id
             },
-            "games": batch_results
+            "extraction_info": {
+                "thread_count": self.max_workers,
+                "rate_limit": self.rate_limit,
+                "performance": performance or {}
+            }
         }
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(batch_data, f, ensure_ascii=False, indent=2)
+        self.game_store.save_batch(batch_number, batch_results, metadata)
+        # 按清单中的内容哈希只导出有变化的批次(本批次，以及游戏被重新提取后移走的原批次)
+        self.game_store.export_batches(self.batch_dir)
+        file_path = os.path.join(self.batch_dir, batch_filename(batch_number))
         
-        print(f"💾 批次{batch_number:03d}已保存到: {filename} (游戏编号: {batch_start_id}-{batch_end_id})")
+        print(f"💾 批次{batch_number:03d}已保存到: {os.path.basename(file_path)} (游戏编号: {batch_start_id}-{batch_end_id})")
         return file_path
     
     def save_progress_summary(self):
         """
         保存整体进度摘要文件，包含游戏编号映射
         """
-        batch_files = self.get_existing_batch_files()
         total_games = 0
         total_success = 0
         
+        # 批次统计直接读取存储中的批次清单，不再逐个读取批次文件
         batch_info = []
-        for batch_num in sorted(batch_files.keys()):
-            try:
-                with open(batch_files[batch_num], 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    metadata = data.get('metadata', {})
-                    games_count = metadata.get('total_games', 0)
-                    success_count = metadata.get('success_count', 0)
-                    id_range = metadata.get('game_id_range', {})
-                    
-                    batch_info.append({
-                        'batch_number': batch_num,
-                        'total_games': games_count,
-                        'success_count': success_count,
-                        'game_id_range': id_range,
-                        'file_path': batch_files[batch_num],
-                        'created_at': metadata.get('created_at', '')
-                    })
-                    
-                    total_games += games_count
-                    total_success += success_count
-            except Exception as e:
-                print(f"⚠️ 读取批次{batch_num}摘要失败: {e}")
+        batch_summaries = self.game_store.batch_summaries()
+        for batch_num, metadata, games_count, success_count in batch_summaries:
+            batch_info.append({
+                'batch_number': batch_num,
+                'total_games': games_count,
+                'success_count': success_count,
+                'game_id_range': metadata.get('game_id_range', {}),
+                'file_path': os.path.join(self.batch_dir, batch_filename(batch_num)),
+                'created_at': metadata.get('created_at', '')
+            })
+            
+            total_games += games_count
+            total_success += success_count
         
         summary = {
             "metadata": {
-                "total_batches": len(batch_files),
+                "total_batches": len(batch_summaries),
                 "total_games": total_games,
                 "total_success": total_success,
                 "next_global_id": self.next_global_id,
@@ -322,7 +423,7 @@ class BatchGameExtractorV2:
                 "extraction_config": {
                     "max_workers": self.max_workers,
                     "batch_size": 300,
-                    "delay_range": self.delay_range
+                    "rate_limit": self.rate_limit
                 }
             },
             "game_id_mapping": self.game_id_mapping,
@@ -331,27 +432,28 @@ class BatchGameExtractorV2:
         
         summary_path = os.path.join(self.output_dir, "extraction_summary.json")
         with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
+            json_codec.dump(summary, f, pretty=True)
         
         print(f"📊 进度摘要已保存到: extraction_summary.json (包含{len(self.game_id_mapping)}个游戏编号)")
         return summary_path
     
-    def batch_extract_with_file_split(self, games_list, start_game_name=None, 
-                                     batch_size=300, rest_minutes=1):
+    def prepare_games_to_process(self, games_list, start_game_name=None, skip_processed=True):
         """
-        支持分文件保存和游戏编号的批量提取
+        分配游戏编号并筛选出需要处理的游戏
         
         Args:
             games_list (list): 游戏列表
             start_game_name (str): 开始游戏名称，None表示从头开始
-            batch_size (int): 每批处理的游戏数量
-            rest_minutes (int): 每批之间的休息时间(分钟)
+            skip_processed (bool): 是否跳过批次文件中已处理的游戏
+            
+        Returns:
+            list or None: 带global_id的待处理游戏列表，未找到开始游戏时返回None
         """
         # 为所有游戏分配编号
         self.assign_game_ids(games_list)
         
         # 加载已处理的游戏
-        processed_games = self.load_processed_games_from_batches()
+        processed_games = self.load_processed_games_from_batches() if skip_processed else set()
         print(f"📋 已处理游戏数量: {len(processed_games)}")
         
         # 确定开始位置
@@ -360,7 +462,7 @@ class BatchGameExtractorV2:
             start_index = self.find_game_index_by_name(games_list, start_game_name)
             if start_index == -1:
                 print(f"❌ 未找到游戏: {start_game_name}")
-                return []
+                return None
             print(f"🎯 从游戏 '{start_game_name}' 开始 (索引: {start_index})")
         
         # 过滤掉已处理的游戏，但保留编号信息
@@ -376,18 +478,82 @@ class BatchGameExtractorV2:
             else:
                 print(f"⏭️ 跳过已处理游戏: #{self.game_id_mapping.get(game_name, 0):04d} {game_name}")
         
+        return games_to_process
+    
+    def get_next_batch_number(self):
+        """
+        计算下一个批次号
+        
+        Returns:
+            int: 已有最大批次号+1，没有批次时为1
+        """
+        return self.game_store.next_batch_number()
+    
+    def batch_extract_with_file_split(self, games_list, start_game_name=None, 
+                                     batch_size=300, rest_minutes=1):
+        """
+        支持分文件保存和游戏编号的批量提取
+        
+        Args:
+            games_list (list): 游戏列表
+            start_game_name (str): 开始游戏名称，None表示从头开始
+            batch_size (int): 每批处理的游戏数量
+            rest_minutes (int): 每批之间的休息时间(分钟)
+        """
+        games_to_process = self.prepare_games_to_process(games_list, start_game_name)
+        if games_to_process is None:
+            return []
+        
         if not games_to_process:
             print("✅ 所有游戏都已处理完成！")
             self.save_progress_summary()
             return []
         
         print(f"🚀 需要处理 {len(games_to_process)} 个新游戏")
-        print(f"📊 配置: {self.max_workers} 线程, 每{batch_size}个游戏一个文件, 休息{rest_minutes}分钟")
+        print(f"📊 配置: 最多{self.max_workers}线程(初始并发{self.concurrency.limit}), 每{batch_size}个游戏一个文件, 休息{rest_minutes}分钟")
+        print(f"🧭 提取模式: {self.mode} | 浏览器池: 每个浏览器最多{self.max_pages_per_driver}页, 内存上限{self.max_rss_mb}MB")
         print("-" * 80)
         
+        # 每个工作线程最多一个常驻浏览器，整个运行期间复用；混合模式下按需创建
+        self.driver_pool = DriverPool(
+            max_size=self.max_workers,
+            max_pages_per_driver=self.max_pages_per_driver,
+            max_rss_mb=self.max_rss_mb,
+            headless=True,
+            factory=(lambda: GameDetailExtractor(headless=True, tabs=self.tabs)) if self.tabs > 1 else None
+        )
+        if self.mode == "hybrid":
+            self.hybrid_extractor = HybridGameDetailExtractor(self.driver_pool, cache=self.http_cache)
+        
+        try:
+            self._run_batches(games_to_process, batch_size, rest_minutes)
+        finally:
+            pool_stats = self.driver_pool.get_stats()
+            self.driver_pool.close_all()
+            print(f"🧭 浏览器池统计: 启动{pool_stats['drivers_started']}个 | 回收{pool_stats['drivers_recycled']}次 | "
+                  f"健康检查失败{pool_stats['health_check_failures']}次 | 处理{pool_stats['pages_processed']}页")
+            if self.hybrid_extractor:
+                self.hybrid_extractor.print_fallback_report()
+                if self.http_cache:
+                    self.http_cache.print_report()
+        
+        print("\n🎉 全部批次处理完成！")
+        final_summary = self.save_progress_summary()
+        print(f"📊 查看完整摘要: {final_summary}")
+        
+        return True
+    
+    def _run_batches(self, games_to_process, batch_size, rest_minutes):
+        """
+        按批次提取游戏并保存批次文件
+        
+        Args:
+            games_to_process (list): 待处理游戏列表(已包含global_id)
+            batch_size (int): 每批处理的游戏数量
+            rest_minutes (int): 每批之间的休息时间(分钟)
+        """
         # 计算起始批次号
-        existing_batches = self.get_existing_batch_files()
-        start_batch_num = max(existing_batches.keys()) + 1 if existing_batches else 1
+        start_batch_num = self.get_next_batch_number()
         
         # 分批处理
         total_batches = (len(games_to_process) + batch_size - 1) // batch_size
@@ -416,24 +582,59 @@ class BatchGameExtractorV2:
             batch_results = []
             with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 future_to_game = {}
-                for i, game in enumerate(current_batch):
-                    global_id = game['global_id']
-                    batch_id = i + 1  # 批次内编号从1开始
-                    future = executor.submit(self.extract_single_game, game, i % self.max_workers + 1, global_id, batch_id)
-                    future_to_game[future] = game
+                if self.tabs > 1 and not self.hybrid_extractor:
+                    # 多标签页模式：每个任务借用一个浏览器，同时加载tabs个页面
+                    for chunk_idx, start in enumerate(range(0, len(current_batch), self.tabs)):
+                        chunk = [(game, start + offset + 1)  # 批次内编号从1开始
+                                 for offset, game in enumerate(current_batch[start:start + self.tabs])]
+                        future = executor.submit(self.extract_game_chunk, chunk, chunk_idx % self.max_workers + 1)
+                        future_to_game[future] = chunk
+                else:
+                    for i, game in enumerate(current_batch):
+                        global_id = game['global_id']
+                        batch_id = i + 1  # 批次内编号从1开始
+                        future = executor.submit(self.extract_single_game, game, i % self.max_workers + 1, global_id, batch_id)
+                        future_to_game[future] = game
                 
-                # 收集结果
-                for future in as_completed(future_to_game):
-                    result = future.result()
-                    if result:
-                        batch_results.append(result)
+                # 收集结果，中断时取消排队任务，由外层关闭浏览器池
+                try:
+                    for future in as_completed(future_to_game):
+                        result = future.result()
+                        if isinstance(result, list):
+                            batch_results.extend(result)
+                        elif result:
+                            batch_results.append(result)
+                except KeyboardInterrupt:
+                    print("\n⚠️ 用户中断，取消剩余任务并关闭浏览器...")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
             
             # 输出批次统计
             duration = time.time() - self.start_time
-            print(f"📊 批次{current_batch_num:03d}完成: 成功{self.success_count} | 失败{self.error_count} | 耗时{duration/60:.1f}分钟")
+            pool_stats = self.driver_pool.get_stats()
+            batch_pages = self.success_count + self.error_count
+            pages_per_minute = batch_pages / (duration / 60) if duration > 0 else 0
+            peak_rss = pool_stats['peak_chrome_rss_mb']
+            peak_rss_text = f"{peak_rss:.0f}MB" if peak_rss is not None else "N/A(需安装psutil)"
+            concurrency_stats = self.concurrency.get_stats()
+            print(f"📊 批次{current_batch_num:03d}完成: 成功{self.success_count} | 失败{self.error_count} | 耗时{duration/60:.1f}分钟 | "
+                  f"速度{pages_per_minute:.1f}页/分钟 | Chrome峰值内存{peak_rss_text} | "
+                  f"当前并发{concurrency_stats['limit']}(增{concurrency_stats['increases']}次/降{concurrency_stats['decreases']}次)")
+            
+            performance = {
+                "duration_seconds": round(duration, 1),
+                "pages": batch_pages,
+                "pages_per_minute": round(pages_per_minute, 2),
+                "peak_chrome_rss_mb": peak_rss,
+                "drivers_started": pool_stats['drivers_started'],
+                "drivers_recycled": pool_stats['drivers_recycled'],
+                "concurrency": concurrency_stats
+            }
+            if self.hybrid_extractor:
+                performance['fallback'] = self.hybrid_extractor.get_fallback_report()
             
             # 保存当前批次到独立文件
-            self.save_batch_results(batch_results, current_batch_num, batch_start_id, batch_end_id)
+            self.save_batch_results(batch_results, current_batch_num, batch_start_id, batch_end_id, performance)
             
             # 更新进度摘要
             self.save_progress_summary()
@@ -442,12 +643,6 @@ class BatchGameExtractorV2:
             if batch_idx < total_batches - 1:
                 print(f"😴 休息 {rest_minutes} 分钟...")
                 time.sleep(rest_minutes * 60)
-        
-        print("\n🎉 全部批次处理完成！")
-        final_summary = self.save_progress_summary()
-        print(f"📊 查看完整摘要: {final_summary}")
-        
-        return True
 
 def main():
     """
@@ -456,23 +651,51 @@ def main():
     使用方法:
     python batch_game_extractor_v2.py                    # 从头开始
     python batch_game_extractor_v2.py --start "游戏名称"  # 从指定游戏开始
-    python batch_game_extractor_v2.py --workers 10       # 指定线程数
+    python batch_game_extractor_v2.py --workers 10       # 指定最大线程数(并发自适应调整)
+    python batch_game_extractor_v2.py --mode selenium    # 纯浏览器模式
+    python batch_game_extractor_v2.py --mode selenium --tabs 4  # 每个浏览器同时加载4个标签页
+    python batch_game_extractor_v2.py --export-batches   # 从游戏存储重新导出全部批次文件
     """
     parser = argparse.ArgumentParser(description='改进版批量游戏数据提取器 - 支持游戏编号系统')
     parser.add_argument('--start', type=str, help='开始游戏名称，不指定则从头开始')
-    parser.add_argument('--workers', type=int, default=10, help='线程数，默认10')
+    parser.add_argument('--workers', type=int, default=10, help='最大线程数(自适应并发上限)，默认10')
+    parser.add_argument('--initial-workers', type=int, default=None, help='初始并发数，默认为最大线程数的一半')
+    parser.add_argument('--target-p95', type=float, default=10.0, help='页面p95耗时目标(秒)，超过后降低并发，默认10')
     parser.add_argument('--batch-size', type=int, default=300, help='每批处理游戏数量，默认300')
     parser.add_argument('--rest-minutes', type=int, default=1, help='每批之间休息时间(分钟)，默认1')
+    parser.add_argument('--max-pages-per-driver', type=int, default=100, help='单个浏览器处理多少页面后回收，默认100')
+    parser.add_argument('--max-rss-mb', type=int, default=1024, help='单个浏览器内存上限(MB)，超过后回收，默认1024')
+    parser.add_argument('--rate', type=float, default=5.0, help='每个主机每秒请求数上限，默认5')
+    parser.add_argument('--burst', type=int, default=10, help='每个主机允许的突发请求数，默认10')
+    parser.add_argument('--mode', choices=['hybrid', 'selenium'], default='hybrid',
+                        help='提取模式: hybrid为HTTP优先按需回退浏览器(默认)，selenium为纯浏览器')
+    parser.add_argument('--no-http-cache', action='store_true', help='不使用条件请求缓存，每个页面完整下载')
+    parser.add_argument('--tabs', type=int, default=1, help='selenium模式下每个浏览器同时加载的标签页数，默认1')
+    parser.add_argument('--export-batches', action='store_true', help='从游戏存储重新导出全部批次文件后退出')
     
     args = parser.parse_args()
     
     # 创建提取器实例
     extractor = BatchGameExtractorV2(
         max_workers=args.workers,
-        delay_range=(1, 3),
-        output_dir="../output"
+        rate=args.rate,
+        burst=args.burst,
+        output_dir="../output",
+        max_pages_per_driver=args.max_pages_per_driver,
+        max_rss_mb=args.max_rss_mb,
+        mode=args.mode,
+        initial_workers=args.initial_workers,
+        target_p95=args.target_p95,
+        use_http_cache=not args.no_http_cache,
+        tabs=args.tabs
     )
     
+    if args.export_batches:
+        exported = extractor.game_store.export_batches(extractor.batch_dir, only_changed=False)
+        extractor.save_progress_summary()
+        print(f"💾 已从游戏存储导出 {len(exported)} 个批次文件到: {extractor.batch_dir}")
+        return
+    
     # 加载游戏列表
     games_list = extractor.load_games_list("../output/all_games_continuous.json")
     
@@ -0,0 +1,129 @@
+# scripts/crawler/bench_json_codec.py - JSON编解码微基准
+"""
+JSON编解码微基准
+用10000个结构与批次文件一致的模拟游戏数据，比较标准库json(原来的indent=2写法)与json_codec各后端
+编码、写文件和读文件的耗时
+
+使用方法:
+    python bench_json_codec.py                  # 默认10000个游戏，每项取3次中的最快值
+    python bench_json_codec.py --games 30000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import json_codec
+
+
+def make_corpus(count):
+    """
+    生成模拟游戏数据，字段结构与批次文件中的提取结果一致
+
+    Args:
+        count (int): 游戏数量
+
+    Returns:
+        dict: {"metadata": ..., "games": [...]}
+    """
+    games = []
+    for i in range(count):
+        slug = f"game-{i}"
+        games.append({
+            "basic_info": {"name": f"Game {i} 游戏", "url": f"https://html5.gamedistribution.com/{slug}/",
+                           "company": "Studio", "collected_at": "2024-05-01T12:00:00"},
+            "extraction_time": "2024-05-01T12:00:00",
+            "url": f"https://html5.gamedistribution.com/{slug}/",
+            "game_info": {"title": f"Game {i}", "publisher": f"Publisher {i % 50}",
+                          "mobile_compatible": "Yes", "rating": 4.5, "plays": i * 37},
+            "genres": ["Action", "Arcade"],
+            "tags": ["html5", "mobile", "shooter", "2d", "free"],
+            "thumbnails": [{"url": f"https://img.gamedistribution.com/{slug}-{size}.jpg", "size": size}
+                           for size in ("512x384", "200x120", "1280x720")],
+            "iframe_code": {"src": f"https://html5.gamedistribution.com/{slug}/", "width": "800", "height": "600"},
+            "description": "A fast paced arcade game. " * 8,
+            "instructions": "Use arrow keys to move and space to shoot.",
+            "success": True,
+            "game_id": {"global_id": i + 1, "batch_id": i % 300 + 1, "extraction_order": i + 1}
+        })
+    return {"metadata": {"batch_number": 1, "total_games": count}, "games": games}
+
+
+def _best(func, repeat):
+    """运行repeat次取最快耗时(秒)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(count=10000, repeat=3):
+    """
+    运行基准
+
+    Returns:
+        dict: {名称: {'dumps', 'write', 'read', 'size_mb'}}，耗时单位秒
+    """
+    corpus = make_corpus(count)
+    path = os.path.join(tempfile.mkdtemp(), 'bench.json')
+    results = {}
+
+    def stdlib_write():
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(corpus, f, ensure_ascii=False, indent=2)
+
+    def stdlib_read():
+        with open(path, 'r', encoding='utf-8') as f:
+            json.load(f)
+
+    results['json indent=2(原写法)'] = {
+        'dumps': _best(lambda: json.dumps(corpus, ensure_ascii=False, indent=2), repeat),
+        'write': _best(stdlib_write, repeat),
+        'read': _best(stdlib_read, repeat),
+        'size_mb': os.path.getsize(path) / 1024 / 1024
+    }
+
+    backends = [json_codec.BACKEND_STDLIB]
+    if json_codec.orjson is not None:
+        backends.append(json_codec.BACKEND_ORJSON)
+    previous = json_codec.get_backend()
+    try:
+        for backend in backends:
+            json_codec.set_backend(backend)
+            results[f"json_codec[{backend}]紧凑"] = {
+                'dumps': _best(lambda: json_codec.dumps_bytes(corpus), repeat),
+                'write': _best(lambda: json_codec.save_json(path, corpus), repeat),
+                'read': _best(lambda: json_codec.load_json(path), repeat),
+                'size_mb': os.path.getsize(path) / 1024 / 1024
+            }
+    finally:
+        json_codec.set_backend(previous)
+    os.remove(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON编解码微基准')
+    parser.add_argument('--games', type=int, default=10000, help='模拟游戏数量，默认10000')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数(取最快值)，默认3')
+    args = parser.parse_args()
+
+    print(f"🧪 {args.games}个游戏，每项取{args.repeat}次中的最快值"
+          f"{'' if json_codec.orjson is not None else '(未安装orjson，只比较标准库)'}")
+    results = run_benchmark(args.games, args.repeat)
+    baseline = next(iter(results.values()))
+    print(f"{'方式':<28}{'编码':>10}{'写文件':>10}{'读文件':>10}{'文件大小':>10}")
+    for name, result in results.items():
+        print(f"{name:<28}{result['dumps'] * 1000:>8.0f}ms{result['write'] * 1000:>8.0f}ms"
+              f"{result['read'] * 1000:>8.0f}ms{result['size_mb']:>8.1f}MB")
+    for name, result in list(results.items())[1:]:
+        print(f"📊 {name}: 写文件快{baseline['write'] / result['write']:.1f}倍，"
+              f"读文件快{baseline['read'] / result['read']:.1f}倍")
+
+
+if __name__ == "__main__":
+    main()
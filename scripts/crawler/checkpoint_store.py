@@ -0,0 +1,168 @@
+# scripts/crawler/checkpoint_store.py - GameMonetize采集器的滚动检查点
+"""
+滚动检查点
+每个采集器只保留一份检查点：<name>_checkpoint.jsonl 逐条追加成功/失败记录，
+<name>_checkpoint.json 是很小的清单(状态、计数、更新时间、最终结果文件)，原子替换写入；
+采集器重启时从日志恢复已采集的记录继续，结束时才把日志合并为带时间戳的最终结果文件，
+不再每50个游戏写一份包含全部数据的 *_progress_<timestamp>.json
+"""
+
+import logging
+import os
+from datetime import datetime
+from crawl_journal import CrawlJournal, iter_journal_records
+import json_codec
+
+logger = logging.getLogger(__name__)
+
+# 记录类型
+RECORD_SUCCESS = 'success'
+RECORD_FAILED = 'failed'
+
+# 清单状态
+STATUS_IN_PROGRESS = 'in_progress'
+STATUS_COMPLETED = 'completed'
+
+
+def _write_json_array(path, items):
+    """流式写入紧凑格式的JSON数组(每项一行)，先写临时文件再原子替换"""
+    temp_path = f"{path}.tmp"
+    count = 0
+    with open(temp_path, 'wb') as f:
+        f.write(b'[')
+        for item in items:
+            f.write((b',\n' if count else b'\n') + json_codec.dumps_bytes(item))
+            count += 1
+        f.write(b'\n]' if count else b']')
+    os.replace(temp_path, path)
+    return count
+
+
+class CheckpointStore:
+    """单个采集器的追加日志 + 清单"""
+
+    def __init__(self, name, directory='.'):
+        """
+        Args:
+            name (str): 采集器名，文件为<name>_checkpoint.jsonl和<name>_checkpoint.json
+            directory (str): 文件目录，默认与结果文件相同的当前目录
+        """
+        self.name = name
+        self.log_path = os.path.join(directory, f"{name}_checkpoint.jsonl")
+        self.manifest_path = os.path.join(directory, f"{name}_checkpoint.json")
+        self._journal = None
+
+    def read_manifest(self):
+        """
+        读取清单
+
+        Returns:
+            dict: 清单内容，不存在或损坏时为None
+        """
+        if not os.path.exists(self.manifest_path):
+            return None
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json_codec.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取检查点清单失败: {e}")
+            return None
+
+    def _write_manifest(self, manifest):
+        """原子写入清单"""
+        manifest['updated_at'] = datetime.now().isoformat()
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json_codec.dump(manifest, f, pretty=True)
+        os.replace(temp_path, self.manifest_path)
+
+    def in_progress(self):
+        """是否有未完成的采集"""
+        manifest = self.read_manifest()
+        return manifest is not None and manifest.get('status') == STATUS_IN_PROGRESS
+
+    def load(self):
+        """
+        从日志流式读取全部记录；只读，不修复日志，采集器正在写入时也可以调用
+
+        Returns:
+            tuple: (成功记录列表, 失败记录列表)
+        """
+        successes, failures = [], []
+        if not os.path.exists(self.log_path):
+            return successes, failures
+        for record_type, item in iter_journal_records(self.log_path, (RECORD_SUCCESS, RECORD_FAILED)):
+            (successes if record_type == RECORD_SUCCESS else failures).append(item)
+        return successes, failures
+
+    def start(self):
+        """
+        开始或恢复采集：上次未完成时从日志恢复记录，否则清空日志重新开始
+
+        Returns:
+            tuple: (成功记录列表, 失败记录列表)，新开始时为两个空列表
+        """
+        resume = self.in_progress()
+        self._journal = CrawlJournal(self.log_path)
+        if resume:
+            successes, failures = self.load()
+            logger.info(f"从检查点恢复: 成功 {len(successes)} 个，失败 {len(failures)} 个")
+            return successes, failures
+        self._journal.truncate()
+        self._write_manifest({'name': self.name, 'status': STATUS_IN_PROGRESS,
+                              'started_at': datetime.now().isoformat(), 'success': 0, 'failed': 0})
+        return [], []
+
+    def record_success(self, item):
+        """追加一条成功记录"""
+        self._journal.append(RECORD_SUCCESS, [item])
+
+    def record_failure(self, item):
+        """追加一条失败记录"""
+        self._journal.append(RECORD_FAILED, [item])
+
+    def save_manifest(self, success, failed, **extra):
+        """
+        更新清单中的计数(记录已在发生时写入日志，这里只改写很小的清单)
+
+        Args:
+            success (int): 成功数量
+            failed (int): 失败数量
+            **extra: 其他要记录的字段
+        """
+        manifest = self.read_manifest() or {'name': self.name, 'started_at': datetime.now().isoformat()}
+        manifest.update(extra, status=STATUS_IN_PROGRESS, success=success, failed=failed)
+        self._write_manifest(manifest)
+
+    def finalize(self, success_file, failed_file=None):
+        """
+        把日志合并为最终结果文件，并清空日志
+
+        Args:
+            success_file (str): 成功记录的结果文件
+            failed_file (str): 失败记录的结果文件，None表示不写失败结果文件
+
+        Returns:
+            tuple: (成功数量, 失败数量)
+        """
+        if self._journal is None:
+            self._journal = CrawlJournal(self.log_path)
+        journal = self._journal
+        success = _write_json_array(success_file, (item for _, item in journal.iter_records((RECORD_SUCCESS,))))
+        if failed_file:
+            failed = _write_json_array(failed_file, (item for _, item in journal.iter_records((RECORD_FAILED,))))
+        else:
+            failed = sum(1 for _ in journal.iter_records((RECORD_FAILED,)))
+
+        manifest = self.read_manifest() or {'name': self.name}
+        manifest.update(status=STATUS_COMPLETED, success=success, failed=failed,
+                        result_file=success_file, failed_file=failed_file)
+        self._write_manifest(manifest)
+        journal.truncate()
+        return success, failed
+
+    def close(self):
+        """关闭日志文件"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
@@ -0,0 +1,206 @@
+# scripts/crawler/concurrency_controller.py - 基于延迟和错误信号的AIMD自适应并发控制器
+"""
+AIMD自适应并发控制器
+页面p95延迟和错误率健康时按窗口线性增加在途并发，
+遇到超时、429或5xx响应时按比例成倍回退，
+替代启动时固定的--workers
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 触发成倍回退的错误类型
+BACKOFF_ERRORS = {'timeout', 'throttled', 'server_error'}
+
+
+def classify_status(status_code):
+    """
+    把HTTP状态码归类为控制器信号
+
+    Args:
+        status_code (int): HTTP状态码
+
+    Returns:
+        str or None: throttled、server_error或None(正常)
+    """
+    if status_code == 429:
+        return 'throttled'
+    if status_code is not None and status_code >= 500:
+        return 'server_error'
+    return None
+
+
+def classify_exception(exc):
+    """
+    把异常归类为控制器信号，兼容requests、aiohttp和Selenium的超时异常
+
+    Args:
+        exc (Exception): 请求或页面加载时抛出的异常
+
+    Returns:
+        str: timeout、throttled、server_error或error
+    """
+    if 'timeout' in type(exc).__name__.lower():
+        return 'timeout'
+    response = getattr(exc, 'response', None)
+    status_code = getattr(response, 'status_code', None) or getattr(exc, 'status', None)
+    return classify_status(status_code) or 'error'
+
+
+def classify_result(result):
+    """
+    把GameDetailExtractor返回的结果归类(该提取器内部捕获异常，只返回error字段)
+
+    Returns:
+        str or None: timeout、error或None(正常)
+    """
+    if not result:
+        return 'error'
+    error = result.get('error')
+    if not error:
+        return None
+    return 'timeout' if 'timeout' in str(error).lower() or 'timed out' in str(error).lower() else 'error'
+
+
+class AdaptiveConcurrencyController:
+    """AIMD自适应并发控制器
+
+    每收集满一个窗口的健康样本就把并发上限加increase_step，
+    出现超时/429/5xx或窗口p95、错误率超标时乘以decrease_factor
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=10, target_p95=10.0,
+                 max_error_rate=0.1, window_size=20, increase_step=1, decrease_factor=0.5,
+                 cooldown=5.0):
+        """
+        初始化控制器
+
+        Args:
+            initial_limit (int): 初始并发上限
+            min_limit (int): 并发下限
+            max_limit (int): 并发上限(线程池大小)
+            target_p95 (float): 健康的页面p95延迟上限(秒)
+            max_error_rate (float): 健康的窗口错误率上限
+            window_size (int): 每次评估使用的样本数
+            increase_step (int): 健康窗口的加性增量
+            decrease_factor (float): 回退时的乘性系数
+            cooldown (float): 两次回退之间的最小间隔(秒)，避免同一波错误连续减半
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_p95 = target_p95
+        self.max_error_rate = max_error_rate
+        self.window_size = window_size
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._latencies = deque(maxlen=window_size)
+        self._errors = deque(maxlen=window_size)
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+        # 统计信息
+        self.increases = 0
+        self.decreases = 0
+        self.last_p95 = None
+
+    @property
+    def limit(self):
+        """当前并发上限(整数)"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """当前在途任务数"""
+        return self._in_flight
+
+    def acquire(self):
+        """获取一个并发名额，达到当前上限时阻塞"""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self):
+        """归还并发名额"""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """以上下文管理器方式占用一个并发名额"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record(self, latency, error=None):
+        """
+        记录一次页面结果并按AIMD规则调整并发上限
+
+        Args:
+            latency (float): 页面耗时(秒)，不含限速器排队时间
+            error (str): None表示成功，否则为timeout/throttled/server_error/error
+        """
+        with self._cond:
+            if error in BACKOFF_ERRORS:
+                self._decrease(f"收到{error}信号")
+                return
+
+            self._latencies.append(latency)
+            self._errors.append(1 if error else 0)
+            if len(self._latencies) < self.window_size:
+                return
+
+            ordered = sorted(self._latencies)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            error_rate = sum(self._errors) / len(self._errors)
+            self.last_p95 = p95
+
+            if p95 > self.target_p95:
+                self._decrease(f"p95延迟{p95:.1f}s超过{self.target_p95:.1f}s")
+            elif error_rate > self.max_error_rate:
+                self._decrease(f"错误率{error_rate * 100:.0f}%超标")
+            elif self._limit < self.max_limit:
+                self._limit = min(float(self.max_limit), self._limit + self.increase_step)
+                self.increases += 1
+                self._cond.notify_all()
+            self._latencies.clear()
+            self._errors.clear()
+
+    def _decrease(self, reason):
+        """成倍回退并发上限(调用方需持有锁)"""
+        now = time.time()
+        if now - self._last_decrease < self.cooldown:
+            return
+        old_limit = int(self._limit)
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        self._last_decrease = now
+        self.decreases += 1
+        self._latencies.clear()
+        self._errors.clear()
+        if int(self._limit) != old_limit:
+            print(f"🔻 并发回退 {old_limit} → {int(self._limit)}: {reason}")
+
+    def get_stats(self):
+        """
+        获取控制器统计
+
+        Returns:
+            dict: 当前上限、在途数、增减次数和最近一次窗口p95
+        """
+        with self._cond:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "last_p95_seconds": round(self.last_p95, 2) if self.last_p95 is not None else None
+            }
@@ -0,0 +1,313 @@
+# scripts/crawler/crawl_journal.py - 只追加的JSON Lines采集日志与后台合并
+"""
+采集日志
+每发现一个游戏追加一行游戏记录，定期追加一行检查点记录(页码、游戏总数等)，
+写入量只与新记录数量成正比；每次写入后fsync，崩溃最多丢失最后一行未写完的记录，
+重新打开时截掉残缺行即可继续；
+下游脚本读取的合并快照(如all_games_continuous.json)由后台合并线程从日志生成，
+先写临时文件再原子替换，任何时刻快照都是完整的
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+import json_codec
+
+logger = logging.getLogger(__name__)
+
+# 记录类型
+RECORD_GAME = 'game'
+RECORD_CHECKPOINT = 'checkpoint'
+
+# 从文件尾部向前查找检查点时每次读取的字节数
+_TAIL_BLOCK_SIZE = 64 * 1024
+
+
+class CrawlJournal:
+    """只追加的JSON Lines采集日志"""
+
+    def __init__(self, path):
+        """
+        打开日志，截掉上次崩溃留下的残缺行
+
+        Args:
+            path (str): 日志文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._repair()
+        self._file = open(path, 'ab')
+
+    def _repair(self):
+        """文件不以换行结尾时，截到最后一个换行之后"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            end = size
+            while end > 0:
+                start = max(0, end - _TAIL_BLOCK_SIZE)
+                f.seek(start)
+                pos = f.read(end - start).rfind(b'\n')
+                if pos >= 0:
+                    f.truncate(start + pos + 1)
+                    break
+                end = start
+            else:
+                f.truncate(0)
+        logger.warning(f"采集日志末尾有未写完的记录，已截断: {self.path}")
+
+    def _append(self, records):
+        """追加记录并落盘"""
+        if not records:
+            return
+        data = b''.join(json_codec.dumps_bytes(record) + b'\n' for record in records)
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def append(self, record_type, items):
+        """
+        每项追加一行指定类型的记录
+
+        Args:
+            record_type (str): 记录类型
+            items (list): 记录内容dict
+        """
+        self._append([{'type': record_type, 'data': item} for item in items])
+
+    def append_games(self, games):
+        """
+        每个游戏追加一行记录
+
+        Args:
+            games (list): 游戏信息dict
+        """
+        self.append(RECORD_GAME, games)
+
+    def checkpoint(self, page, total_games, **extra):
+        """
+        追加检查点记录
+
+        Args:
+            page (int): 已处理到的页码
+            total_games (int): 日志中的游戏总数
+            **extra: 其他要记录的字段(如status)
+        """
+        record = {'type': RECORD_CHECKPOINT, 'page': page, 'total_games': total_games,
+                  'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        record.update(extra)
+        self._append([record])
+
+    def last_checkpoint(self):
+        """
+        从文件尾部向前查找最后一个检查点，只读取检查点之后的部分
+
+        Returns:
+            tuple: (检查点dict或None, 检查点之后的游戏记录数)
+        """
+        games_after = 0
+        with self._lock, open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            remainder = b''
+            while end > 0:
+                start = max(0, end - _TAIL_BLOCK_SIZE)
+                f.seek(start)
+                lines = (f.read(end - start) + remainder).split(b'\n')
+                # 第一段可能是被块边界截断的行，留到下一块拼接
+                remainder = lines.pop(0) if start > 0 else b''
+                for line in reversed(lines):
+                    if not line:
+                        continue
+                    record = json_codec.loads(line)
+                    if record.get('type') == RECORD_CHECKPOINT:
+                        return record, games_after
+                    games_after += 1
+                end = start
+        return None, games_after
+
+    def iter_records(self, record_types=None):
+        """
+        按写入顺序流式读取记录
+
+        Args:
+            record_types (tuple): 只读取这些类型，None表示除检查点外的全部类型
+
+        Yields:
+            tuple: (记录类型, 记录内容)
+        """
+        return iter_journal_records(self.path, record_types)
+
+    def iter_games(self):
+        """
+        按写入顺序流式读取所有游戏记录
+
+        Yields:
+            dict: 游戏信息
+        """
+        for _, game in self.iter_records((RECORD_GAME,)):
+            yield game
+
+    def truncate(self):
+        """清空日志"""
+        with self._lock:
+            self._file.truncate(0)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def iter_journal_records(path, record_types=None):
+    """
+    只读地按写入顺序流式读取日志记录，不修复、不以追加方式打开文件，
+    采集器正在写入时(如进度监控)也可以安全读取，未写完的最后一行直接跳过
+
+    Args:
+        path (str): 日志文件路径
+        record_types (tuple): 只读取这些类型，None表示除检查点外的全部类型
+
+    Yields:
+        tuple: (记录类型, 记录内容)
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # 正在写入的最后一行
+            if not line.strip():
+                continue
+            record = json_codec.loads(line)
+            record_type = record.get('type')
+            if record_type == RECORD_CHECKPOINT:
+                continue
+            if record_types is None or record_type in record_types:
+                yield record_type, record['data']
+
+
+def compact_journal(journal_path, snapshot_path, **meta):
+    """
+    从日志生成紧凑格式的合并快照：{"games": [...], 元数据}，每个游戏一行，先写临时文件再原子替换
+
+    Args:
+        journal_path (str): 日志文件路径
+        snapshot_path (str): 快照文件路径
+        **meta: 写在games之后的元数据；未给出的last_page、total_games取自日志
+
+    Returns:
+        int: 快照中的游戏数量
+    """
+    temp_path = f"{snapshot_path}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+    count = 0
+    last_page = 0
+    with open(journal_path, 'rb') as journal, open(temp_path, 'wb') as out:
+        out.write(b'{"games":[')
+        for line in journal:
+            if not line.endswith(b'\n'):
+                break  # 正在写入的最后一行，留到下次合并
+            if not line.strip():
+                continue
+            record = json_codec.loads(line)
+            if record.get('type') == RECORD_CHECKPOINT:
+                last_page = record.get('page', last_page)
+                continue
+            out.write((b',\n' if count else b'\n') + json_codec.dumps_bytes(record['data']))
+            count += 1
+        meta.setdefault('timestamp', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        meta.setdefault('last_page', last_page)
+        meta.setdefault('total_games', count)
+        out.write(b'\n],' + json_codec.dumps_bytes(meta)[1:])
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(temp_path, snapshot_path)
+    return count
+
+
+class JournalCompactor:
+    """后台合并线程：收到请求后从日志重新生成快照，两次合并之间至少间隔min_interval秒"""
+
+    def __init__(self, journal_path, snapshot_path, min_interval=60):
+        """
+        Args:
+            journal_path (str): 日志文件路径
+            snapshot_path (str): 快照文件路径
+            min_interval (float): 两次合并之间的最短间隔(秒)，期间的多次请求合并为一次
+        """
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.min_interval = min_interval
+        self.compactions = 0
+        self._meta = {}
+        self._requested = False
+        self._closed = False
+        self._last_run = 0.0
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='journal-compactor', daemon=True)
+        self._thread.start()
+
+    def request(self, **meta):
+        """请求合并(不等待)，meta为写入快照的元数据"""
+        with self._condition:
+            self._meta = meta
+            self._requested = True
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed and not self._requested:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                delay = self._last_run + self.min_interval - time.time()
+                if delay > 0:
+                    self._condition.wait(timeout=delay)
+                    continue
+                meta = self._meta
+                self._requested = False
+                self._last_run = time.time()
+            self._compact(meta)
+
+    def _compact(self, meta):
+        try:
+            count = compact_journal(self.journal_path, self.snapshot_path, **meta)
+            self.compactions += 1
+            logger.info(f"已合并采集日志: {count} 个游戏 -> {self.snapshot_path}")
+            return count
+        except Exception as e:
+            logger.error(f"合并采集日志失败: {e}")
+            return None
+
+    def close(self, final_meta=None):
+        """
+        停止后台线程；给出final_meta或还有未完成的合并请求时，在当前线程完成最后一次合并
+
+        Returns:
+            int: 最后一次合并的游戏数量，未合并或失败时为None
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        with self._condition:
+            meta = final_meta if final_meta is not None else (self._meta if self._requested else None)
+            self._requested = False
+        if meta is None:
+            return None
+        return self._compact(meta)
@@ -0,0 +1,150 @@
+# scripts/crawler/discovery_feed.py - 边发现边提取的URL生产者
+"""
+发现与提取流水线
+URL发现在后台线程中运行，每发现一批游戏就加入共享URL队列(frontier)，
+提取端照常从队列领取，不必等待完整的URL列表，提取在启动几秒后即可开始，
+总耗时接近max(发现, 提取)而不是两者之和；
+队列中待领取的URL达到上限时发现线程暂停，提取追上后再继续，避免发现远远跑在提取前面
+"""
+
+import logging
+import threading
+from url_canonicalizer import classify_url, KIND_GAME
+
+logger = logging.getLogger(__name__)
+
+# 默认待领取上限
+DEFAULT_MAX_PENDING = 200
+
+
+def dedupe_batches(batches, limit=None, base_url=None):
+    """
+    跨批次按游戏键去重，只保留游戏页
+
+    Args:
+        batches (iterable): 产出URL列表的可迭代对象
+        limit (int): 最多产出多少个URL，None表示不限
+        base_url (str): 解析相对链接的基准地址
+
+    Yields:
+        list: 去重后非空的一批规范化游戏URL
+    """
+    seen = set()
+    total = 0
+    for batch in batches:
+        urls = []
+        for url in batch:
+            info = classify_url(url, base_url)
+            if info is None or info.kind != KIND_GAME or info.key in seen:
+                continue
+            seen.add(info.key)
+            urls.append(info.url)
+            if limit is not None and total + len(urls) >= limit:
+                break
+        if urls:
+            total += len(urls)
+            yield urls
+        if limit is not None and total >= limit:
+            return
+
+
+class DiscoveryFeed:
+    """在后台线程中运行URL发现并把结果加入URL队列"""
+
+    def __init__(self, frontier, queue, batches, priority, max_pending=DEFAULT_MAX_PENDING, refresh_after=None):
+        """
+        Args:
+            frontier (UrlFrontier): 共享URL队列
+            queue (str): 队列名
+            batches (iterable): 产出URL列表的可迭代对象(通常是生成器)，在后台线程中迭代
+            priority (int): 加入队列时的优先级
+            max_pending (int): 队列中待领取URL达到该数量时暂停发现，None表示不暂停
+            refresh_after (float): 重新发现已完成超过该秒数的URL时放回队列，None表示已完成的不再采集
+        """
+        self.frontier = frontier
+        self.queue = queue
+        self.batches = batches
+        self.priority = priority
+        self.max_pending = max_pending
+        self.refresh_after = refresh_after
+        self.discovered = 0
+        self.added = 0
+        self.error = None
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._done = False
+        self._thread = threading.Thread(target=self._run, name=f"feed-{queue}", daemon=True)
+
+    def start(self):
+        """启动发现线程"""
+        self._thread.start()
+        return self
+
+    @property
+    def done(self):
+        """发现是否已结束(正常结束、出错或被停止)"""
+        return self._done
+
+    def _run(self):
+        try:
+            for urls in self.batches:
+                # 提取落后太多时等待，stop()或提取端领取后唤醒
+                with self._condition:
+                    while (not self._stopped and self.max_pending is not None
+                           and self.frontier.pending_count(self.queue) >= self.max_pending):
+                        self._condition.wait(timeout=1.0)
+                    if self._stopped:
+                        break
+                added = self.frontier.add(self.queue, urls, priority=self.priority,
+                                          refresh_after=self.refresh_after)
+                with self._condition:
+                    self.discovered += len(urls)
+                    self.added += added
+                    self._condition.notify_all()
+        except Exception as e:
+            self.error = e
+            logger.error(f"URL发现出错: {e}")
+        finally:
+            close = getattr(self.batches, 'close', None)
+            if close:
+                close()
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+            logger.info(f"URL发现结束: 发现 {self.discovered} 个游戏，新加入队列 {self.added} 个")
+
+    def wait_for_urls(self, timeout=5.0):
+        """
+        队列暂时为空时等待新的一批URL或发现结束
+
+        Returns:
+            bool: 发现仍在进行(调用方应重新领取)时为True，已结束时为False
+        """
+        with self._condition:
+            if not self._done:
+                self._condition.wait(timeout=timeout)
+            return not self._done or self.frontier.pending_count(self.queue) > 0
+
+    def notify_claimed(self):
+        """提取端领取了URL，唤醒可能因待领取过多而暂停的发现线程"""
+        with self._condition:
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """
+        等待发现自然结束(不停止)
+
+        Returns:
+            bool: 发现是否已结束
+        """
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        return self._done
+
+    def stop(self, timeout=5.0):
+        """停止发现并等待线程退出"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
@@ -0,0 +1,240 @@
+# scripts/crawler/driver_pool.py - 常驻WebDriver池，供批量提取器的工作线程复用浏览器
+"""
+有界的WebDriver池
+每个工作线程持有一个预热好的浏览器，页面之间做健康检查，
+达到页面数上限或内存上限后回收重建，退出或中断时统一关闭所有浏览器
+"""
+
+import atexit
+import queue
+import signal
+import sys
+import threading
+from contextlib import contextmanager
+from game_detail_extractor import GameDetailExtractor
+
+try:
+    import psutil  # 可选依赖，用于统计Chrome进程树内存
+except ImportError:
+    psutil = None
+
+
+class DriverPool:
+    """有界WebDriver池
+
+    池大小即并发浏览器上限，空闲浏览器按后进先出复用以保持预热状态
+    """
+
+    def __init__(self, max_size=10, max_pages_per_driver=100, max_rss_mb=1024,
+                 headless=True, factory=None):
+        """
+        初始化WebDriver池
+
+        Args:
+            max_size (int): 池中最多同时存在的浏览器数量，一般等于工作线程数
+            max_pages_per_driver (int): 单个浏览器处理多少页面后回收重建
+            max_rss_mb (int): 单个浏览器进程树内存上限(MB)，超过后回收重建，需要psutil
+            headless (bool): 是否使用无头模式
+            factory (callable): 自定义提取器构造函数，默认创建GameDetailExtractor
+        """
+        self.max_size = max_size
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_rss_mb = max_rss_mb
+        self.factory = factory or (lambda: GameDetailExtractor(headless=headless))
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._page_counts = {}  # {id(extractor): 已处理页面数}
+        self._extractors = {}   # {id(extractor): extractor}，包含使用中的浏览器
+        self._closed = False
+
+        # 统计信息
+        self.pages_processed = 0
+        self.drivers_started = 0
+        self.drivers_recycled = 0
+        self.health_check_failures = 0
+        self.peak_rss_mb = 0.0
+
+        atexit.register(self.close_all)
+        self._install_signal_handler()
+
+    def _install_signal_handler(self):
+        """把SIGTERM转换为SystemExit，保证finally和atexit能够关闭浏览器"""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        try:
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+        except (ValueError, AttributeError):
+            pass
+
+    @contextmanager
+    def driver(self):
+        """
+        借出一个浏览器，使用完毕后自动归还
+
+        Yields:
+            GameDetailExtractor: 可直接调用extract_game_details的提取器
+        """
+        extractor = self.acquire()
+        try:
+            yield extractor
+        finally:
+            self.release(extractor)
+
+    def acquire(self):
+        """
+        借出一个健康的浏览器，池已满时阻塞等待
+
+        Returns:
+            GameDetailExtractor: 提取器实例
+        """
+        if self._closed:
+            raise RuntimeError("WebDriver池已关闭")
+
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    extractor = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._create()
+
+                if self._is_healthy(extractor):
+                    return extractor
+
+                with self._lock:
+                    self.health_check_failures += 1
+                print("⚠️ 浏览器健康检查失败，重新创建")
+                self._discard(extractor)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, extractor, pages=1):
+        """
+        归还浏览器，必要时按页面数或内存上限回收
+
+        Args:
+            extractor (GameDetailExtractor): 借出的提取器
+            pages (int): 本次借用期间处理的页面数(多标签页模式下一次借用处理多个页面)
+        """
+        try:
+            key = id(extractor)
+            with self._lock:
+                self.pages_processed += pages
+                driver_pages = self._page_counts.get(key, 0) + pages
+                self._page_counts[key] = driver_pages
+                closed = self._closed
+
+            rss_mb = self._measure_rss_mb(extractor)
+            if rss_mb is not None:
+                with self._lock:
+                    self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+
+            if closed:
+                self._discard(extractor)
+            elif driver_pages >= self.max_pages_per_driver:
+                print(f"♻️ 浏览器已处理 {driver_pages} 个页面，回收重建")
+                self._recycle(extractor)
+            elif rss_mb is not None and rss_mb >= self.max_rss_mb:
+                print(f"♻️ 浏览器内存 {rss_mb:.0f}MB 超过上限 {self.max_rss_mb}MB，回收重建")
+                self._recycle(extractor)
+            else:
+                self._idle.put(extractor)
+        finally:
+            self._slots.release()
+
+    def _create(self):
+        """创建新的浏览器并登记"""
+        extractor = self.factory()
+        with self._lock:
+            self._extractors[id(extractor)] = extractor
+            self._page_counts[id(extractor)] = 0
+            self.drivers_started += 1
+        return extractor
+
+    def _recycle(self, extractor):
+        """关闭浏览器，下一次借出时会按需重建"""
+        with self._lock:
+            self.drivers_recycled += 1
+        self._discard(extractor)
+
+    def _discard(self, extractor):
+        """关闭浏览器并从池中注销"""
+        with self._lock:
+            self._extractors.pop(id(extractor), None)
+            self._page_counts.pop(id(extractor), None)
+        try:
+            extractor.close()
+        except Exception as e:
+            print(f"⚠️ 关闭浏览器失败: {e}")
+
+    def _is_healthy(self, extractor):
+        """通过一次轻量脚本调用确认浏览器会话仍然可用"""
+        try:
+            return extractor.driver is not None and extractor.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _measure_rss_mb(self, extractor):
+        """
+        统计chromedriver及其所有Chrome子进程的常驻内存
+
+        Returns:
+            float or None: 内存(MB)，无法统计时返回None
+        """
+        if psutil is None:
+            return None
+        try:
+            pid = extractor.driver.service.process.pid
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except Exception:
+            return None
+
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    def get_stats(self):
+        """
+        获取池的运行统计
+
+        Returns:
+            dict: 页面数、浏览器启动/回收次数、健康检查失败次数和峰值内存
+        """
+        with self._lock:
+            return {
+                "pages_processed": self.pages_processed,
+                "drivers_started": self.drivers_started,
+                "drivers_recycled": self.drivers_recycled,
+                "health_check_failures": self.health_check_failures,
+                "peak_chrome_rss_mb": round(self.peak_rss_mb, 1) if psutil else None
+            }
+
+    def close_all(self):
+        """关闭池中所有浏览器（包括仍在使用中的），可重复调用"""
+        with self._lock:
+            self._closed = True
+            extractors = list(self._extractors.values())
+            self._extractors.clear()
+            self._page_counts.clear()
+
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+        if extractors:
+            print(f"🧹 正在关闭 {len(extractors)} 个浏览器...")
+        for extractor in extractors:
+            try:
+                extractor.close()
+            except Exception as e:
+                print(f"⚠️ 关闭浏览器失败: {e}")
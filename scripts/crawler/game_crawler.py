@@ -4,46 +4,98 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-import json
+import re
 import time
 import os
 from datetime import datetime
+from rate_limiter import get_rate_limiter
+from link_harvester import harvest_links
+from page_wait import wait_for_page_ready, GAMEDISTRIBUTION_LISTING_SELECTORS
+from gamedistribution_api import (enable_network_log, capture_listing_endpoint, save_endpoint,
+                                  load_endpoint, ListingApiClient)
+from known_urls import get_known_url_index, DEFAULT_STOP_AFTER
+from url_canonicalizer import classify_url, KIND_GAME
+from seen_set import open_seen_set
+from crawl_journal import CrawlJournal, JournalCompactor
+import json_codec
+
+OUTPUT_FILE = 'scripts/output/all_games_continuous.json'
+
+# 只追加的采集日志，OUTPUT_FILE是由后台合并线程从日志生成的快照
+JOURNAL_FILE = 'scripts/output/all_games_journal.jsonl'
+
+def _migrate_snapshot(journal, seen_urls):
+    """
+    没有采集日志时，把已有的快照文件一次性转为日志，并把其中的游戏加入已见集合和已知URL索引
+    """
+    with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
+        data = json_codec.load(f)
+    games = data.get('games', [])
+    journal.append_games(games)
+    journal.checkpoint(data.get('last_page', 0), len(games), status='in_progress')
+    seen_urls.update(game['url'] for game in games)
+    get_known_url_index().add((game['url'] for game in games), source='gamedistribution')
+    seen_urls.flush()
+    print(f"📦 已把 {OUTPUT_FILE} 中的 {len(games)} 个游戏转入采集日志")
 
 def load_existing_games():
-    """加载已存在的游戏数据，支持断点续传"""
-    output_file = 'scripts/output/all_games_continuous.json'
-    if os.path.exists(output_file):
-        try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                existing_games = data.get('games', [])
-                last_page = data.get('last_page', 0)
-                processed_urls = {game['url'] for game in existing_games}
-                print(f"📂 加载已有数据: {len(existing_games)} 个游戏，上次处理到第 {last_page} 页")
-                return existing_games, processed_urls, last_page
-        except Exception as e:
-            print(f"⚠️ 加载已有数据失败: {e}，将重新开始")
+    """
+    加载断点续传状态：只读采集日志尾部的最后一个检查点，已采集的游戏由磁盘上的已见URL集合判断，
+    不再解析全部游戏
     
-    return [], set(), 0
+    Returns:
+        tuple: (采集日志, 已见URL集合, 上次处理到的页码, 已有游戏数量)
+    """
+    journal = CrawlJournal(JOURNAL_FILE)
+    seen_urls = open_seen_set('gamedistribution')
+    try:
+        checkpoint, games_after = journal.last_checkpoint()
+        if checkpoint is None and not games_after and os.path.exists(OUTPUT_FILE):
+            _migrate_snapshot(journal, seen_urls)
+            checkpoint, games_after = journal.last_checkpoint()
+        elif not len(seen_urls) and (games_after or (checkpoint or {}).get('total_games')):
+            # 已见集合文件缺失：从日志流式重建
+            seen_urls.update(game['url'] for game in journal.iter_games())
+            seen_urls.flush()
+        
+        checkpoint = checkpoint or {}
+        total_games = checkpoint.get('total_games', 0) + games_after
+        last_page = checkpoint.get('page', 0)
+        if total_games or last_page:
+            print(f"📂 加载已有数据: {total_games} 个游戏，上次处理到第 {last_page} 页")
+        return journal, seen_urls, last_page, total_games
+    except Exception as e:
+        print(f"⚠️ 加载已有数据失败: {e}，将重新开始")
+    
+    return journal, seen_urls, 0, 0
 
-def save_progress(all_games, current_page, processed_urls, is_final=False):
-    """保存当前进度"""
-    output_dir = 'scripts/output'
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+def save_progress(journal, compactor, current_page, total_games, seen_urls, is_final=False):
+    """
+    保存当前进度：游戏已在发现时逐条写入日志，这里只追加一条检查点，并请求后台合并快照
+    
+    Args:
+        journal (CrawlJournal): 采集日志
+        compactor (JournalCompactor): 快照合并线程
+        current_page (int): 当前页码
+        total_games (int): 日志中的游戏总数
+        seen_urls (BloomSeenSet): 已见URL集合
+        is_final (bool): 是否为最终保存，为True时在当前线程完成最后一次合并
     
-    output_file = os.path.join(output_dir, 'all_games_continuous.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'last_page': current_page,
-            'total_games': len(all_games),
-            'total_urls': len(processed_urls),
-            'status': 'completed' if is_final else 'in_progress',
-            'games': all_games
-        }, f, ensure_ascii=False, indent=2)
+    Returns:
+        int: 游戏总数
+    """
+    status = 'completed' if is_final else 'in_progress'
+    journal.checkpoint(current_page, total_games, total_urls=len(seen_urls), status=status)
+    seen_urls.flush()
     
-    print(f"💾 已保存进度: 第 {current_page} 页，共 {len(all_games)} 个游戏")
+    meta = {'last_page': current_page, 'total_games': total_games, 'total_urls': len(seen_urls), 'status': status}
+    if is_final:
+        compactor.close(final_meta=meta)
+    else:
+        compactor.request(**meta)
+    
+    print(f"💾 已保存进度: 第 {current_page} 页，共 {total_games} 个游戏")
+    return total_games
 
 def get_games_from_current_page(driver, processed_urls):
     """从当前页面获取游戏列表 - 修复版"""
@@ -62,10 +114,11 @@ def get_games_from_current_page(driver, processed_urls):
         "a[href*='/games/']"
     ]
     
+    # 一次脚本调用取回所有元素的链接、文本和onclick，不再逐个元素往返浏览器
     game_elements = []
     for selector in selectors:
         try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            elements = harvest_links(driver, By.CSS_SELECTOR, selector, anchor_selector="a[href*='/games/']")
             if elements and len(elements) >= 20:  # 至少20个元素才认为有效
                 game_elements = elements
                 print(f"✅ 使用选择器 '{selector}' 找到 {len(game_elements)} 个元素")
@@ -82,52 +135,37 @@ def get_games_from_current_page(driver, processed_urls):
     
     for i, element in enumerate(game_elements):
         try:
-            # 获取游戏链接 - 修复版
+            # 获取游戏链接：元素本身或其中第一个链接
             game_url = None
-            
-            if element.tag_name == 'a':
-                href = element.get_attribute('href')
-                if href and '/games/' in href:
-                    game_url = href
+            href = element['href']
+            if href and '/games/' in href:
+                game_url = href
             else:
-                # 查找子元素中的链接
-                try:
-                    link = element.find_element(By.CSS_SELECTOR, "a[href*='/games/']")
-                    game_url = link.get_attribute('href')
-                except:
-                    # 如果找不到子链接，尝试获取onclick或其他属性
-                    try:
-                        onclick = element.get_attribute('onclick')
-                        if onclick and '/games/' in onclick:
-                            # 从onclick中提取URL
-                            import re
-                            url_match = re.search(r"'/games/[^']+'", onclick)
-                            if url_match:
-                                game_url = 'https://gamedistribution.com' + url_match.group().strip("'")
-                    except:
-                        pass
+                # 如果找不到链接，尝试从onclick中提取URL
+                onclick = element['attributes'].get('onclick')
+                if onclick and '/games/' in onclick:
+                    url_match = re.search(r"'/games/[^']+'", onclick)
+                    if url_match:
+                        game_url = 'https://gamedistribution.com' + url_match.group().strip("'")
             
             # 如果还是没有找到URL，跳过
             if not game_url:
                 continue
                 
-            # 确保URL格式正确
-            if not game_url.startswith('http'):
-                if game_url.startswith('/'):
-                    game_url = 'https://gamedistribution.com' + game_url
-                else:
-                    continue
-            
-            # 检查是否已处理过
-            if game_url in processed_urls:
+            # 规范化URL，过滤非游戏页(如按开发商筛选的列表页)
+            info = classify_url(game_url, 'https://gamedistribution.com/games/')
+            if info is None or info.kind != KIND_GAME:
                 continue
+            game_url = info.url
             
-            processed_urls.add(game_url)
+            # 检查是否已处理过(已见集合按游戏键判断)
+            if not processed_urls.add(game_url):
+                continue
             
             # 获取游戏名称
             game_name = "未知游戏"
             try:
-                text_content = element.text.strip()
+                text_content = element['text']
                 if text_content and len(text_content) < 200:
                     # 清理文本内容
                     lines = [line.strip() for line in text_content.split('\n') if line.strip()]
@@ -151,11 +189,8 @@ def get_games_from_current_page(driver, processed_urls):
                 except:
                     pass
             
-            # 从URL提取游戏ID
-            try:
-                game_id = game_url.split('/')[-2] if game_url.endswith('/') else game_url.split('/')[-1]
-            except:
-                game_id = f"game_{len(games) + 1}"
+            # 游戏ID即游戏键中的slug
+            game_id = info.key.split(':', 1)[1]
             
             games.append({
                 'id': game_id,
@@ -213,6 +248,9 @@ def click_next_page_simple(driver):
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
         time.sleep(1)
         
+        # 翻页会触发AJAX请求，经过共享令牌桶限速
+        get_rate_limiter().acquire(driver.current_url)
+        
         try:
             next_button.click()
             print("✅ 点击下一页按钮")
@@ -228,37 +266,144 @@ def click_next_page_simple(driver):
         print(f"❌ 点击下一页失败: {e}")
         return False
 
-def continuous_crawl_games():
-    """持续爬取游戏 - 修复版"""
-    # 加载已有数据
-    all_games, processed_urls, start_page = load_existing_games()
-    
-    # 配置Chrome选项
+def create_chrome_options(network_log=False):
+    """配置Chrome选项，network_log为True时开启性能日志用于捕获分页接口"""
     chrome_options = Options()
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--disable-gpu')
     chrome_options.add_argument('--window-size=1920,1080')
     chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    if network_log:
+        enable_network_log(chrome_options)
+    return chrome_options
+
+def capture_api_endpoint():
+    """打开列表页并翻一次页，从网络日志中捕获AJAX分页接口"""
+    print("🔍 启动浏览器捕获分页接口...")
+    try:
+        driver = webdriver.Chrome(options=create_chrome_options(network_log=True))
+    except Exception as e:
+        print(f"❌ 无法启动Chrome浏览器: {e}")
+        return None
+    
+    try:
+        get_rate_limiter().acquire('https://gamedistribution.com/games/')
+        driver.get('https://gamedistribution.com/games/')
+        wait_for_page_ready(driver, GAMEDISTRIBUTION_LISTING_SELECTORS)
+        endpoint = capture_listing_endpoint(driver, click_next_page_simple)
+        if endpoint:
+            save_endpoint(endpoint)
+            print(f"✅ 已捕获分页接口: {endpoint.method} {endpoint.url}")
+        return endpoint
+    except Exception as e:
+        print(f"❌ 捕获分页接口失败: {e}")
+        return None
+    finally:
+        try:
+            driver.quit()
+        except:
+            pass
+
+def api_crawl_games(concurrency=8, incremental=False, stop_after=DEFAULT_STOP_AFTER):
+    """
+    通过分页接口直接并发爬取游戏，接口不可用时退回浏览器翻页
+    
+    Args:
+        concurrency (int): 同时请求的页数
+        incremental (bool): 只采集已知URL索引中没有的游戏，连续stop_after页都是已知游戏即停止
+        stop_after (int): 增量模式的停止页数
+    """
+    journal, processed_urls, _, total_games = load_existing_games()
+    known_index = get_known_url_index()
+    
+    endpoint = load_endpoint()
+    from_saved = endpoint is not None
+    if endpoint is None:
+        endpoint = capture_api_endpoint()
+    if endpoint is None:
+        print("⚠️ 未找到分页接口，改用浏览器翻页")
+        processed_urls.close()
+        journal.close()
+        return continuous_crawl_games()
+    
+    compactor = JournalCompactor(JOURNAL_FILE, OUTPUT_FILE)
+    current_page = 0
+    start_time = time.time()
+    try:
+        print(f"🚀 开始接口分页爬取 (并发 {concurrency} 页{'，增量模式' if incremental else ''})...")
+        while True:
+            client = ListingApiClient(endpoint, concurrency=concurrency)
+            pages = client.iter_pages(known_index=known_index if incremental else None, stop_after=stop_after)
+            for current_page, page_games in pages:
+                page_new = [game for game in page_games if processed_urls.add(game['url'])]
+                journal.append_games(page_new)  # 每个新游戏立即追加一行
+                total_games += len(page_new)
+                known_index.add((game['url'] for game in page_new), source='gamedistribution')
+                print(f"✅ 第 {current_page} 页获取到 {len(page_new)} 个新游戏，累计 {total_games} 个游戏")
+                
+                # 每10页保存一次进度，接口请求已经过令牌桶限速，不再额外等待
+                if current_page % 10 == 0:
+                    save_progress(journal, compactor, current_page, total_games, processed_urls)
+            
+            # 保存的接口失效(第一页就失败)时重新捕获一次
+            if current_page == 0 and from_saved:
+                from_saved = False
+                endpoint = capture_api_endpoint()
+                if endpoint:
+                    continue
+            break
+        
+        total_games = save_progress(journal, compactor, current_page, total_games, processed_urls, is_final=True)
+        print(f"\n🎉 接口爬取完成！总共获取 {total_games} 个游戏，处理了 {current_page} 页，"
+              f"耗时 {time.time() - start_time:.1f} 秒")
+        return total_games
+    
+    except KeyboardInterrupt:
+        print("\n⚠️ 用户中断爬取，保存当前进度...")
+        return save_progress(journal, compactor, current_page, total_games, processed_urls)
+    
+    finally:
+        compactor.close()
+        processed_urls.close()
+        journal.close()
+
+def continuous_crawl_games():
+    """
+    持续爬取游戏 - 修复版
+    
+    Returns:
+        int: 数据文件中的游戏总数
+    """
+    # 加载断点续传状态(只读日志尾部的检查点)
+    journal, processed_urls, start_page, total_games = load_existing_games()
+    
+    # 配置Chrome选项
+    chrome_options = create_chrome_options()
     
     try:
         driver = webdriver.Chrome(options=chrome_options)
         driver.implicitly_wait(10)
     except Exception as e:
         print(f"❌ 无法启动Chrome浏览器: {e}")
-        return all_games
+        processed_urls.close()
+        journal.close()
+        return total_games
     
+    compactor = JournalCompactor(JOURNAL_FILE, OUTPUT_FILE)
     current_page = 1
     consecutive_failures = 0
     max_failures = 3
     
     try:
         print("🚀 开始修复版持续爬取游戏...")
+        get_rate_limiter().acquire('https://gamedistribution.com/games/')
         driver.get('https://gamedistribution.com/games/')
         
-        # 等待初始页面加载
+        # 等待初始页面出现游戏卡片，不再固定等待5秒
         print("⏳ 等待初始页面加载...")
-        time.sleep(5)
+        ready, ready_seconds = wait_for_page_ready(driver, GAMEDISTRIBUTION_LISTING_SELECTORS)
+        print(f"✅ 初始页面就绪耗时 {ready_seconds:.2f} 秒")
         
         while True:
             print(f"\n📄 正在处理第 {current_page} 页...")
@@ -275,14 +420,14 @@ def continuous_crawl_games():
                     break
             else:
                 consecutive_failures = 0  # 重置失败计数
-                all_games.extend(page_games)
-                print(f"✅ 第 {current_page} 页获取到 {len(page_games)} 个新游戏，累计 {len(all_games)} 个游戏")
+                journal.append_games(page_games)  # 每个新游戏立即追加一行
+                total_games += len(page_games)
+                get_known_url_index().add((game['url'] for game in page_games), source='gamedistribution')
+                print(f"✅ 第 {current_page} 页获取到 {len(page_games)} 个新游戏，累计 {total_games} 个游戏")
             
-            # 每10页保存一次进度并等待30秒
+            # 每10页保存一次进度；翻页请求由共享令牌桶限速，预算耗尽时才等待
             if current_page % 10 == 0:
-                save_progress(all_games, current_page, processed_urls)
-                print(f"⏸️ 第 {current_page} 页完成，等待30秒增加稳定性...")
-                time.sleep(30)
+                save_progress(journal, compactor, current_page, total_games, processed_urls)
             
             # 尝试点击下一页
             if not click_next_page_simple(driver):
@@ -290,34 +435,48 @@ def continuous_crawl_games():
                 break
             
             current_page += 1
-            time.sleep(2)  # 基础等待时间
         
         # 最终保存
-        save_progress(all_games, current_page, processed_urls, is_final=True)
-        print(f"\n🎉 爬取完成！总共获取 {len(all_games)} 个游戏，处理了 {current_page} 页")
+        total_games = save_progress(journal, compactor, current_page, total_games, processed_urls, is_final=True)
+        print(f"\n🎉 爬取完成！总共获取 {total_games} 个游戏，处理了 {current_page} 页")
         
-        return all_games
+        return total_games
         
     except KeyboardInterrupt:
         print("\n⚠️ 用户中断爬取，保存当前进度...")
-        save_progress(all_games, current_page, processed_urls)
-        return all_games
+        return save_progress(journal, compactor, current_page, total_games, processed_urls)
         
     except Exception as e:
         print(f"❌ 爬取过程出错: {e}")
-        save_progress(all_games, current_page, processed_urls)
-        return all_games
+        return save_progress(journal, compactor, current_page, total_games, processed_urls)
     
     finally:
+        compactor.close()
+        processed_urls.close()
+        journal.close()
         try:
             driver.quit()
         except:
             pass
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='GameDistribution游戏列表爬虫')
+    parser.add_argument('--mode', choices=['api', 'browser'], default='api',
+                        help='api: 捕获分页接口后直接并发请求; browser: 浏览器逐页点击')
+    parser.add_argument('--concurrency', type=int, default=8, help='接口模式同时请求的页数')
+    parser.add_argument('--incremental', action='store_true',
+                        help='接口模式只采集新游戏，连续--stop-after页都是已知游戏即停止')
+    parser.add_argument('--stop-after', type=int, default=DEFAULT_STOP_AFTER, help='增量模式的停止页数')
+    args = parser.parse_args()
+    
     print("🎮 GameDistribution 修复版爬虫启动")
     print("💡 提示: 按 Ctrl+C 可以随时中断并保存进度")
     
-    games = continuous_crawl_games()
-    print(f"\n🎉 爬取任务完成！总共获取 {len(games)} 个游戏")
-    print(f"📁 数据已保存到: scripts/output/all_games_continuous.json")
\ No newline at end of file
+    if args.mode == 'api':
+        total_games = api_crawl_games(concurrency=args.concurrency, incremental=args.incremental,
+                                stop_after=args.stop_after)
+    else:
+        total_games = continuous_crawl_games()
+    print(f"\n🎉 爬取任务完成！总共获取 {total_games} 个游戏")
+    print(f"📁 数据已保存到: {OUTPUT_FILE} (采集日志: {JOURNAL_FILE})")
\ No newline at end of file
@@ -8,6 +8,8 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import os
 from datetime import datetime
+from link_harvester import harvest_links
+import json_codec
 
 class GameDetailAnalyzer:
     def __init__(self):
@@ -349,12 +351,9 @@ class GameDetailAnalyzer:
         related = []
         for selector in selectors:
             try:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    href = element.get_attribute('href')
-                    text = element.text.strip()
-                    if href and text:
-                        related.append({'url': href, 'title': text})
+                for link in harvest_links(self.driver, By.CSS_SELECTOR, selector, attributes=()):
+                    if link['href'] and link['text']:
+                        related.append({'url': link['href'], 'title': link['text']})
             except:
                 continue
         return related
@@ -430,12 +429,9 @@ class GameDetailAnalyzer:
         """获取页面所有链接"""
         links = []
         try:
-            link_elements = self.driver.find_elements(By.TAG_NAME, 'a')
-            for link in link_elements[:20]:  # 限制数量
-                href = link.get_attribute('href')
-                text = link.text.strip()
-                if href:
-                    links.append({'url': href, 'text': text})
+            for link in harvest_links(self.driver, By.CSS_SELECTOR, 'a', limit=20, attributes=()):  # 限制数量
+                if link['href']:
+                    links.append({'url': link['href'], 'text': link['text']})
         except:
             pass
         return links
@@ -447,7 +443,7 @@ class GameDetailAnalyzer:
         
         filepath = os.path.join(output_dir, filename)
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(game_data, f, ensure_ascii=False, indent=2)
+            json_codec.dump(game_data, f)
         
         print(f"分析结果已保存到: {filepath}")
     
@@ -459,7 +455,7 @@ class GameDetailAnalyzer:
 def main():
     # 读取游戏列表
     with open('scripts/output/all_games_continuous.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+        data = json_codec.load(f)
     
     # 获取第一个游戏信息
     first_game = data['games'][0]
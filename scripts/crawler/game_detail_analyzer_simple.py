@@ -1,6 +1,5 @@
 # scripts/crawler/game_detail_analyzer_simple.py - 简化版游戏详情页面分析器
 import time
-import json
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -9,6 +8,7 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import os
 from datetime import datetime
+import json_codec
 
 class SimpleGameAnalyzer:
     def __init__(self):
@@ -174,7 +174,7 @@ class SimpleGameAnalyzer:
         
         filepath = os.path.join(output_dir, filename)
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+            json_codec.dump(result, f)
         
         print(f"\n结果已保存到: {filepath}")
     
@@ -191,7 +191,7 @@ def main():
     # 读取游戏列表
     try:
         with open('scripts/output/all_games_continuous.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            data = json_codec.load(f)
         print(f"成功读取游戏列表，共 {data['total_games']} 个游戏")
     except Exception as e:
         print(f"读取游戏列表失败: {e}")
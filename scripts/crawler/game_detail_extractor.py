@@ -1,6 +1,4 @@
 # scripts/crawler/game_detail_extractor.py - 精确的游戏详情数据提取器
-import time
-import json
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -10,11 +8,21 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import os
 from datetime import datetime
 import re
+from rate_limiter import get_rate_limiter
+from page_wait import wait_for_page_ready, GAMEDISTRIBUTION_DETAIL_SELECTORS
+from resource_blocker import apply_browser_options, install_resource_blocking
+from tab_pipeline import TabPipeline
+import json_codec
 
 class GameDetailExtractor:
-    def __init__(self, headless=True):
+    # 无头模式下放行的资源(类别名或URL模式)，默认拦截图片、字体、媒体、统计脚本和游戏iframe内容
+    RESOURCE_ALLOW = ()
+    
+    def __init__(self, headless=True, tabs=1):
         self.driver = None
         self.headless = headless
+        self.tabs = tabs  # 大于1时启用多标签页流水线，同一浏览器同时加载多个页面
+        self._pipeline = None
         self.setup_driver()
         
     def setup_driver(self):
@@ -23,6 +31,10 @@ class GameDetailExtractor:
         print(f"正在启动浏览器（{mode_text}）...")
         chrome_options = Options()
         
+        # 多标签页模式下driver.get需立即返回，由流水线轮询各标签页的就绪状态
+        if self.tabs > 1:
+            chrome_options.page_load_strategy = 'none'
+        
         # 基础配置
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
@@ -33,14 +45,15 @@ class GameDetailExtractor:
         # 无头模式配置
         if self.headless:
             chrome_options.add_argument('--headless')
-            # 无头模式下的额外优化
-            chrome_options.add_argument('--disable-images')  # 禁用图片加载
-            chrome_options.add_argument('--disable-javascript')  # 可选：禁用JS（需要测试是否影响数据提取）
+            # 无头模式下的额外优化(Chrome会忽略--disable-images，改用CDP拦截资源)
+            apply_browser_options(chrome_options, self.RESOURCE_ALLOW)
             chrome_options.add_argument('--disable-plugins')
             chrome_options.add_argument('--disable-extensions')
         
         self.driver = webdriver.Chrome(options=chrome_options)
         self.driver.set_page_load_timeout(30)
+        if self.headless:
+            install_resource_blocking(self.driver, self.RESOURCE_ALLOW)
         print(f"浏览器启动成功（{mode_text}）")
         
     def extract_game_details(self, game_url, game_info):
@@ -49,10 +62,45 @@ class GameDetailExtractor:
         print(f"URL: {game_url}")
         
         try:
-            # 访问页面
+            if self.tabs > 1:
+                # 页面加载策略为none，单个页面也交给流水线判断新页面是否就绪
+                for _, result, _ in self.extract_many([(game_url, game_info)]):
+                    return result
+            
+            # 访问页面(共享令牌桶限速)
+            get_rate_limiter().acquire(game_url)
             self.driver.get(game_url)
-            time.sleep(5)  # 等待页面完全加载
+            # 等待嵌入代码区域出现，不再固定等待5秒
+            ready, ready_seconds = wait_for_page_ready(self.driver, GAMEDISTRIBUTION_DETAIL_SELECTORS)
+            print(f"页面就绪耗时: {ready_seconds:.2f}秒" + ("" if ready else "（未满足就绪条件）"))
+        except Exception as e:
+            print(f"提取过程中出错: {str(e)}")
+            return self._error_result(game_url, game_info, e)
+        
+        return self.extract_loaded_page(game_url, game_info)
+    
+    def extract_many(self, games):
+        """
+        多标签页流水线提取，同一浏览器同时加载多个页面，哪个先就绪先提取哪个
+        
+        Args:
+            games (list): [(game_url, game_info)]
             
+        Yields:
+            tuple: (game_info, 提取结果, 从开始加载到提取完成的秒数)
+        """
+        if self._pipeline is None:
+            self._pipeline = TabPipeline(self.driver, tabs=self.tabs,
+                                         ready_selectors=GAMEDISTRIBUTION_DETAIL_SELECTORS,
+                                         resource_allow=self.RESOURCE_ALLOW)
+        pages = self._pipeline.run(games, url_of=lambda game: game[0],
+                                   extract=lambda game: self.extract_loaded_page(*game))
+        for (game_url, game_info), result, seconds in pages:
+            yield game_info, result, seconds
+    
+    def extract_loaded_page(self, game_url, game_info):
+        """从当前标签页已加载的页面提取游戏详细信息"""
+        try:
             # 初始化结果
             result = {
                 'basic_info': game_info,
@@ -90,12 +138,16 @@ class GameDetailExtractor:
             
         except Exception as e:
             print(f"提取过程中出错: {str(e)}")
-            return {
-                'basic_info': game_info,
-                'url': game_url,
-                'error': str(e),
-                'extraction_time': datetime.now().isoformat()
-            }
+            return self._error_result(game_url, game_info, e)
+    
+    def _error_result(self, game_url, game_info, error):
+        """构造提取失败时的结果"""
+        return {
+            'basic_info': game_info,
+            'url': game_url,
+            'error': str(error),
+            'extraction_time': datetime.now().isoformat()
+        }
     
     def extract_game_info(self):
         """提取游戏基本信息区域"""
@@ -276,7 +328,7 @@ class GameDetailExtractor:
         
         filepath = os.path.join(output_dir, filename)
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+            json_codec.dump(result, f)
         
         print(f"\n结果已保存到: {filepath}")
     
@@ -284,7 +336,11 @@ class GameDetailExtractor:
         """关闭浏览器"""
         if self.driver:
             print("正在关闭浏览器...")
-            self.driver.quit()
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+                self._pipeline = None
             print("浏览器已关闭")
 
 def main():
@@ -293,7 +349,7 @@ def main():
     # 读取游戏列表
     try:
         with open('scripts/output/all_games_continuous.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            data = json_codec.load(f)
         print(f"成功读取游戏列表，共 {data['total_games']} 个游戏")
     except Exception as e:
         print(f"读取游戏列表失败: {e}")
@@ -375,7 +431,7 @@ if __name__ == "__main__":
         # 保存结果
         output_file = "scripts/output/game_detail_headless_test.json"
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+            json_codec.dump(result, f)
         
         print(f"\n✅ 数据提取完成！结果已保存到: {output_file}")
         
@@ -2,11 +2,22 @@
 
 import requests
 from bs4 import BeautifulSoup
-import json
 import time
 import re
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
+from rate_limiter import get_rate_limiter
+import json_codec
+
+# 请求头，模拟真实浏览器
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
 
 def get_game_details_requests(url):
     """
@@ -15,51 +26,156 @@ def get_game_details_requests(url):
     """
     print(f"\n🚀 开始分析游戏: {url}")
     
-    # 设置请求头，模拟真实浏览器
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
-    
     try:
         # 发送HTTP请求
         print("📡 发送HTTP请求...")
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
+        html = fetch_game_html(url)
+        print(f"📄 页面大小: {len(html)} bytes")
         
-        print(f"✅ 页面获取成功，状态码: {response.status_code}")
-        print(f"📄 页面大小: {len(response.content)} bytes")
+        game_data = parse_game_details(html, url)
+        print("✅ 数据提取完成")
+        return game_data
         
-        # 解析HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
+    except requests.exceptions.RequestException as e:
+        print(f"❌ 网络请求失败: {str(e)}")
+        return None
+    except Exception as e:
+        print(f"❌ 数据提取失败: {str(e)}")
+        return None
+
+def fetch_game_html(url, session=None, timeout=15, cache=None):
+    """
+    获取游戏详情页HTML
+    
+    Args:
+        url (str): 游戏详情页URL
+        session (requests.Session): 可复用的会话，None时使用一次性请求
+        timeout (int): 超时时间(秒)
+        cache (HttpCache): 条件请求缓存，None时不使用缓存
         
-        # 提取游戏ID（从URL中获取）
-        game_id = extract_game_id_from_url(url)
+    Returns:
+        bytes: 页面原始内容，请求失败时抛出requests异常
+    """
+    html, _ = fetch_game_page(url, session=session, timeout=timeout, cache=cache)
+    return html
+
+def fetch_game_page(url, session=None, timeout=15, cache=None):
+    """
+    获取游戏详情页HTML，有缓存时带If-None-Match/If-Modified-Since重新验证
+    
+    Args:
+        url (str): 游戏详情页URL
+        session (requests.Session): 可复用的会话，None时使用一次性请求
+        timeout (int): 超时时间(秒)
+        cache (HttpCache): 条件请求缓存，None时不使用缓存
+        
+    Returns:
+        tuple: (页面原始内容, 是否为304未修改)，请求失败时抛出requests异常
+    """
+    http = session or requests
+    entry = cache.lookup(url) if cache else None
+    headers = dict(DEFAULT_HEADERS, **cache.conditional_headers(entry)) if entry else DEFAULT_HEADERS
+    
+    get_rate_limiter().acquire(url)
+    response = http.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and entry:
+        html = cache.load_body(url)
+        if html is not None:
+            return html, True
+        # 缓存条目在请求期间被淘汰，重新完整下载
+        get_rate_limiter().acquire(url)
+        response = http.get(url, headers=DEFAULT_HEADERS, timeout=timeout)
+    response.raise_for_status()
+    
+    if cache:
+        cache.store(url, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    return response.content, False
+
+def fetch_and_parse_game(url, game_info=None, session=None, timeout=15, cache=None):
+    """
+    获取并解析游戏详情页，页面未修改(304)时直接复用缓存的解析结果
+    
+    Args:
+        url (str): 游戏详情页URL
+        game_info (dict): 游戏列表中的基本信息
+        session (requests.Session): 可复用的会话
+        timeout (int): 超时时间(秒)
+        cache (HttpCache): 条件请求缓存，None时每次完整下载并解析
         
-        # 构建游戏数据结构
-        game_data = {
-            "basic_info": {
-                "id": game_id,
-                "name": "",
-                "url": url,
-                "company": "未知开发商",
-                "collected_at": datetime.now().isoformat()
-            },
-            "extraction_time": datetime.now().isoformat(),
+    Returns:
+        dict: 游戏详情数据，请求失败时抛出requests异常
+    """
+    html, not_modified = fetch_game_page(url, session=session, timeout=timeout, cache=cache)
+    if cache is None:
+        return parse_game_details(html, url, game_info)
+    
+    game_data = cache.load_parsed(url) if not_modified else None
+    cache.record(not_modified, parse_skipped=game_data is not None)
+    if game_data is not None:
+        return refresh_cached_details(game_data, game_info)
+    
+    game_data = parse_game_details(html, url, game_info)
+    cache.store_parsed(url, game_data)
+    return game_data
+
+def refresh_cached_details(game_data, game_info=None):
+    """
+    用本次的游戏基本信息和提取时间更新缓存的解析结果
+    
+    Args:
+        game_data (dict): 缓存的解析结果
+        game_info (dict): 本次的游戏基本信息，None时保留缓存中的
+        
+    Returns:
+        dict: 更新后的游戏详情数据
+    """
+    if game_info is not None:
+        game_data['basic_info'] = game_info
+    game_data['extraction_time'] = datetime.now().isoformat()
+    return game_data
+
+def parse_game_details(html, url, game_info=None):
+    """
+    从页面HTML解析游戏详情，字段结构与GameDetailExtractor.extract_game_details一致
+    
+    Args:
+        html (bytes or str): 页面HTML
+        url (str): 游戏详情页URL
+        game_info (dict): 游戏列表中的基本信息，None时从页面内容构造
+        
+    Returns:
+        dict: 游戏详情数据
+    """
+    # 解析HTML
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    if game_info is None:
+        # 提取游戏ID（从URL中获取）
+        basic_info = {
+            "id": extract_game_id_from_url(url),
+            "name": "",
             "url": url,
-            "game_info": extract_game_info(soup),
-            "genres": extract_genres(soup),
-            "tags": extract_tags(soup),
-            "thumbnails": extract_thumbnails(soup),
-            "iframe_code": extract_iframe_code(soup),
-            "description": extract_description(soup),
-            "instructions": extract_instructions(soup)
+            "company": "未知开发商",
+            "collected_at": datetime.now().isoformat()
         }
-        
+    else:
+        basic_info = game_info
+    
+    # 构建游戏数据结构
+    game_data = {
+        "basic_info": basic_info,
+        "extraction_time": datetime.now().isoformat(),
+        "url": url,
+        "game_info": extract_game_info(soup),
+        "genres": extract_genres(soup),
+        "tags": extract_tags(soup),
+        "thumbnails": extract_thumbnails(soup),
+        "iframe_code": extract_iframe_code(soup),
+        "description": extract_description(soup),
+        "instructions": extract_instructions(soup)
+    }
+    
+    if game_info is None:
         # 更新基本信息中的游戏名称
         if game_data["game_info"].get("title"):
             game_data["basic_info"]["name"] = game_data["game_info"]["title"]
@@ -67,16 +183,8 @@ def get_game_details_requests(url):
         # 更新发布商信息
         if game_data["game_info"].get("publisher"):
             game_data["basic_info"]["company"] = game_data["game_info"]["publisher"]
-        
-        print("✅ 数据提取完成")
-        return game_data
-        
-    except requests.exceptions.RequestException as e:
-        print(f"❌ 网络请求失败: {str(e)}")
-        return None
-    except Exception as e:
-        print(f"❌ 数据提取失败: {str(e)}")
-        return None
+    
+    return game_data
 
 def extract_game_id_from_url(url):
     """从URL中提取游戏ID"""
@@ -350,7 +458,7 @@ def test_single_game():
         # 保存测试结果
         output_file = "scripts/output/game_detail_requests_test.json"
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(game_data, f, ensure_ascii=False, indent=2)
+            json_codec.dump(game_data, f)
         
         print(f"💾 测试结果已保存到: {output_file}")
         
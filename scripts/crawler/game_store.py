@@ -0,0 +1,419 @@
+# scripts/crawler/game_store.py - 游戏详情提取结果的SQLite存储
+"""
+游戏详情存储
+提取结果按规范化URL每个游戏一行保存在SQLite中(同时记录global_id)，重复提取时覆盖写入(upsert)；
+名称、分类、发布商、提取时间、global_id和批次号都有索引，续传和查找不必再打开解析全部批次文件；
+output/batches/games_batch_NNN.json仍由导出函数按原有格式生成，供gameDataReorganizer.ts读取；
+batches表是增量维护的批次清单：每写入一个批次只更新受影响批次的元数据、编号范围、游戏键和内容哈希，
+续传、进度摘要和导出判断都只读清单，不需要解析完整的批次数据
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from url_canonicalizer import url_key
+import json_codec
+
+# 默认存储文件名，保存在提取器的输出目录中
+DEFAULT_STORE_FILENAME = 'games.db'
+
+# 批次清单列(旧版存储只有batch_number和metadata，打开时补齐)
+_MANIFEST_COLUMNS = (
+    ('total_games', 'INTEGER NOT NULL DEFAULT 0'),
+    ('success_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('start_id', 'INTEGER'),
+    ('end_id', 'INTEGER'),
+    ('game_keys', "TEXT NOT NULL DEFAULT '[]'"),
+    ('content_hash', 'TEXT'),
+    ('exported_hash', 'TEXT'),
+)
+
+
+def batch_filename(batch_number):
+    """批次文件名：games_batch_001.json"""
+    return f"games_batch_{batch_number:03d}.json"
+
+
+def parse_batch_number(filename):
+    """
+    从批次文件名解析批次号
+
+    Returns:
+        int: 批次号，不是批次文件时为None
+    """
+    if not (filename.startswith('games_batch_') and filename.endswith('.json')):
+        return None
+    try:
+        # games_batch_001.json -> 1
+        return int(filename.split('_')[2].split('.')[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def _game_fields(game):
+    """
+    取出需要建索引的字段
+
+    Returns:
+        dict: url、name、category、publisher、extraction_time、global_id
+    """
+    basic_info = game.get('basic_info') or {}
+    game_info = game.get('game_info') or {}
+    genres = game.get('genres') or []
+    game_id = game.get('game_id') or {}
+    return {
+        'url': game.get('url') or basic_info.get('url') or '',
+        'name': basic_info.get('name') or game_info.get('title'),
+        'category': genres[0] if genres else basic_info.get('category'),
+        'publisher': game_info.get('publisher') or basic_info.get('company'),
+        'extraction_time': game.get('extraction_time'),
+        'global_id': game_id.get('global_id'),
+    }
+
+
+class GameStore:
+    """游戏详情SQLite存储
+
+    以url_key(游戏页为站点:slug)为主键，同一游戏再次提取时覆盖原有行并移到新的批次
+    """
+
+    def __init__(self, db_path):
+        """
+        初始化存储
+
+        Args:
+            db_path (str): SQLite文件路径
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._connect()
+
+    def _connect(self):
+        """获取当前线程的SQLite连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS games ("
+                "url_key TEXT PRIMARY KEY, global_id INTEGER, url TEXT NOT NULL, name TEXT, "
+                "category TEXT, publisher TEXT, extraction_time TEXT, success INTEGER NOT NULL, "
+                "batch_number INTEGER NOT NULL, position INTEGER NOT NULL, data TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_global_id ON games (global_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_name ON games (name)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_category ON games (category)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_publisher ON games (publisher)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_extraction_time ON games (extraction_time)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_batch ON games (batch_number, position)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS batches ("
+                "batch_number INTEGER PRIMARY KEY, metadata TEXT NOT NULL, "
+                + ", ".join(f"{name} {decl}" for name, decl in _MANIFEST_COLUMNS) + ")"
+            )
+            self._local.conn = conn
+            self._upgrade_manifest(conn)
+        return conn
+
+    def _upgrade_manifest(self, conn):
+        """旧版存储的batches表补齐清单列，并为缺少内容哈希的批次生成清单"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(batches)")}
+        missing = [(name, decl) for name, decl in _MANIFEST_COLUMNS if name not in columns]
+        stale = [row[0] for row in conn.execute("SELECT batch_number FROM batches WHERE content_hash IS NULL")] \
+            if not missing else None
+        if not missing and not stale:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for name, decl in missing:
+                conn.execute(f"ALTER TABLE batches ADD COLUMN {name} {decl}")
+            if stale is None:
+                stale = [row[0] for row in conn.execute("SELECT batch_number FROM batches")]
+            for batch_number in stale:
+                self._refresh_manifest(conn, batch_number)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _refresh_manifest(self, conn, batch_number):
+        """
+        重新计算一个批次的清单(游戏数、成功数、编号范围、游戏键、内容哈希)，只读取该批次的行
+
+        Args:
+            conn (sqlite3.Connection): 已在事务中的连接
+            batch_number (int): 批次号
+        """
+        digest = hashlib.sha256()
+        keys, ids = [], []
+        success = 0
+        for key, global_id, ok, data in conn.execute(
+            "SELECT url_key, global_id, success, data FROM games WHERE batch_number = ? ORDER BY position",
+            (batch_number,)
+        ):
+            keys.append(key)
+            if global_id is not None:
+                ids.append(global_id)
+            success += ok
+            digest.update(data.encode('utf-8') + b'\n')
+        conn.execute(
+            "UPDATE batches SET total_games = ?, success_count = ?, start_id = ?, end_id = ?, "
+            "game_keys = ?, content_hash = ? WHERE batch_number = ?",
+            (len(keys), success, min(ids) if ids else None, max(ids) if ids else None,
+             json_codec.dumps(keys), digest.hexdigest(), batch_number)
+        )
+
+    def save_batch(self, batch_number, games, metadata):
+        """
+        在一个事务中写入一个批次的游戏和批次元数据，已有的游戏覆盖写入
+
+        Args:
+            batch_number (int): 批次号
+            games (list): 提取结果，顺序即批次文件中的顺序
+            metadata (dict): 批次文件的metadata
+
+        Returns:
+            tuple: (写入的游戏数量, 游戏被移到本批次的其他批次号集合)
+        """
+        rows = []
+        for position, game in enumerate(games):
+            fields = _game_fields(game)
+            if not fields['url']:
+                continue
+            rows.append((url_key(fields['url']), fields['global_id'], fields['url'], fields['name'],
+                         fields['category'], fields['publisher'], fields['extraction_time'],
+                         1 if game.get('success', False) else 0, batch_number, position,
+                         json_codec.dumps(game)))
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            moved_from = set()
+            keys = [row[0] for row in rows]
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                moved_from.update(row[0] for row in conn.execute(
+                    f"SELECT DISTINCT batch_number FROM games WHERE batch_number != ? "
+                    f"AND url_key IN ({','.join('?' * len(chunk))})", [batch_number] + chunk
+                ))
+            conn.executemany(
+                "INSERT INTO games (url_key, global_id, url, name, category, publisher, extraction_time, "
+                "success, batch_number, position, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url_key) DO UPDATE SET global_id = excluded.global_id, url = excluded.url, "
+                "name = excluded.name, category = excluded.category, publisher = excluded.publisher, "
+                "extraction_time = excluded.extraction_time, success = excluded.success, "
+                "batch_number = excluded.batch_number, position = excluded.position, data = excluded.data",
+                rows
+            )
+            conn.execute(
+                "INSERT INTO batches (batch_number, metadata) VALUES (?, ?) "
+                "ON CONFLICT (batch_number) DO UPDATE SET metadata = excluded.metadata",
+                (batch_number, json_codec.dumps(metadata))
+            )
+            # 增量更新清单：只有本批次和被移走游戏的批次
+            for number in {batch_number} | moved_from:
+                self._refresh_manifest(conn, number)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows), moved_from
+
+    def is_empty(self):
+        """存储中是否还没有任何批次"""
+        return self._connect().execute("SELECT 1 FROM batches LIMIT 1").fetchone() is None
+
+    def processed_names(self):
+        """
+        已提取的游戏名称，续传时跳过
+
+        Returns:
+            set: 游戏名称集合
+        """
+        rows = self._connect().execute("SELECT name FROM games WHERE name IS NOT NULL").fetchall()
+        return {row[0] for row in rows}
+
+    def next_batch_number(self):
+        """
+        Returns:
+            int: 已有最大批次号+1，没有批次时为1
+        """
+        row = self._connect().execute("SELECT MAX(batch_number) FROM batches").fetchone()
+        return (row[0] or 0) + 1
+
+    def get_by_url(self, url):
+        """按URL(规范化后)查找游戏，未找到时为None"""
+        row = self._connect().execute("SELECT data FROM games WHERE url_key = ?", (url_key(url),)).fetchone()
+        return json_codec.loads(row[0]) if row else None
+
+    def get_by_global_id(self, global_id):
+        """按全局编号查找游戏，未找到时为None"""
+        row = self._connect().execute(
+            "SELECT data FROM games WHERE global_id = ? LIMIT 1", (global_id,)
+        ).fetchone()
+        return json_codec.loads(row[0]) if row else None
+
+    def find(self, name=None, category=None, publisher=None, extracted_after=None, limit=None):
+        """
+        按索引字段查询游戏
+
+        Args:
+            name (str): 游戏名称(精确匹配)
+            category (str): 分类
+            publisher (str): 发布商
+            extracted_after (str): 只返回提取时间(ISO格式)晚于该值的游戏
+            limit (int): 最多返回数量，None表示不限
+
+        Returns:
+            list: 游戏提取结果，按提取时间倒序
+        """
+        conditions, params = [], []
+        for column, value in (('name', name), ('category', category), ('publisher', publisher)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if extracted_after is not None:
+            conditions.append("extraction_time > ?")
+            params.append(extracted_after)
+        sql = "SELECT data FROM games"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY extraction_time DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [json_codec.loads(row[0]) for row in self._connect().execute(sql, params)]
+
+    def iter_batch_games(self, batch_number):
+        """
+        按批次内顺序流式读取一个批次的游戏
+
+        Yields:
+            dict: 游戏提取结果
+        """
+        cursor = self._connect().execute(
+            "SELECT data FROM games WHERE batch_number = ? ORDER BY position", (batch_number,)
+        )
+        for row in cursor:
+            yield json_codec.loads(row[0])
+
+    def batch_summaries(self):
+        """
+        从批次清单读取各批次的元数据和实际游戏数(重新提取的游戏会移到新批次，清单随之更新)
+
+        Returns:
+            list: [(batch_number, metadata, total_games, success_count)]，按批次号升序
+        """
+        return [(batch_number, json_codec.loads(metadata), total, success)
+                for batch_number, metadata, total, success in self._connect().execute(
+                    "SELECT batch_number, metadata, total_games, success_count FROM batches ORDER BY batch_number"
+                )]
+
+    def batch_manifest(self, batch_number):
+        """
+        读取一个批次的清单
+
+        Returns:
+            dict: batch_number、metadata、total_games、success_count、game_id_range、
+                  game_keys、content_hash，批次不存在时为None
+        """
+        row = self._connect().execute(
+            "SELECT metadata, total_games, success_count, start_id, end_id, game_keys, content_hash "
+            "FROM batches WHERE batch_number = ?", (batch_number,)
+        ).fetchone()
+        if row is None:
+            return None
+        metadata, total, success, start_id, end_id, game_keys, content_hash = row
+        return {
+            'batch_number': batch_number,
+            'metadata': json_codec.loads(metadata),
+            'total_games': total,
+            'success_count': success,
+            'game_id_range': {'start_id': start_id, 'end_id': end_id},
+            'game_keys': json_codec.loads(game_keys),
+            'content_hash': content_hash
+        }
+
+    def export_batch(self, batch_number, batch_dir):
+        """
+        按原有批次文件格式导出一个批次，先写临时文件再原子替换
+
+        Args:
+            batch_number (int): 批次号
+            batch_dir (str): 批次文件目录
+
+        Returns:
+            str: 批次文件路径，批次不存在时为None
+        """
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT metadata, content_hash FROM batches WHERE batch_number = ?", (batch_number,)
+        ).fetchone()
+        if row is None:
+            return None
+        metadata = json_codec.loads(row[0])
+        games = list(self.iter_batch_games(batch_number))
+        metadata['total_games'] = len(games)
+        metadata['success_count'] = len([g for g in games if g.get('success', False)])
+
+        os.makedirs(batch_dir, exist_ok=True)
+        file_path = os.path.join(batch_dir, batch_filename(batch_number))
+        temp_path = f"{file_path}.tmp"
+        json_codec.save_json(temp_path, {"metadata": metadata, "games": games})
+        os.replace(temp_path, file_path)
+        conn.execute("UPDATE batches SET exported_hash = ? WHERE batch_number = ?", (row[1], batch_number))
+        return file_path
+
+    def export_batches(self, batch_dir, only_changed=True):
+        """
+        导出批次文件
+
+        Args:
+            batch_dir (str): 批次文件目录
+            only_changed (bool): 只导出内容哈希与上次导出不同或文件不存在的批次
+
+        Returns:
+            list: 本次导出的批次文件路径
+        """
+        exported = []
+        for batch_number, content_hash, exported_hash in self._connect().execute(
+            "SELECT batch_number, content_hash, exported_hash FROM batches ORDER BY batch_number"
+        ).fetchall():
+            file_path = os.path.join(batch_dir, batch_filename(batch_number))
+            if only_changed and content_hash == exported_hash and os.path.exists(file_path):
+                continue
+            exported.append(self.export_batch(batch_number, batch_dir))
+        return exported
+
+    def import_batch_files(self, batch_dir):
+        """
+        把已有的批次文件导入存储(首次使用存储时迁移)，按批次号升序导入，后面批次中的同一游戏覆盖前面的
+
+        Args:
+            batch_dir (str): 批次文件目录
+
+        Returns:
+            int: 导入的游戏数量
+        """
+        if not os.path.isdir(batch_dir):
+            return 0
+        batch_files = {}
+        for filename in os.listdir(batch_dir):
+            batch_number = parse_batch_number(filename)
+            if batch_number is not None:
+                batch_files[batch_number] = os.path.join(batch_dir, filename)
+
+        imported = 0
+        for batch_number in sorted(batch_files):
+            with open(batch_files[batch_number], 'r', encoding='utf-8') as f:
+                data = json_codec.load(f)
+            imported += self.save_batch(batch_number, data.get('games', []), data.get('metadata', {}))[0]
+        return imported
+
+    def close(self):
+        """关闭当前线程的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,425 @@
+# scripts/crawler/gamedistribution_api.py - GameDistribution列表分页接口的捕获与直接分页
+"""
+GameDistribution列表分页接口
+浏览器只用来翻一次页：从CDP性能日志里找到AJAX分页发出的JSON请求，
+定位请求中的页码(或偏移量)字段，之后用requests直接并发请求各页，不再点击"下一页"；
+捕获到的接口保存到本地，下次运行无需再启动浏览器
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from game_detail_requests import DEFAULT_HEADERS
+from rate_limiter import get_rate_limiter
+from known_urls import EarlyStop, DEFAULT_STOP_AFTER
+from url_canonicalizer import classify_url, KIND_GAME
+import json_codec
+
+logger = logging.getLogger(__name__)
+
+GAMEDISTRIBUTION_BASE_URL = "https://gamedistribution.com"
+GAMEDISTRIBUTION_GAMES_URL = "https://gamedistribution.com/games/"
+DEFAULT_ENDPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output',
+                                     'gamedistribution_api_endpoint.json')
+
+# 页码/偏移量字段名
+PAGE_KEYS = re.compile(r'^(page|pageNumber|page_number|pageIndex|page_index|currentPage|p)$', re.IGNORECASE)
+OFFSET_KEYS = re.compile(r'^(offset|skip|from|start)$', re.IGNORECASE)
+
+# 重放请求时不复制的请求头(由requests自行生成)
+_SKIP_HEADERS = {'content-length', 'host', 'cookie', 'accept-encoding', 'connection'}
+
+
+def enable_network_log(chrome_options):
+    """为Chrome启动参数开启性能日志，捕获接口前必须调用"""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def _iter_network_events(driver):
+    """读取并清空浏览器性能日志，产出(method, params)"""
+    for entry in driver.get_log('performance'):
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        yield message.get('method'), message.get('params', {})
+
+
+def find_game_list(data):
+    """
+    在接口返回的JSON中找到游戏列表：包含名称和slug/链接字段的字典组成的最长列表
+
+    Returns:
+        list: 游戏字典列表，找不到时为空列表
+    """
+    best = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            items = [item for item in node if isinstance(item, dict)]
+            if items and len(items) > len(best) and all(
+                    ('title' in item or 'name' in item) and ('slug' in item or 'url' in item or 'link' in item)
+                    for item in items):
+                best = items
+            stack.extend(node)
+    return best
+
+
+def _company_name(item):
+    """从游戏字典中取开发商名称"""
+    for key in ('company', 'developer', 'publisher', 'author'):
+        value = item.get(key)
+        if isinstance(value, dict):
+            value = value.get('name') or value.get('title')
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return "未知开发商"
+
+
+def to_game_record(item):
+    """
+    把接口返回的游戏字典转换为与get_games_from_current_page相同结构的记录
+
+    Returns:
+        dict: {id, name, url, company, collected_at}，url为规范化后的地址，id为游戏slug；
+            缺少slug和游戏链接时返回None
+    """
+    info = classify_url(item.get('url') or item.get('link') or '', GAMEDISTRIBUTION_GAMES_URL)
+    if (info is None or info.kind != KIND_GAME) and item.get('slug'):
+        info = classify_url(f"/games/{item['slug']}", GAMEDISTRIBUTION_BASE_URL)
+    if info is None or info.kind != KIND_GAME:
+        return None
+
+    game_id = info.key.split(':', 1)[1]
+    name = item.get('title') or item.get('name') or game_id.replace('-', ' ').title()
+    return {
+        'id': game_id,
+        'name': name.strip() if isinstance(name, str) else str(name),
+        'url': info.url,
+        'company': _company_name(item),
+        'collected_at': datetime.now().isoformat()
+    }
+
+
+def _find_page_field(node, ui_page, path=()):
+    """
+    在JSON结构中查找页码或偏移量字段
+
+    Returns:
+        tuple: (字段路径, 类型'page'/'offset', 参数)，找不到时返回None；
+            page类型的参数为页码偏差(接口页码 - 界面页码)，offset类型的参数为每页数量
+    """
+    if isinstance(node, dict):
+        items = node.items()
+    elif isinstance(node, list):
+        items = enumerate(node)
+    else:
+        return None
+
+    for key, value in items:
+        if isinstance(value, (dict, list)):
+            found = _find_page_field(value, ui_page, path + (key,))
+            if found:
+                return found
+            continue
+        if isinstance(value, str) and value.startswith(('{', '[')):
+            # GraphQL的GET请求把variables编码成JSON字符串
+            try:
+                found = _find_page_field(json.loads(value), ui_page, path + (key, '__json__'))
+            except ValueError:
+                found = None
+            if found:
+                return found
+            continue
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(key, str) and PAGE_KEYS.match(key) and number in (ui_page, ui_page - 1):
+            return path + (key,), 'page', number - ui_page
+        if isinstance(key, str) and OFFSET_KEYS.match(key) and number > 0:
+            return path + (key,), 'offset', number // (ui_page - 1)
+    return None
+
+
+def _set_path(node, path, value):
+    """按路径写入字段，保持原值的类型(字符串或数字)"""
+    key = path[0]
+    if len(path) > 1 and path[1] == '__json__':
+        inner = json.loads(node[key])
+        _set_path(inner, path[2:], value)
+        node[key] = json.dumps(inner, separators=(',', ':'))
+        return
+    if len(path) > 1:
+        _set_path(node[key], path[1:], value)
+        return
+    node[key] = str(value) if isinstance(node[key], str) else value
+
+
+class ListingEndpoint:
+    """捕获到的分页接口，可按页码生成请求"""
+
+    def __init__(self, url, method='GET', headers=None, body=None, location='query',
+                 path=(), kind='page', param=0):
+        """
+        Args:
+            url (str): 接口URL(含查询参数)
+            method (str): 请求方法
+            headers (dict): 重放时带的请求头
+            body (str): POST请求体(JSON字符串)
+            location (str): 页码字段所在位置，'query'或'body'
+            path (tuple): 页码字段在查询参数或请求体中的路径
+            kind (str): 'page'表示页码，'offset'表示偏移量
+            param (int): page类型为页码偏差，offset类型为每页数量
+        """
+        self.url = url
+        self.method = method.upper()
+        self.headers = headers or {}
+        self.body = body
+        self.location = location
+        self.path = tuple(path)
+        self.kind = kind
+        self.param = param
+
+    def field_value(self, page):
+        """界面上第page页(从1开始)对应的字段值"""
+        if self.kind == 'offset':
+            return (page - 1) * self.param
+        return page + self.param
+
+    def request_for(self, page):
+        """
+        生成第page页的请求参数
+
+        Returns:
+            tuple: (method, url, body)
+        """
+        value = self.field_value(page)
+        if self.location == 'query':
+            parts = urlsplit(self.url)
+            query = dict(parse_qsl(parts.query, keep_blank_values=True))
+            _set_path(query, self.path, value)
+            return self.method, urlunsplit(parts._replace(query=urlencode(query))), self.body
+        data = json.loads(self.body)
+        _set_path(data, self.path, value)
+        return self.method, self.url, json.dumps(data, separators=(',', ':'))
+
+    def to_dict(self):
+        return {
+            'url': self.url, 'method': self.method, 'headers': self.headers, 'body': self.body,
+            'location': self.location, 'path': list(self.path), 'kind': self.kind, 'param': self.param,
+            'captured_at': datetime.now().isoformat()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['url'], data.get('method', 'GET'), data.get('headers'), data.get('body'),
+                   data.get('location', 'query'), data.get('path', ()), data.get('kind', 'page'),
+                   data.get('param', 0))
+
+    @classmethod
+    def from_request(cls, request, ui_page):
+        """
+        从CDP记录的请求中定位页码字段
+
+        Args:
+            request (dict): Network.requestWillBeSent中的request
+            ui_page (int): 这次请求对应的界面页码
+
+        Returns:
+            ListingEndpoint: 找不到页码字段时返回None
+        """
+        headers = {key: value for key, value in request.get('headers', {}).items()
+                   if key.lower() not in _SKIP_HEADERS and not key.startswith(':')}
+        url = request['url']
+        query = dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+        found = _find_page_field(query, ui_page)
+        if found:
+            return cls(url, request.get('method', 'GET'), headers, request.get('postData'), 'query', *found)
+
+        body = request.get('postData')
+        if body:
+            try:
+                found = _find_page_field(json.loads(body), ui_page)
+            except ValueError:
+                found = None
+            if found:
+                return cls(url, request.get('method', 'POST'), headers, body, 'body', *found)
+        return None
+
+
+def capture_listing_endpoint(driver, click_next, ui_page=2, timeout=15):
+    """
+    触发一次AJAX翻页，从CDP网络日志中找出返回游戏列表的JSON请求
+
+    Args:
+        driver (WebDriver): 已开启性能日志(enable_network_log)并停在列表第ui_page-1页的浏览器
+        click_next (callable): 点击下一页的函数，参数为driver，返回是否成功
+        ui_page (int): 翻页后的界面页码
+        timeout (float): 等待接口响应的最长时间(秒)
+
+    Returns:
+        ListingEndpoint: 捕获失败时返回None
+    """
+    list(_iter_network_events(driver))  # 丢弃翻页之前的日志
+    if not click_next(driver):
+        return None
+
+    requests_by_id = {}
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        for method, params in _iter_network_events(driver):
+            if method == 'Network.requestWillBeSent' and params.get('type') in ('XHR', 'Fetch'):
+                requests_by_id[params['requestId']] = params['request']
+            elif method == 'Network.loadingFinished' and params.get('requestId') in requests_by_id:
+                request = requests_by_id[params['requestId']]
+                try:
+                    body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+                    games = find_game_list(json.loads(body.get('body', '')))
+                except Exception:
+                    continue
+                if not games:
+                    continue
+                endpoint = ListingEndpoint.from_request(request, ui_page)
+                if endpoint:
+                    logger.info(f"捕获到分页接口: {endpoint.method} {endpoint.url} ({len(games)} 个游戏/页)")
+                    return endpoint
+        time.sleep(0.2)
+
+    logger.warning("未能从网络日志中捕获分页接口")
+    return None
+
+
+def save_endpoint(endpoint, path=DEFAULT_ENDPOINT_PATH):
+    """保存捕获的接口，下次运行直接使用"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json_codec.dump(endpoint.to_dict(), f, pretty=True)
+
+
+def load_endpoint(path=DEFAULT_ENDPOINT_PATH):
+    """读取已保存的接口，不存在或格式错误时返回None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return ListingEndpoint.from_dict(json_codec.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"读取分页接口失败: {e}")
+        return None
+
+
+class ListingApiClient:
+    """直接并发请求分页接口"""
+
+    def __init__(self, endpoint, concurrency=8, timeout=15, retries=2):
+        """
+        Args:
+            endpoint (ListingEndpoint): 分页接口
+            concurrency (int): 同时请求的页数
+            timeout (int): 单个请求超时时间(秒)
+            retries (int): 单页失败后的重试次数
+        """
+        self.endpoint = endpoint
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.retries = retries
+        self.rate_limiter = get_rate_limiter()
+        self._local = threading.local()
+
+    def _session(self):
+        """每个线程一个会话，复用连接"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            session.headers.update(self.endpoint.headers)
+            self._local.session = session
+        return session
+
+    def fetch_page(self, page):
+        """
+        请求一页
+
+        Returns:
+            list: 游戏记录，请求多次失败时返回None
+        """
+        method, url, body = self.endpoint.request_for(page)
+        for attempt in range(self.retries + 1):
+            try:
+                self.rate_limiter.acquire(url)
+                response = self._session().request(method, url, data=body, timeout=self.timeout)
+                response.raise_for_status()
+                records = (to_game_record(item) for item in find_game_list(response.json()))
+                return [record for record in records if record]
+            except (requests.exceptions.RequestException, ValueError) as e:
+                if attempt == self.retries:
+                    logger.warning(f"第 {page} 页接口请求失败: {e}")
+                    return None
+                time.sleep(0.5 * (attempt + 1))
+
+    def iter_pages(self, start_page=1, max_failures=3, known_index=None, stop_after=DEFAULT_STOP_AFTER):
+        """
+        并发请求各页，按页码顺序产出，直到某一页没有新游戏
+
+        Args:
+            start_page (int): 起始页码
+            max_failures (int): 连续多少页请求失败后放弃
+            known_index (KnownUrlIndex): 增量模式的已知URL索引，只产出索引中没有的游戏，
+                连续stop_after页没有新游戏时停止(列表需按发布时间倒序)
+            stop_after (int): 增量模式下连续多少页没有新游戏后停止
+
+        Yields:
+            tuple: (页码, 本页新出现的游戏记录)
+        """
+        seen = set()
+        failures = 0
+        early_stop = EarlyStop(stop_after) if known_index is not None else None
+        window = min(self.concurrency, stop_after) if early_stop else self.concurrency
+        next_submit = start_page
+        next_page = start_page
+        futures = {}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                while True:
+                    while len(futures) < window:
+                        futures[next_submit] = executor.submit(self.fetch_page, next_submit)
+                        next_submit += 1
+
+                    records = futures.pop(next_page).result()
+                    if records is None:
+                        failures += 1
+                        if failures >= max_failures:
+                            logger.warning(f"连续 {failures} 页请求失败，停止分页")
+                            return
+                        next_page += 1
+                        continue
+
+                    failures = 0
+                    new_records = [record for record in records if record['url'] not in seen]
+                    if not new_records:
+                        logger.info(f"第 {next_page} 页没有新游戏，列表结束")
+                        return
+                    seen.update(record['url'] for record in new_records)
+                    if known_index is not None:
+                        unknown = set(known_index.unknown(record['url'] for record in new_records))
+                        new_records = [record for record in new_records if record['url'] in unknown]
+                    yield next_page, new_records
+                    next_page += 1
+                    if early_stop and early_stop.observe(len(new_records)):
+                        logger.info(f"连续 {early_stop.quiet_pages} 页都是已知游戏，增量分页结束")
+                        return
+            finally:
+                for future in futures.values():
+                    future.cancel()
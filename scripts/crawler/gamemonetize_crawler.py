@@ -6,9 +6,6 @@ GameMonetize热门游戏采集器 - 采集500个热门游戏列表并测试详
 """
 
 import requests
-import time
-import json
-import random
 import re
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
@@ -19,6 +16,14 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import logging
+from rate_limiter import get_rate_limiter
+from listing_discovery import ListingDiscovery
+from url_canonicalizer import dedupe_game_urls
+from url_frontier import get_url_frontier, worker_id, PRIORITY_HOT
+from resource_blocker import apply_browser_options, install_resource_blocking
+from link_harvester import harvest_hrefs
+from page_wait import wait_for_page_ready, GAMEMONETIZE_DETAIL_SELECTORS, GAMEMONETIZE_LISTING_SELECTORS
+import json_codec
 
 # 配置日志
 logging.basicConfig(
@@ -34,11 +39,22 @@ logger = logging.getLogger(__name__)
 class GameMonetizeHotGamesCrawler:
     """GameMonetize热门游戏采集器"""
     
+    # 放行的资源(类别名或URL模式)，默认拦截图片、字体、媒体、统计脚本和游戏iframe内容
+    RESOURCE_ALLOW = ()
+    
+    # 共享URL队列中详情页可访问性检测的队列名(两个热门采集器共用)
+    FRONTIER_QUEUE = 'gamemonetize_access'
+    # 与热门游戏采集器相同：已检测的游戏检测超过6小时才以刷新优先级重新检测
+    REFRESH_AFTER_SECONDS = 6 * 3600
+    
     def __init__(self):
         self.base_url = "https://gamemonetize.com"
         self.games_url = "https://gamemonetize.com/games"
         self.session = requests.Session()
         self.driver = None
+        self.rate_limiter = get_rate_limiter()  # 本机共享的按主机令牌桶
+        self.discovery = ListingDiscovery(self.games_url, self.base_url)  # 列表页URL发现不启动浏览器
+        self.frontier = get_url_frontier()  # 跨采集器共享的持久化URL队列
         self.hot_games = []
         self.failed_games = []
         
@@ -59,12 +75,13 @@ class GameMonetizeHotGamesCrawler:
             chrome_options.add_argument('--headless')  # 无头模式
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-images')  # 禁用图片加载
+            apply_browser_options(chrome_options, self.RESOURCE_ALLOW)  # CDP拦截图片等资源，替代被Chrome忽略的--disable-images
             chrome_options.add_argument('--window-size=1280,720')
             chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
             
             self.driver = webdriver.Chrome(options=chrome_options)
             self.driver.set_page_load_timeout(30)
+            install_resource_blocking(self.driver, self.RESOURCE_ALLOW)
             logger.info("Chrome驱动初始化成功")
             return True
         except Exception as e:
@@ -83,12 +100,12 @@ class GameMonetizeHotGamesCrawler:
             
             # 方法2：分页获取更多热门游戏
             if len(hot_games_urls) < 500:
-                paginated_urls = self._get_paginated_games(500 - len(hot_games_urls))
+                paginated_urls = self._get_paginated_games(500 - len(hot_games_urls), known_urls=hot_games_urls)
                 hot_games_urls.extend(paginated_urls)
                 logger.info(f"通过分页获取到 {len(paginated_urls)} 个游戏")
             
             # 去重并限制数量
-            unique_urls = list(dict.fromkeys(hot_games_urls))  # 保持顺序去重
+            unique_urls = dedupe_game_urls(hot_games_urls)  # 规范化后按游戏键保持顺序去重，过滤非游戏链接
             return unique_urls[:500]
             
         except Exception as e:
@@ -99,65 +116,27 @@ class GameMonetizeHotGamesCrawler:
         """获取首页推荐游戏"""
         urls = []
         try:
+            self.rate_limiter.acquire(self.base_url)
             self.driver.get(self.base_url)
-            time.sleep(3)
+            wait_for_page_ready(self.driver, GAMEMONETIZE_LISTING_SELECTORS, ready_states=('complete',))
             
             # 查找首页所有游戏链接
-            game_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/game') or contains(@href, '-game')]")
-            
-            for link in game_links[:100]:  # 首页最多100个
-                href = link.get_attribute('href')
-                if href:
-                    urls.append(href)
+            # 一次脚本调用取回全部链接，首页最多100个
+            urls = harvest_hrefs(self.driver, By.XPATH, "//a[contains(@href, '/game') or contains(@href, '-game')]",
+                                 limit=100)
                     
         except Exception as e:
             logger.warning(f"获取首页推荐游戏失败: {e}")
         
         return urls
     
-    def _get_paginated_games(self, needed_count):
-        """通过分页获取更多游戏"""
-        urls = []
-        page = 1
-        max_pages = 20  # 最多20页
-        
+    def _get_paginated_games(self, needed_count, known_urls=()):
+        """并发请求列表页获取更多游戏(HTTP，不经过浏览器)，直到某一页没有新游戏"""
         try:
-            while len(urls) < needed_count and page <= max_pages:
-                page_url = f"{self.games_url}?page={page}"
-                logger.info(f"正在获取第 {page} 页游戏...")
-                
-                try:
-                    self.driver.get(page_url)
-                    time.sleep(2)
-                    
-                    # 查找游戏链接
-                    game_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/game') or contains(@href, '-game')]")
-                    
-                    page_urls = []
-                    for link in game_links:
-                        href = link.get_attribute('href')
-                        if href and href not in urls:
-                            page_urls.append(href)
-                    
-                    if not page_urls:  # 如果这一页没有找到游戏，停止
-                        logger.info(f"第 {page} 页没有找到游戏，停止分页获取")
-                        break
-                    
-                    urls.extend(page_urls)
-                    logger.info(f"第 {page} 页获取到 {len(page_urls)} 个游戏")
-                    
-                    page += 1
-                    time.sleep(random.uniform(1, 3))  # 随机延迟
-                    
-                except Exception as e:
-                    logger.warning(f"获取第 {page} 页失败: {e}")
-                    page += 1
-                    continue
-                    
+            return self.discovery.discover(limit=needed_count, known_urls=known_urls)
         except Exception as e:
             logger.error(f"分页获取游戏失败: {e}")
-        
-        return urls
+            return []
     
     def extract_game_basic_info(self, game_url):
         """从游戏列表页面提取基本信息"""
@@ -186,8 +165,9 @@ class GameMonetizeHotGamesCrawler:
         try:
             logger.info(f"测试访问游戏详情页: {game_url}")
             
+            self.rate_limiter.acquire(game_url)
             self.driver.get(game_url)
-            time.sleep(3)
+            wait_for_page_ready(self.driver, GAMEMONETIZE_DETAIL_SELECTORS)
             
             # 检查页面是否正常加载
             page_title = self.driver.title
@@ -304,12 +284,22 @@ class GameMonetizeHotGamesCrawler:
             logger.error("浏览器驱动初始化失败，无法继续")
             return False
         
+        worker = worker_id('gamemonetize_hot')
+        claimed_urls = set()
         try:
-            # 获取热门游戏URL列表
-            game_urls = self.get_hot_games_urls()
-            logger.info(f"获取到 {len(game_urls)} 个游戏URL")
-            
-            if not game_urls:
+            # 队列中已有足够待检测的URL时直接继续，不再重新获取热门列表
+            pending = self.frontier.pending_count(self.FRONTIER_QUEUE)
+            if pending >= target_count:
+                logger.info(f"从URL队列恢复: {pending} 个待处理游戏")
+            else:
+                # 获取热门游戏URL列表
+                game_urls = self.get_hot_games_urls()
+                # 已检测过的游戏超过刷新间隔才重新排队，排在未检测的游戏之后
+                added = self.frontier.add(self.FRONTIER_QUEUE, game_urls, priority=PRIORITY_HOT,
+                                          refresh_after=self.REFRESH_AFTER_SECONDS)
+                logger.info(f"获取到 {len(game_urls)} 个游戏URL，新加入队列 {added} 个")
+            
+            if not self.frontier.pending_count(self.FRONTIER_QUEUE):
                 logger.error("未获取到任何游戏URL")
                 return False
             
@@ -317,14 +307,22 @@ class GameMonetizeHotGamesCrawler:
             processed_count = 0
             success_count = 0
             
-            for i, game_url in enumerate(game_urls[:target_count], 1):
-                logger.info(f"处理游戏 {i}/{min(len(game_urls), target_count)}: {game_url}")
+            while processed_count < target_count:
+                # 逐个领取，与同时运行的其他采集器共享同一队列
+                claimed = self.frontier.claim(self.FRONTIER_QUEUE, worker)
+                if not claimed:
+                    break
+                game_url = claimed[0]['url']
+                claimed_urls.add(game_url)
+                logger.info(f"处理游戏 {processed_count + 1}/{target_count}: {game_url}")
                 
                 try:
                     # 提取基本信息
                     game_info = self.extract_game_basic_info(game_url)
                     if not game_info:
                         self.failed_games.append({"url": game_url, "reason": "提取基本信息失败"})
+                        self.frontier.fail(self.FRONTIER_QUEUE, game_url, "提取基本信息失败")
+                        claimed_urls.discard(game_url)
                         continue
                     
                     # 测试详情页面访问
@@ -336,6 +334,7 @@ class GameMonetizeHotGamesCrawler:
                             "detail_info": detail_result
                         })
                         self.hot_games.append(game_info)
+                        self.frontier.complete(self.FRONTIER_QUEUE, game_url)
                         success_count += 1
                         logger.info(f"✓ 游戏 {game_info['name']} 处理成功 (质量分: {detail_result.get('quality_score', 0)})")
                     else:
@@ -344,13 +343,12 @@ class GameMonetizeHotGamesCrawler:
                             "error_reason": detail_result
                         })
                         self.failed_games.append(game_info)
+                        self.frontier.fail(self.FRONTIER_QUEUE, game_url, detail_result)
                         logger.warning(f"✗ 游戏详情页面不可访问: {detail_result}")
                     
+                    claimed_urls.discard(game_url)
                     processed_count += 1
                     
-                    # 添加延迟避免被封
-                    time.sleep(random.uniform(1, 3))
-                    
                     # 每处理50个游戏保存一次
                     if processed_count % 50 == 0:
                         self.save_progress()
@@ -359,18 +357,24 @@ class GameMonetizeHotGamesCrawler:
                 except Exception as e:
                     logger.error(f"处理游戏失败 {game_url}: {e}")
                     self.failed_games.append({"url": game_url, "reason": str(e)})
+                    self.frontier.fail(self.FRONTIER_QUEUE, game_url, e)
+                    claimed_urls.discard(game_url)
                     continue
             
             # 最终保存
             self.save_results()
             
             logger.info(f"采集完成！总计处理 {processed_count} 个游戏，成功 {success_count} 个，失败 {len(self.failed_games)} 个")
+            logger.info(f"URL队列状态: {self.frontier.get_stats(self.FRONTIER_QUEUE)}")
             return True
             
         except Exception as e:
             logger.error(f"采集过程中发生错误: {e}")
             return False
         finally:
+            # 已领取但未处理完的URL放回队列
+            for game_url in claimed_urls:
+                self.frontier.release(self.FRONTIER_QUEUE, game_url)
             if self.driver:
                 self.driver.quit()
     
@@ -382,12 +386,12 @@ class GameMonetizeHotGamesCrawler:
             # 保存成功的游戏
             if self.hot_games:
                 with open(f"gamemonetize_hot_games_progress_{timestamp}.json", 'w', encoding='utf-8') as f:
-                    json.dump(self.hot_games, f, ensure_ascii=False, indent=2)
+                    json_codec.dump(self.hot_games, f)
             
             # 保存失败的游戏
             if self.failed_games:
                 with open(f"gamemonetize_failed_games_progress_{timestamp}.json", 'w', encoding='utf-8') as f:
-                    json.dump(self.failed_games, f, ensure_ascii=False, indent=2)
+                    json_codec.dump(self.failed_games, f)
                     
         except Exception as e:
             logger.error(f"保存进度失败: {e}")
@@ -400,14 +404,14 @@ class GameMonetizeHotGamesCrawler:
             # 保存成功的游戏列表
             success_file = f"gamemonetize_hot_games_{timestamp}.json"
             with open(success_file, 'w', encoding='utf-8') as f:
-                json.dump(self.hot_games, f, ensure_ascii=False, indent=2)
+                json_codec.dump(self.hot_games, f)
             logger.info(f"成功游戏列表已保存到: {success_file}")
             
             # 保存失败的游戏列表
             if self.failed_games:
                 failed_file = f"gamemonetize_failed_games_{timestamp}.json"
                 with open(failed_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.failed_games, f, ensure_ascii=False, indent=2)
+                    json_codec.dump(self.failed_games, f)
                 logger.info(f"失败游戏列表已保存到: {failed_file}")
             
             # 生成统计报告
@@ -448,7 +452,7 @@ class GameMonetizeHotGamesCrawler:
             
             report_file = f"gamemonetize_crawl_report_{timestamp}.json"
             with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=2)
+                json_codec.dump(report, f, pretty=True)
             
             logger.info(f"采集报告已生成: {report_file}")
             logger.info(f"采集统计: 成功 {len(self.hot_games)}/{total_games} ({success_rate:.2f}%)")
@@ -8,10 +8,9 @@ GameMonetize增强版游戏采集器 - 采集完整的游戏信息
 
 import requests
 import time
-import json
-import random
 import re
-from datetime import datetime
+from datetime import datetime, timezone
+from itertools import islice
 from urllib.parse import urljoin, urlparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -20,6 +19,19 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import logging
+from rate_limiter import get_rate_limiter
+from resource_blocker import apply_browser_options, install_resource_blocking
+from page_wait import load_page, get_wait_stats, GAMEMONETIZE_DETAIL_SELECTORS
+from tab_pipeline import TabPipeline
+from page_snapshot import PageSnapshot
+from listing_discovery import ListingDiscovery
+from url_canonicalizer import is_game_url, url_key
+from sitemap_discovery import SitemapDiscovery, load_last_crawl, save_last_crawl
+from known_urls import get_known_url_index
+from url_frontier import get_url_frontier, worker_id, PRIORITY_NEW, DEFAULT_REFRESH_AFTER_SECONDS
+from discovery_feed import DiscoveryFeed, dedupe_batches, DEFAULT_MAX_PENDING
+from checkpoint_store import CheckpointStore
+import json_codec
 
 # 配置日志
 logging.basicConfig(
@@ -35,13 +47,43 @@ logger = logging.getLogger(__name__)
 class GameMonetizeEnhancedCrawler:
     """GameMonetize增强版游戏采集器"""
     
-    def __init__(self):
+    # 放行的资源(类别名或URL模式)，默认拦截图片、字体、媒体、统计脚本和游戏iframe内容
+    RESOURCE_ALLOW = ()
+    
+    # 共享URL队列中详情提取任务的队列名，以及每次领取的数量
+    FRONTIER_QUEUE = 'gamemonetize_detail'
+    CLAIM_BATCH = 20
+    # 重新发现的已完成游戏完成超过该秒数时以刷新优先级重新采集，排在新游戏之后
+    REFRESH_AFTER_SECONDS = DEFAULT_REFRESH_AFTER_SECONDS
+    
+    def __init__(self, snapshot_mode=True, tabs=1, url_source='listing', incremental=False):
+        """
+        Args:
+            snapshot_mode (bool): 页面加载后只取一次page_source，在本地lxml树上完成所有提取；
+                False时每个选择器都直接查询浏览器
+            tabs (int): 详情页同时加载的标签页数，大于1时启用多标签页流水线
+            url_source (str): 游戏URL来源，'listing'为并发请求列表页，'sitemap'为流式解析站点地图
+            incremental (bool): 增量采集：sitemap来源只采集lastmod晚于上次采集的游戏；
+                列表来源只采集已知URL索引中没有的游戏，连续几页都是已知游戏即停止翻页
+        """
         self.base_url = "https://gamemonetize.com"
         self.games_url = "https://gamemonetize.com/games"
         self.session = requests.Session()
         self.driver = None
+        self.snapshot_mode = snapshot_mode
+        self.tabs = tabs
+        self.url_source = url_source
+        self.incremental = incremental
+        self.since = load_last_crawl(self.base_url) if incremental else None
+        self.known_index = get_known_url_index()  # 成功采集的游戏写入索引，供增量发现使用
+        self.frontier = get_url_frontier()  # 跨采集器共享的持久化URL队列
+        self.sitemap_complete = False  # 本次运行是否已把sitemap全部加入队列，只有这时才推进增量时间点
+        self._page = None  # 提取函数查询的页面：快照模式下为PageSnapshot，否则为driver
+        self.rate_limiter = get_rate_limiter()  # 本机共享的按主机令牌桶
+        self.discovery = ListingDiscovery(self.games_url, self.base_url)  # 列表页URL发现不启动浏览器
         self.games = []
         self.failed_games = []
+        self.checkpoint = CheckpointStore('gamemonetize_enhanced')  # 逐条追加的检查点，结束时合并为结果文件
         
         # 配置请求头
         self.session.headers.update({
@@ -57,15 +99,19 @@ class GameMonetizeEnhancedCrawler:
         """设置Chrome浏览器驱动"""
         try:
             chrome_options = Options()
+            if self.tabs > 1:
+                chrome_options.page_load_strategy = 'none'  # driver.get立即返回，由流水线轮询就绪状态
             chrome_options.add_argument('--headless')  # 无头模式
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-dev-shm-usage')
             chrome_options.add_argument('--window-size=1280,720')
             chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-            # 不禁用图片加载，因为需要获取缩略图
+            # 拦截图片等资源，缩略图URL仍可从DOM的src属性读取
+            apply_browser_options(chrome_options, self.RESOURCE_ALLOW)
             
             self.driver = webdriver.Chrome(options=chrome_options)
             self.driver.set_page_load_timeout(30)
+            install_resource_blocking(self.driver, self.RESOURCE_ALLOW)
             logger.info("Chrome驱动初始化成功")
             return True
         except Exception as e:
@@ -73,120 +119,117 @@ class GameMonetizeEnhancedCrawler:
             return False
     
     def get_game_urls(self, target_count=500):
-        """获取游戏URL列表"""
-        game_urls = []
-        
+        """获取游戏URL列表(HTTP并发请求首页和列表页，或流式解析sitemap，不使用浏览器)"""
         try:
-            # 方法1：获取首页推荐游戏
-            featured_urls = self._get_featured_games()
-            game_urls.extend(featured_urls)
-            logger.info(f"获取到 {len(featured_urls)} 个首页推荐游戏")
-            
-            # 方法2：分页获取更多游戏
-            if len(game_urls) < target_count:
-                paginated_urls = self._get_paginated_games(target_count - len(game_urls))
-                game_urls.extend(paginated_urls)
-                logger.info(f"通过分页获取到 {len(paginated_urls)} 个游戏")
-            
-            # 去重并限制数量
-            unique_urls = list(dict.fromkeys(game_urls))
-            return unique_urls[:target_count]
-            
+            urls = (url for batch in self.iter_game_url_batches(target_count) for url in batch)
+            return list(islice(urls, target_count))
         except Exception as e:
             logger.error(f"获取游戏URL列表失败: {e}")
             return []
     
-    def _get_featured_games(self):
-        """获取首页推荐游戏"""
-        urls = []
-        try:
-            self.driver.get(self.base_url)
-            time.sleep(3)
-            
-            # 查找首页所有游戏链接
-            game_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/game') or contains(@href, '-game')]")
-            
-            for link in game_links[:100]:
-                href = link.get_attribute('href')
-                if href and self._is_valid_game_url(href):
-                    urls.append(href)
-                    
-        except Exception as e:
-            logger.warning(f"获取首页推荐游戏失败: {e}")
+    def iter_game_url_batches(self, target_count=500):
+        """
+        分批产出游戏URL，每得到一批(首页推荐、一页列表或一段sitemap)就产出，供边发现边提取
         
-        return urls
-    
-    def _get_paginated_games(self, needed_count):
-        """通过分页获取更多游戏"""
-        urls = []
-        page = 1
-        max_pages = 20
+        Yields:
+            list: 规范化并跨批次按游戏键去重的游戏URL；列表来源总数不超过target_count，
+                sitemap来源产出全部(筛选后的)条目，由领取端限制采集数量
+        """
+        if self.url_source == 'sitemap':
+            self.sitemap_complete = False
+            sitemap = SitemapDiscovery(self.base_url)
+            entries = sitemap.iter_game_urls(since=self.since)
+            batches = self._chunk((url for url, _ in entries), self.CLAIM_BATCH)
+            if self.since:
+                logger.info(f"从sitemap获取lastmod晚于 {self.since.isoformat()} 的游戏")
+            # 不按target_count截断：增量时间点推进后，未入队的条目下次会被跳过
+            yield from dedupe_batches(batches)
+            # 有子sitemap请求或解析失败时其中的条目可能未入队，不能推进增量时间点
+            self.sitemap_complete = sitemap.is_complete()
+            return
         
-        try:
-            while len(urls) < needed_count and page <= max_pages:
-                page_url = f"{self.games_url}?page={page}"
-                logger.info(f"正在获取第 {page} 页游戏...")
-                
-                try:
-                    self.driver.get(page_url)
-                    time.sleep(2)
-                    
-                    # 查找游戏链接
-                    game_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/game') or contains(@href, '-game')]")
-                    
-                    page_urls = []
-                    for link in game_links:
-                        href = link.get_attribute('href')
-                        if href and self._is_valid_game_url(href) and href not in urls:
-                            page_urls.append(href)
-                    
-                    if not page_urls:
-                        logger.info(f"第 {page} 页没有找到游戏，停止分页获取")
-                        break
-                    
-                    urls.extend(page_urls)
-                    logger.info(f"第 {page} 页获取到 {len(page_urls)} 个游戏")
-                    
-                    page += 1
-                    time.sleep(random.uniform(1, 3))
-                    
-                except Exception as e:
-                    logger.warning(f"获取第 {page} 页失败: {e}")
-                    page += 1
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"分页获取游戏失败: {e}")
+        yield from dedupe_batches(self._iter_listing_batches(target_count), limit=target_count)
+    
+    def _iter_listing_batches(self, target_count):
+        """首页推荐一批，之后每个列表页一批"""
+        # 方法1：获取首页推荐游戏
+        featured_urls = self._get_featured_games()
+        logger.info(f"获取到 {len(featured_urls)} 个首页推荐游戏")
+        game_urls = self.known_index.unknown(featured_urls) if self.incremental else list(featured_urls)
+        yield game_urls
         
-        return urls
+        # 方法2：分页获取更多游戏
+        if len(game_urls) < target_count:
+            try:
+                known_index = self.known_index if self.incremental else None
+                yield from self.discovery.iter_discover(limit=target_count - len(game_urls),
+                                                        known_urls=featured_urls, known_index=known_index)
+            except Exception as e:
+                logger.error(f"分页获取游戏失败: {e}")
+    
+    @staticmethod
+    def _chunk(urls, size):
+        """把URL流切成固定大小的批次"""
+        batch = []
+        for url in urls:
+            batch.append(url)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def _get_featured_games(self):
+        """获取首页推荐游戏"""
+        return self.discovery.discover_featured()[:100]  # 首页最多100个
     
     def _is_valid_game_url(self, url):
         """检查是否是有效的游戏URL"""
-        if not url or url == self.base_url or url == self.games_url:
-            return False
-        
-        # 排除非游戏页面
-        exclude_patterns = [
-            '/games$', '/games/$', '/game-walkthrough', '/games-editor-picks',
-            '/login', '/register', '/contact', '/about', '/privacy', '/terms'
-        ]
-        
-        for pattern in exclude_patterns:
-            if re.search(pattern, url):
-                return False
-        
-        return True
+        return is_game_url(url)
     
     def extract_complete_game_info(self, game_url):
         """提取完整的游戏信息"""
+        logger.info(f"正在提取游戏信息: {game_url}")
         try:
-            logger.info(f"正在提取游戏信息: {game_url}")
+            self.rate_limiter.acquire(game_url)
+            load_page(self.driver, game_url, GAMEMONETIZE_DETAIL_SELECTORS)
+            return self._extract_loaded_page(game_url)
             
-            self.driver.get(game_url)
-            time.sleep(3)
+        except Exception as e:
+            logger.error(f"提取游戏信息失败 {game_url}: {e}")
+            return None
+    
+    def extract_games_pipelined(self, game_urls):
+        """
+        多标签页流水线提取，同一浏览器同时加载self.tabs个详情页，哪个先就绪先提取哪个
+        
+        Args:
+            game_urls (list): 游戏详情页URL列表
+            
+        Yields:
+            tuple: (game_url, 完整游戏信息或None)
+        """
+        pipeline = TabPipeline(self.driver, tabs=self.tabs, ready_selectors=GAMEMONETIZE_DETAIL_SELECTORS,
+                               resource_allow=self.RESOURCE_ALLOW)
+        try:
+            for game_url, game_info, _ in pipeline.run(game_urls, url_of=lambda url: url,
+                                                       extract=self._extract_loaded_page):
+                yield game_url, game_info
+        finally:
+            pipeline.close_tabs()
+    
+    def _extract_loaded_page(self, game_url):
+        """从当前标签页已加载的详情页提取完整游戏信息"""
+        try:
+            # 快照模式：一次取回页面源码，之后的_extract_*都不再与浏览器往返
+            extract_start = time.time()
+            if self.snapshot_mode:
+                self._page = PageSnapshot(self.driver.page_source, self.driver.current_url)
+            else:
+                self._page = self.driver
             
             # 检查页面是否正常加载
-            page_title = self.driver.title
+            page_title = self._page.title
             if "404" in page_title or "Not Found" in page_title:
                 return None
             
@@ -237,6 +280,8 @@ class GameMonetizeEnhancedCrawler:
                 )
             }
             
+            logger.info(f"页面信息提取耗时 {(time.time() - extract_start) * 1000:.0f}ms "
+                        f"({'快照' if self.snapshot_mode else '浏览器'}模式)")
             return complete_game_info
             
         except Exception as e:
@@ -293,7 +338,7 @@ class GameMonetizeEnhancedCrawler:
     def _extract_iframe_info(self):
         """提取iframe信息和尺寸"""
         try:
-            iframe_element = self.driver.find_element(By.TAG_NAME, "iframe")
+            iframe_element = self._page.find_element(By.TAG_NAME, "iframe")
             
             src = iframe_element.get_attribute("src")
             width = iframe_element.get_attribute("width") or "800"
@@ -344,7 +389,7 @@ class GameMonetizeEnhancedCrawler:
             
             for selector in img_selectors:
                 try:
-                    img_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    img_elements = self._page.find_elements(By.CSS_SELECTOR, selector)
                     for img in img_elements:
                         src = img.get_attribute('src')
                         alt = img.get_attribute('alt') or ""
@@ -426,7 +471,7 @@ class GameMonetizeEnhancedCrawler:
             
             for selector in category_selectors:
                 try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    elements = self._page.find_elements(By.CSS_SELECTOR, selector)
                     for element in elements:
                         text = element.text.strip()
                         if text and text not in categories:
@@ -458,7 +503,7 @@ class GameMonetizeEnhancedCrawler:
             
             for selector in tag_selectors:
                 try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    elements = self._page.find_elements(By.CSS_SELECTOR, selector)
                     for element in elements:
                         text = element.text.strip()
                         if text and text not in tags and len(text) > 1:
@@ -470,7 +515,7 @@ class GameMonetizeEnhancedCrawler:
             
             # 从meta keywords中提取
             try:
-                meta_keywords = self.driver.find_element(By.CSS_SELECTOR, 'meta[name="keywords"]')
+                meta_keywords = self._page.find_element(By.CSS_SELECTOR, 'meta[name="keywords"]')
                 keywords = meta_keywords.get_attribute('content')
                 if keywords:
                     keyword_list = [k.strip() for k in keywords.split(',')]
@@ -498,7 +543,7 @@ class GameMonetizeEnhancedCrawler:
             
             for selector in size_selectors:
                 try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    elements = self._page.find_elements(By.CSS_SELECTOR, selector)
                     for element in elements:
                         text = element.text.strip()
                         # 查找尺寸模式 (如 800x600, 1024x768等)
@@ -509,7 +554,7 @@ class GameMonetizeEnhancedCrawler:
             
             # 从页面文本中查找常见游戏尺寸
             try:
-                page_text = self.driver.find_element(By.TAG_NAME, 'body').text
+                page_text = self._page.find_element(By.TAG_NAME, 'body').text
                 common_sizes = re.findall(r'\b(?:800x600|1024x768|1280x720|1920x1080|512x384|960x640)\b', page_text)
                 sizes.extend(common_sizes)
             except:
@@ -529,11 +574,11 @@ class GameMonetizeEnhancedCrawler:
             metadata = {}
             
             # 页面标题
-            metadata['page_title'] = self.driver.title
+            metadata['page_title'] = self._page.title
             
             # meta描述
             try:
-                meta_desc = self.driver.find_element(By.CSS_SELECTOR, 'meta[name="description"]')
+                meta_desc = self._page.find_element(By.CSS_SELECTOR, 'meta[name="description"]')
                 metadata['meta_description'] = meta_desc.get_attribute('content')
             except:
                 metadata['meta_description'] = ""
@@ -562,7 +607,7 @@ class GameMonetizeEnhancedCrawler:
         """通过多个选择器查找文本"""
         for selector in selectors:
             try:
-                element = self.driver.find_element(By.CSS_SELECTOR, selector)
+                element = self._page.find_element(By.CSS_SELECTOR, selector)
                 text = element.text.strip()
                 if text:
                     return text
@@ -579,7 +624,7 @@ class GameMonetizeEnhancedCrawler:
                 "mobile-friendly", "mobile-compatible"
             ]
             
-            page_text = self.driver.find_element(By.TAG_NAME, 'body').text.lower()
+            page_text = self._page.find_element(By.TAG_NAME, 'body').text.lower()
             
             for indicator in mobile_indicators:
                 if indicator in page_text:
@@ -601,7 +646,7 @@ class GameMonetizeEnhancedCrawler:
             languages = []
             for selector in lang_selectors:
                 try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    elements = self._page.find_elements(By.CSS_SELECTOR, selector)
                     for element in elements:
                         text = element.text.strip()
                         if text:
@@ -622,8 +667,8 @@ class GameMonetizeEnhancedCrawler:
         """从上下文推断分类"""
         try:
             # 从URL和标题推断分类
-            url_lower = self.driver.current_url.lower()
-            title_lower = self.driver.title.lower()
+            url_lower = self._page.current_url.lower()
+            title_lower = self._page.title.lower()
             
             category_keywords = {
                 "action": ["action", "fight", "battle", "war", "shoot"],
@@ -726,104 +771,157 @@ class GameMonetizeEnhancedCrawler:
     def crawl_games(self, target_count=500):
         """采集游戏"""
         logger.info(f"开始采集 {target_count} 个游戏的完整信息...")
+        started_at = datetime.now(timezone.utc)
         
+        # 上次中断时从检查点恢复已采集的记录，本次运行不再重复采集这些游戏
+        self.games, self.failed_games = self.checkpoint.start()
+        restored_keys = {url_key(item['url']) for item in self.games + self.failed_games if item.get('url')}
+        
+        # 队列中已有足够待采集的URL时直接继续，不再重新发现；
+        # 否则在后台边发现边入队，提取不必等待完整的URL列表
+        feed = None
+        pending = self.frontier.pending_count(self.FRONTIER_QUEUE)
+        if pending >= target_count:
+            logger.info(f"从URL队列恢复: {pending} 个待采集游戏")
+        else:
+            # sitemap来源全部入队不暂停(条目只是URL)，采集数量由领取端的target_count限制
+            max_pending = None if self.url_source == 'sitemap' else DEFAULT_MAX_PENDING
+            feed = DiscoveryFeed(self.frontier, self.FRONTIER_QUEUE, self.iter_game_url_batches(target_count),
+                                 priority=PRIORITY_NEW, max_pending=max_pending,
+                                 refresh_after=self.REFRESH_AFTER_SECONDS).start()
+        
+        # 浏览器启动与URL发现同时进行
         if not self.setup_driver():
             logger.error("浏览器驱动初始化失败，无法继续")
+            if feed:
+                feed.stop()
             return False
         
+        worker = worker_id('gamemonetize_enhanced')
+        claimed_urls = set()
         try:
-            # 获取游戏URL列表
-            game_urls = self.get_game_urls(target_count)
-            logger.info(f"获取到 {len(game_urls)} 个游戏URL")
+            # 处理每个游戏(恢复的记录计入已处理)
+            processed_count = len(self.games) + len(self.failed_games)
+            success_count = len(self.games)
+            
+            while processed_count < target_count:
+                # 分批领取，其他采集器同时运行时不会领到同一个URL
+                claimed = self.frontier.claim(self.FRONTIER_QUEUE, worker,
+                                              limit=min(self.CLAIM_BATCH, target_count - processed_count))
+                if not claimed:
+                    # 队列暂时为空但发现仍在进行时等待下一批
+                    if feed and feed.wait_for_urls():
+                        continue
+                    break
+                if feed:
+                    feed.notify_claimed()
+                game_urls = []
+                for item in claimed:
+                    if url_key(item['url']) in restored_keys:
+                        # 中断前已处理并写入检查点，只补记队列状态
+                        self.frontier.complete(self.FRONTIER_QUEUE, item['url'])
+                    else:
+                        game_urls.append(item['url'])
+                claimed_urls.update(game_urls)
+                if not game_urls:
+                    continue
+                
+                # 多标签页时按完成顺序产出，否则逐个加载提取
+                if self.tabs > 1:
+                    extracted = self.extract_games_pipelined(game_urls)
+                else:
+                    extracted = ((game_url, self.extract_complete_game_info(game_url)) for game_url in game_urls)
+                
+                for game_url, game_info in extracted:
+                    claimed_urls.discard(game_url)
+                    logger.info(f"处理游戏 {processed_count + 1}/{target_count}: {game_url}")
+                    
+                    try:
+                        if game_info:
+                            self._record_success(game_info)
+                            self.known_index.add([game_url], source='gamemonetize')
+                            self.frontier.complete(self.FRONTIER_QUEUE, game_url)
+                            success_count += 1
+                            logger.info(f"✓ 游戏 {game_info['basic_info']['name']} 处理成功 (质量分: {game_info['quality_score']})")
+                        else:
+                            self._record_failure({"url": game_url, "reason": "提取信息失败"})
+                            self.frontier.fail(self.FRONTIER_QUEUE, game_url, "提取信息失败")
+                            logger.warning(f"✗ 游戏信息提取失败")
+                        
+                        processed_count += 1
+                        
+                        # 每50个游戏保存一次进度
+                        if processed_count % 50 == 0:
+                            self.save_progress()
+                            logger.info(f"已处理 {processed_count} 个游戏，成功 {success_count} 个")
+                        
+                    except Exception as e:
+                        logger.error(f"处理游戏失败 {game_url}: {e}")
+                        self._record_failure({"url": game_url, "reason": str(e)})
+                        self.frontier.fail(self.FRONTIER_QUEUE, game_url, e)
+                        continue
             
-            if not game_urls:
+            if processed_count == 0:
                 logger.error("未获取到任何游戏URL")
                 return False
             
-            # 处理每个游戏
-            processed_count = 0
-            success_count = 0
-            
-            for i, game_url in enumerate(game_urls, 1):
-                logger.info(f"处理游戏 {i}/{len(game_urls)}: {game_url}")
-                
-                try:
-                    # 提取完整游戏信息
-                    game_info = self.extract_complete_game_info(game_url)
-                    
-                    if game_info:
-                        self.games.append(game_info)
-                        success_count += 1
-                        logger.info(f"✓ 游戏 {game_info['basic_info']['name']} 处理成功 (质量分: {game_info['quality_score']})")
-                    else:
-                        self.failed_games.append({"url": game_url, "reason": "提取信息失败"})
-                        logger.warning(f"✗ 游戏信息提取失败")
-                    
-                    processed_count += 1
-                    
-                    # 每50个游戏保存一次进度
-                    if processed_count % 50 == 0:
-                        self.save_progress()
-                        logger.info(f"已处理 {processed_count} 个游戏，成功 {success_count} 个")
-                    
-                    # 随机延迟
-                    time.sleep(random.uniform(1, 3))
-                    
-                except Exception as e:
-                    logger.error(f"处理游戏失败 {game_url}: {e}")
-                    self.failed_games.append({"url": game_url, "reason": str(e)})
-                    continue
-            
             # 保存最终结果
             self.save_results()
+            if self.url_source == 'sitemap':
+                if feed:
+                    feed.wait()  # 等待剩余的sitemap条目全部入队
+                if self.sitemap_complete:
+                    save_last_crawl(self.base_url, started_at)  # 下次增量采集以本次开始时间为界
+                else:
+                    logger.warning("sitemap未全部加入队列或有sitemap失败，保留上次的增量时间点，剩余条目下次继续")
             
             logger.info(f"采集完成！总共处理 {processed_count} 个游戏，成功 {success_count} 个，失败 {len(self.failed_games)} 个")
+            logger.info(f"URL队列状态: {self.frontier.get_stats(self.FRONTIER_QUEUE)}")
             return True
             
         except Exception as e:
             logger.error(f"采集过程出错: {e}")
             return False
         finally:
+            if feed:
+                feed.stop()
+            self.checkpoint.close()
+            # 已领取但未处理的URL放回队列，下次启动或其他采集器可以立即领取
+            for game_url in claimed_urls:
+                self.frontier.release(self.FRONTIER_QUEUE, game_url)
+            wait_stats = get_wait_stats()
+            logger.info(f"页面就绪统计: {wait_stats['pages']}页 | 平均{wait_stats['avg_seconds']}秒 | "
+                        f"最长{wait_stats['max_seconds']}秒 | 未就绪{wait_stats['timeouts']}次")
             if self.driver:
                 self.driver.quit()
     
+    def _record_success(self, game_info):
+        """记录成功采集的游戏，并立即追加到检查点"""
+        self.games.append(game_info)
+        self.checkpoint.record_success(game_info)
+    
+    def _record_failure(self, failure):
+        """记录失败的游戏，并立即追加到检查点"""
+        self.failed_games.append(failure)
+        self.checkpoint.record_failure(failure)
+    
     def save_progress(self):
-        """保存进度"""
+        """保存进度：记录已逐条写入检查点日志，这里只更新清单中的计数"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            # 保存成功的游戏
-            if self.games:
-                success_file = f"gamemonetize_enhanced_games_progress_{timestamp}.json"
-                with open(success_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.games, f, ensure_ascii=False, indent=2)
-                logger.info(f"进度已保存到 {success_file}")
-            
-            # 保存失败的游戏
-            if self.failed_games:
-                failed_file = f"gamemonetize_enhanced_failed_progress_{timestamp}.json"
-                with open(failed_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.failed_games, f, ensure_ascii=False, indent=2)
-                logger.info(f"失败记录已保存到 {failed_file}")
-                
+            self.checkpoint.save_manifest(len(self.games), len(self.failed_games))
+            logger.info(f"检查点已更新: {self.checkpoint.manifest_path}")
         except Exception as e:
             logger.error(f"保存进度失败: {e}")
     
     def save_results(self):
-        """保存最终结果"""
+        """保存最终结果：把检查点日志合并为带时间戳的结果文件"""
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            # 保存成功的游戏
             success_file = f"gamemonetize_enhanced_games_{timestamp}.json"
-            with open(success_file, 'w', encoding='utf-8') as f:
-                json.dump(self.games, f, ensure_ascii=False, indent=2)
-            logger.info(f"成功游戏数据已保存到 {success_file}")
-            
-            # 保存失败的游戏
             failed_file = f"gamemonetize_enhanced_failed_{timestamp}.json"
-            with open(failed_file, 'w', encoding='utf-8') as f:
-                json.dump(self.failed_games, f, ensure_ascii=False, indent=2)
+            self.checkpoint.finalize(success_file, failed_file)
+            logger.info(f"成功游戏数据已保存到 {success_file}")
             logger.info(f"失败游戏记录已保存到 {failed_file}")
             
             # 生成统计报告
@@ -878,7 +976,7 @@ class GameMonetizeEnhancedCrawler:
             
             report_file = f"gamemonetize_enhanced_report_{timestamp}.json"
             with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=2)
+                json_codec.dump(report, f, pretty=True)
             
             logger.info(f"统计报告已保存到 {report_file}")
             logger.info(f"采集完成：成功 {len(self.games)} 个，失败 {len(self.failed_games)} 个，成功率 {success_rate:.2f}%")
@@ -887,11 +985,29 @@ class GameMonetizeEnhancedCrawler:
             logger.error(f"生成报告失败: {e}")
 
 def main():
-    """主函数"""
-    crawler = GameMonetizeEnhancedCrawler()
+    """
+    主函数 - 支持命令行参数
+
+    使用方法:
+    python gamemonetize_enhanced_crawler.py                          # 列表页发现，采集500个游戏
+    python gamemonetize_enhanced_crawler.py --target 2000 --tabs 4   # 采集2000个，同时加载4个标签页
+    python gamemonetize_enhanced_crawler.py --url-source sitemap --incremental  # 只采集上次之后更新的游戏
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description='GameMonetize增强版游戏采集器')
+    parser.add_argument('--target', type=int, default=500, help='本次采集的游戏数量，默认500')
+    parser.add_argument('--tabs', type=int, default=1, help='详情页同时加载的标签页数，默认1')
+    parser.add_argument('--url-source', choices=['listing', 'sitemap'], default='listing',
+                        help='游戏URL来源: listing为并发请求列表页(默认)，sitemap为流式解析站点地图')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量采集: sitemap来源只采集上次采集后更新的游戏，列表来源只采集新游戏')
+    args = parser.parse_args()
+
+    crawler = GameMonetizeEnhancedCrawler(tabs=args.tabs, url_source=args.url_source,
+                                          incremental=args.incremental)
     
     # 开始采集
-    success = crawler.crawl_games(target_count=500)
+    success = crawler.crawl_games(target_count=args.target)
     
     if success:
         print("✅ 采集任务完成！")
@@ -6,9 +6,6 @@ GameMonetize热门游戏采集器 - 采集500个热门游戏列表并测试详
 """
 
 import requests
-import time
-import json
-import random
 import re
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
@@ -19,6 +16,18 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from rate_limiter import get_rate_limiter
+from listing_discovery import ListingDiscovery
+from url_frontier import get_url_frontier, worker_id, PRIORITY_HOT
+from url_canonicalizer import url_key
+from discovery_feed import DiscoveryFeed, dedupe_batches
+from checkpoint_store import CheckpointStore
+from resource_blocker import apply_browser_options, install_resource_blocking
+from link_harvester import harvest_links, harvest_hrefs
+from page_wait import wait_for_page_ready, GAMEMONETIZE_DETAIL_SELECTORS
+import json_codec
 
 # 配置日志
 logging.basicConfig(
@@ -34,13 +43,37 @@ logger = logging.getLogger(__name__)
 class GameMonetizeHotGamesCrawler:
     """GameMonetize热门游戏采集器"""
     
+    # 放行的资源(类别名或URL模式)，默认拦截图片、字体、媒体、统计脚本和游戏iframe内容
+    RESOURCE_ALLOW = ()
+    
+    # 共享URL队列中详情页可访问性检测的队列名(两个热门采集器共用)
+    FRONTIER_QUEUE = 'gamemonetize_access'
+    # 热门列表变化较快，重新获取到的已检测游戏检测超过6小时才以刷新优先级重新检测(排在未检测的游戏之后)；
+    # 间隔内不重复检测另一个热门采集器刚完成的游戏
+    REFRESH_AFTER_SECONDS = 6 * 3600
+    
+    # 热门来源(键, 日志名称)，按优先级排列，合并时靠前来源的游戏排在前面
+    HOT_SOURCES = (
+        ('trending', 'Trending'),
+        ('hot', 'Hot分类'),
+        ('editors', "Editor's Picks"),
+        ('featured', '首页推荐'),
+        ('paginated', '分页'),
+    )
+    HOT_GAMES_LIMIT = 500
+    GAME_LINK_XPATH = "//a[contains(@href, '/game') or contains(@href, '-game')]"
+    
     def __init__(self):
         self.base_url = "https://gamemonetize.com"
         self.games_url = "https://gamemonetize.com/games"
         self.session = requests.Session()
         self.driver = None
+        self.rate_limiter = get_rate_limiter()  # 本机共享的按主机令牌桶
+        self.discovery = ListingDiscovery(self.games_url, self.base_url)  # 列表页URL发现不启动浏览器
+        self.frontier = get_url_frontier()  # 跨采集器共享的持久化URL队列
         self.hot_games = []
         self.failed_games = []
+        self.checkpoint = CheckpointStore('gamemonetize_hot_games')  # 逐条追加的检查点，结束时合并为结果文件
         
         # 配置请求头
         self.session.headers.update({
@@ -59,13 +92,13 @@ class GameMonetizeHotGamesCrawler:
             chrome_options.add_argument('--headless')  # 无头模式
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-images')  # 禁用图片加载
-            chrome_options.add_argument('--disable-javascript')  # 禁用JS（如果不需要）
+            apply_browser_options(chrome_options, self.RESOURCE_ALLOW)  # CDP拦截图片等资源，替代被Chrome忽略的--disable-images
             chrome_options.add_argument('--window-size=1280,720')
             chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
             
             self.driver = webdriver.Chrome(options=chrome_options)
             self.driver.set_page_load_timeout(30)
+            install_resource_blocking(self.driver, self.RESOURCE_ALLOW)
             logger.info("Chrome驱动初始化成功")
             return True
         except Exception as e:
@@ -74,211 +107,160 @@ class GameMonetizeHotGamesCrawler:
     
     def get_hot_games_urls(self):
         """获取热门游戏的URL列表"""
-        hot_games_urls = []
-        
         try:
-            # 方法1：尝试获取Trending Games
-            trending_urls = self._get_trending_games()
-            hot_games_urls.extend(trending_urls)
-            logger.info(f"获取到 {len(trending_urls)} 个Trending游戏")
-            
-            # 方法2：获取Hot Games分类
-            hot_urls = self._get_hot_category_games()
-            hot_games_urls.extend(hot_urls)
-            logger.info(f"获取到 {len(hot_urls)} 个Hot分类游戏")
-            
-            # 方法3：获取Editor's Picks
-            editor_urls = self._get_editors_picks()
-            hot_games_urls.extend(editor_urls)
-            logger.info(f"获取到 {len(editor_urls)} 个Editor's Picks游戏")
-            
-            # 方法4：获取首页推荐游戏
-            featured_urls = self._get_featured_games()
-            hot_games_urls.extend(featured_urls)
-            logger.info(f"获取到 {len(featured_urls)} 个首页推荐游戏")
-            
-            # 方法5：分页获取更多热门游戏
-            if len(hot_games_urls) < 500:
-                paginated_urls = self._get_paginated_games(500 - len(hot_games_urls))
-                hot_games_urls.extend(paginated_urls)
-                logger.info(f"通过分页获取到 {len(paginated_urls)} 个游戏")
-            
-            # 去重并限制数量
-            unique_urls = list(dict.fromkeys(hot_games_urls))  # 保持顺序去重
-            return unique_urls[:500]
-            
+            return [url for batch in self.iter_hot_games_url_batches() for url in batch]
         except Exception as e:
             logger.error(f"获取热门游戏URL列表失败: {e}")
             return []
     
-    def _get_trending_games(self):
+    def iter_hot_games_url_batches(self):
+        """
+        分批产出热门游戏URL，供边发现边检测
+        
+        各来源(Trending、Hot分类、Editor's Picks、首页推荐、分页)并发采集，每个来源用HTTP请求
+        自己的页面，不经过浏览器；按来源优先级顺序产出，前面的来源完成即可产出，
+        分页来源每处理完一页产出一批，采集耗时取决于最慢的来源
+        
+        Yields:
+            list: 规范化并跨批次按游戏键去重的游戏URL，总数不超过HOT_GAMES_LIMIT
+        """
+        yield from dedupe_batches(self._iter_source_batches(), limit=self.HOT_GAMES_LIMIT)
+    
+    def _iter_source_batches(self):
+        """按来源优先级产出各来源的URL"""
+        pages = queue.Queue()
+        
+        def paginated():
+            # 分页来源与其他来源同时开始，按总数取游戏，重复部分在去重时去掉
+            try:
+                for batch in self.discovery.iter_discover(limit=self.HOT_GAMES_LIMIT):
+                    pages.put(batch)
+            except Exception as e:
+                logger.error(f"分页获取游戏失败: {e}")
+            finally:
+                pages.put(None)
+        
+        with ThreadPoolExecutor(max_workers=len(self.HOT_SOURCES) + 1) as executor:
+            # Trending和首页推荐都取自首页，只请求一次
+            home_page = executor.submit(self.discovery.fetch_snapshot, self.base_url)
+            sources = {
+                'trending': lambda: self._get_trending_games(home_page.result()),
+                'hot': self._get_hot_category_games,
+                'editors': self._get_editors_picks,
+                'featured': lambda: self._get_featured_games(home_page.result()),
+                'paginated': paginated,
+            }
+            futures = [(key, label, executor.submit(sources[key])) for key, label in self.HOT_SOURCES]
+            
+            for key, label, future in futures:
+                if key == 'paginated':
+                    total = 0
+                    while True:
+                        batch = pages.get()
+                        if batch is None:
+                            break
+                        total += len(batch)
+                        yield batch
+                else:
+                    urls = future.result()
+                    total = len(urls)
+                    yield urls
+                logger.info(f"获取到 {total} 个{label}游戏")
+    
+    def _first_page_links(self, candidate_urls, xpath, limit):
+        """
+        并发请求候选页面，按候选顺序返回第一个有游戏链接的页面中的链接
+        
+        Args:
+            candidate_urls (list): 候选页面地址，靠前的优先
+            xpath (str): 游戏链接的XPath
+            limit (int): 每个页面最多取多少个链接
+        
+        Returns:
+            list: 游戏链接
+        """
+        with ThreadPoolExecutor(max_workers=len(candidate_urls)) as executor:
+            pages = list(executor.map(self.discovery.fetch_snapshot, candidate_urls))
+        
+        for url, page in zip(candidate_urls, pages):
+            if page is None:
+                continue
+            urls = harvest_hrefs(page, By.XPATH, xpath, limit)
+            if urls:  # 如果找到了游戏，就不再使用其他候选页面
+                return urls
+        return []
+    
+    def _get_trending_games(self, home_page):
         """获取Trending Games"""
         urls = []
-        try:
-            self.driver.get(self.base_url)
-            time.sleep(3)
-            
-            # 查找Trending Games区域
-            trending_selectors = [
-                "//h2[contains(text(), 'Trending')]/following-sibling::*//a[contains(@href, '/')]",
-                "//h3[contains(text(), 'Trending')]/following-sibling::*//a[contains(@href, '/')]",
-                "//*[contains(@class, 'trending')]//a[contains(@href, '/')]",
-                "//div[contains(text(), 'Trending')]//a[contains(@href, '/')]"
-            ]
-            
-            for selector in trending_selectors:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    if elements:
-                        for element in elements[:20]:  # 最多20个
-                            href = element.get_attribute('href')
-                            if href and '/game' in href:
-                                urls.append(href)
-                        break
-                except:
-                    continue
-                    
-        except Exception as e:
-            logger.warning(f"获取Trending游戏失败: {e}")
+        if home_page is None:
+            logger.warning("获取Trending游戏失败: 首页请求失败")
+            return urls
+        
+        # 查找Trending Games区域
+        trending_selectors = [
+            "//h2[contains(text(), 'Trending')]/following-sibling::*//a[contains(@href, '/')]",
+            "//h3[contains(text(), 'Trending')]/following-sibling::*//a[contains(@href, '/')]",
+            "//*[contains(@class, 'trending')]//a[contains(@href, '/')]",
+            "//div[contains(text(), 'Trending')]//a[contains(@href, '/')]"
+        ]
+        
+        for selector in trending_selectors:
+            try:
+                links = harvest_links(home_page, By.XPATH, selector, limit=20)  # 最多20个
+                if links:
+                    urls.extend(link['href'] for link in links if link['href'] and '/game' in link['href'])
+                    break
+            except Exception:
+                continue
         
         return urls
     
     def _get_hot_category_games(self):
         """获取Hot Games分类"""
-        urls = []
         try:
-            # 尝试访问热门游戏分类页面
+            # 候选的热门游戏分类页面
             hot_urls = [
                 f"{self.games_url}?popularity=hot",
                 f"{self.games_url}?category=hot",
                 f"{self.base_url}/hot-games",
                 f"{self.games_url}?sort=popular"
             ]
-            
-            for url in hot_urls:
-                try:
-                    self.driver.get(url)
-                    time.sleep(2)
-                    
-                    # 查找游戏链接
-                    game_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/game') or contains(@href, '-game')]")
-                    
-                    for link in game_links[:50]:  # 每个页面最多50个
-                        href = link.get_attribute('href')
-                        if href:
-                            urls.append(href)
-                    
-                    if urls:  # 如果找到了游戏，就不再尝试其他URL
-                        break
-                        
-                except Exception as e:
-                    logger.warning(f"访问热门分类页面失败 {url}: {e}")
-                    continue
-                    
+            return self._first_page_links(hot_urls, self.GAME_LINK_XPATH, 50)  # 每个页面最多50个
         except Exception as e:
             logger.warning(f"获取Hot分类游戏失败: {e}")
-        
-        return urls
+            return []
     
     def _get_editors_picks(self):
         """获取Editor's Picks"""
-        urls = []
         try:
-            # 尝试访问Editor's Picks页面
+            # 候选的Editor's Picks页面
             editors_urls = [
                 f"{self.base_url}/games-editor-picks",
                 f"{self.games_url}?category=editors-picks",
                 f"{self.base_url}/editors-picks"
             ]
-            
-            for url in editors_urls:
-                try:
-                    self.driver.get(url)
-                    time.sleep(2)
-                    
-                    # 查找游戏链接
-                    game_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/game') or contains(@href, '-game')]")
-                    
-                    for link in game_links[:30]:
-                        href = link.get_attribute('href')
-                        if href:
-                            urls.append(href)
-                    
-                    if urls:
-                        break
-                        
-                except Exception as e:
-                    logger.warning(f"访问Editor's Picks页面失败 {url}: {e}")
-                    continue
-                    
+            return self._first_page_links(editors_urls, self.GAME_LINK_XPATH, 30)
         except Exception as e:
             logger.warning(f"获取Editor's Picks失败: {e}")
-        
-        return urls
+            return []
     
-    def _get_featured_games(self):
+    def _get_featured_games(self, home_page):
         """获取首页推荐游戏"""
-        urls = []
-        try:
-            self.driver.get(self.base_url)
-            time.sleep(3)
-            
-            # 查找首页所有游戏链接
-            game_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/game') or contains(@href, '-game')]")
-            
-            for link in game_links[:100]:  # 首页最多100个
-                href = link.get_attribute('href')
-                if href:
-                    urls.append(href)
-                    
-        except Exception as e:
-            logger.warning(f"获取首页推荐游戏失败: {e}")
+        if home_page is None:
+            logger.warning("获取首页推荐游戏失败: 首页请求失败")
+            return []
         
-        return urls
+        # 查找首页所有游戏链接，首页最多100个
+        return harvest_hrefs(home_page, By.XPATH, self.GAME_LINK_XPATH, limit=100)
     
-    def _get_paginated_games(self, needed_count):
-        """通过分页获取更多游戏"""
-        urls = []
-        page = 1
-        max_pages = 20  # 最多20页
-        
+    def _get_paginated_games(self, needed_count, known_urls=()):
+        """并发请求列表页获取更多游戏(HTTP，不经过浏览器)，直到某一页没有新游戏"""
         try:
-            while len(urls) < needed_count and page <= max_pages:
-                page_url = f"{self.games_url}?page={page}"
-                logger.info(f"正在获取第 {page} 页游戏...")
-                
-                try:
-                    self.driver.get(page_url)
-                    time.sleep(2)
-                    
-                    # 查找游戏链接
-                    game_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/game') or contains(@href, '-game')]")
-                    
-                    page_urls = []
-                    for link in game_links:
-                        href = link.get_attribute('href')
-                        if href and href not in urls:
-                            page_urls.append(href)
-                    
-                    if not page_urls:  # 如果这一页没有找到游戏，停止
-                        logger.info(f"第 {page} 页没有找到游戏，停止分页获取")
-                        break
-                    
-                    urls.extend(page_urls)
-                    logger.info(f"第 {page} 页获取到 {len(page_urls)} 个游戏")
-                    
-                    page += 1
-                    time.sleep(random.uniform(1, 3))  # 随机延迟
-                    
-                except Exception as e:
-                    logger.warning(f"获取第 {page} 页失败: {e}")
-                    page += 1
-                    continue
-                    
+            return self.discovery.discover(limit=needed_count, known_urls=known_urls)
         except Exception as e:
             logger.error(f"分页获取游戏失败: {e}")
-        
-        return urls
+            return []
     
     def extract_game_basic_info(self, game_url):
         """从游戏列表页面提取基本信息"""
@@ -307,8 +289,9 @@ class GameMonetizeHotGamesCrawler:
         try:
             logger.info(f"测试访问游戏详情页: {game_url}")
             
+            self.rate_limiter.acquire(game_url)
             self.driver.get(game_url)
-            time.sleep(3)
+            wait_for_page_ready(self.driver, GAMEMONETIZE_DETAIL_SELECTORS)
             
             # 检查页面是否正常加载
             page_title = self.driver.title
@@ -427,31 +410,59 @@ class GameMonetizeHotGamesCrawler:
         """采集热门游戏列表"""
         logger.info(f"开始采集 {target_count} 个热门游戏...")
         
+        # 上次中断时从检查点恢复已检测的记录，本次运行不再重复检测这些游戏
+        self.hot_games, self.failed_games = self.checkpoint.start()
+        restored_keys = {url_key(item['url']) for item in self.hot_games + self.failed_games if item.get('url')}
+        
+        # 队列中已有足够待检测的URL时直接继续，不再重新获取热门列表；
+        # 否则在后台边获取边入队，检测不必等待完整的热门列表
+        feed = None
+        pending = self.frontier.pending_count(self.FRONTIER_QUEUE)
+        if pending >= target_count:
+            logger.info(f"从URL队列恢复: {pending} 个待处理游戏")
+        else:
+            feed = DiscoveryFeed(self.frontier, self.FRONTIER_QUEUE, self.iter_hot_games_url_batches(),
+                                 priority=PRIORITY_HOT, refresh_after=self.REFRESH_AFTER_SECONDS).start()
+        
+        # 浏览器启动与URL获取同时进行
         if not self.setup_driver():
             logger.error("浏览器驱动初始化失败，无法继续")
+            if feed:
+                feed.stop()
             return False
         
+        worker = worker_id('gamemonetize_hot')
+        claimed_urls = set()
         try:
-            # 获取热门游戏URL列表
-            game_urls = self.get_hot_games_urls()
-            logger.info(f"获取到 {len(game_urls)} 个游戏URL")
-            
-            if not game_urls:
-                logger.error("未获取到任何游戏URL")
-                return False
-            
-            # 处理每个游戏
-            processed_count = 0
-            success_count = 0
-            
-            for i, game_url in enumerate(game_urls[:target_count], 1):
-                logger.info(f"处理游戏 {i}/{min(len(game_urls), target_count)}: {game_url}")
+            # 处理每个游戏(恢复的记录中完成了详情检测的计入已处理)
+            success_count = len(self.hot_games)
+            processed_count = success_count + sum(1 for item in self.failed_games if 'detail_accessible' in item)
+            
+            while processed_count < target_count:
+                # 逐个领取，与同时运行的其他采集器共享同一队列
+                claimed = self.frontier.claim(self.FRONTIER_QUEUE, worker)
+                if not claimed:
+                    # 队列暂时为空但获取仍在进行时等待下一批
+                    if feed and feed.wait_for_urls():
+                        continue
+                    break
+                if feed:
+                    feed.notify_claimed()
+                game_url = claimed[0]['url']
+                if url_key(game_url) in restored_keys:
+                    # 中断前已处理并写入检查点，只补记队列状态
+                    self.frontier.complete(self.FRONTIER_QUEUE, game_url)
+                    continue
+                claimed_urls.add(game_url)
+                logger.info(f"处理游戏 {processed_count + 1}/{target_count}: {game_url}")
                 
                 try:
                     # 提取基本信息
                     game_info = self.extract_game_basic_info(game_url)
                     if not game_info:
-                        self.failed_games.append({"url": game_url, "reason": "提取基本信息失败"})
+                        self._record_failure({"url": game_url, "reason": "提取基本信息失败"})
+                        self.frontier.fail(self.FRONTIER_QUEUE, game_url, "提取基本信息失败")
+                        claimed_urls.discard(game_url)
                         continue
                     
                     # 测试详情页面访问
@@ -462,7 +473,8 @@ class GameMonetizeHotGamesCrawler:
                             "detail_accessible": True,
                             "detail_info": detail_result
                         })
-                        self.hot_games.append(game_info)
+                        self._record_success(game_info)
+                        self.frontier.complete(self.FRONTIER_QUEUE, game_url)
                         success_count += 1
                         logger.info(f"✓ 游戏 {game_info['name']} 处理成功 (质量分: {detail_result.get('quality_score', 0)})")
                     else:
@@ -470,14 +482,13 @@ class GameMonetizeHotGamesCrawler:
                             "detail_accessible": False,
                             "error_reason": detail_result
                         })
-                        self.failed_games.append(game_info)
+                        self._record_failure(game_info)
+                        self.frontier.fail(self.FRONTIER_QUEUE, game_url, detail_result)
                         logger.warning(f"✗ 游戏详情页面不可访问: {detail_result}")
                     
+                    claimed_urls.discard(game_url)
                     processed_count += 1
                     
-                    # 添加延迟避免被封
-                    time.sleep(random.uniform(1, 3))
-                    
                     # 每处理50个游戏保存一次
                     if processed_count % 50 == 0:
                         self.save_progress()
@@ -485,56 +496,63 @@ class GameMonetizeHotGamesCrawler:
                 
                 except Exception as e:
                     logger.error(f"处理游戏失败 {game_url}: {e}")
-                    self.failed_games.append({"url": game_url, "reason": str(e)})
+                    self._record_failure({"url": game_url, "reason": str(e)})
+                    self.frontier.fail(self.FRONTIER_QUEUE, game_url, e)
+                    claimed_urls.discard(game_url)
                     continue
             
+            if processed_count == 0 and not self.failed_games:
+                logger.error("未获取到任何游戏URL")
+                return False
+            
             # 最终保存
             self.save_results()
             
             logger.info(f"采集完成！总计处理 {processed_count} 个游戏，成功 {success_count} 个，失败 {len(self.failed_games)} 个")
+            logger.info(f"URL队列状态: {self.frontier.get_stats(self.FRONTIER_QUEUE)}")
             return True
             
         except Exception as e:
             logger.error(f"采集过程中发生错误: {e}")
             return False
         finally:
+            if feed:
+                feed.stop()
+            self.checkpoint.close()
+            # 已领取但未处理完的URL放回队列
+            for game_url in claimed_urls:
+                self.frontier.release(self.FRONTIER_QUEUE, game_url)
             if self.driver:
                 self.driver.quit()
     
+    def _record_success(self, game_info):
+        """记录检测通过的游戏，并立即追加到检查点"""
+        self.hot_games.append(game_info)
+        self.checkpoint.record_success(game_info)
+    
+    def _record_failure(self, failure):
+        """记录失败的游戏，并立即追加到检查点"""
+        self.failed_games.append(failure)
+        self.checkpoint.record_failure(failure)
+    
     def save_progress(self):
-        """保存进度"""
+        """保存进度：记录已逐条写入检查点日志，这里只更新清单中的计数"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            # 保存成功的游戏
-            if self.hot_games:
-                with open(f"gamemonetize_hot_games_progress_{timestamp}.json", 'w', encoding='utf-8') as f:
-                    json.dump(self.hot_games, f, ensure_ascii=False, indent=2)
-            
-            # 保存失败的游戏
-            if self.failed_games:
-                with open(f"gamemonetize_failed_games_progress_{timestamp}.json", 'w', encoding='utf-8') as f:
-                    json.dump(self.failed_games, f, ensure_ascii=False, indent=2)
-                    
+            self.checkpoint.save_manifest(len(self.hot_games), len(self.failed_games))
         except Exception as e:
             logger.error(f"保存进度失败: {e}")
     
     def save_results(self):
-        """保存最终结果"""
+        """保存最终结果：把检查点日志合并为带时间戳的结果文件"""
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            # 保存成功的游戏列表
+            # 成功的游戏列表，有失败时同时写出失败列表
             success_file = f"gamemonetize_hot_games_{timestamp}.json"
-            with open(success_file, 'w', encoding='utf-8') as f:
-                json.dump(self.hot_games, f, ensure_ascii=False, indent=2)
+            failed_file = f"gamemonetize_failed_games_{timestamp}.json" if self.failed_games else None
+            self.checkpoint.finalize(success_file, failed_file)
             logger.info(f"成功游戏列表已保存到: {success_file}")
-            
-            # 保存失败的游戏列表
-            if self.failed_games:
-                failed_file = f"gamemonetize_failed_games_{timestamp}.json"
-                with open(failed_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.failed_games, f, ensure_ascii=False, indent=2)
+            if failed_file:
                 logger.info(f"失败游戏列表已保存到: {failed_file}")
             
             # 生成统计报告
@@ -575,7 +593,7 @@ class GameMonetizeHotGamesCrawler:
             
             report_file = f"gamemonetize_crawl_report_{timestamp}.json"
             with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=2)
+                json_codec.dump(report, f, pretty=True)
             
             logger.info(f"采集报告已生成: {report_file}")
             logger.info(f"采集统计: 成功 {len(self.hot_games)}/{total_games} ({success_rate:.2f}%)")
@@ -5,13 +5,13 @@ GameMonetize游戏SEO内容生成器
 支持iframe尺寸比例、缩略图、操作说明、分类标签等新增数据
 """
 
-import json
 import os
 import re
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from urllib.parse import urlparse
 import hashlib
+import json_codec
 
 class GameMonetizeSEOGenerator:
     """GameMonetize游戏SEO内容生成器"""
@@ -365,7 +365,7 @@ class GameMonetizeSEOGenerator:
                     output_file = os.path.join(games_output_dir, f"{slug}.json")
                     
                     with open(output_file, 'w', encoding='utf-8') as f:
-                        json.dump(seo_data, f, indent=2, ensure_ascii=False)
+                        json_codec.dump(seo_data, f)
                     
                     results["successful"] += 1
                     results["games"].append({
@@ -402,7 +402,7 @@ class GameMonetizeSEOGenerator:
         # 保存报告
         report_file = os.path.join(output_dir, f"seo_generation_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
         with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+            json_codec.dump(report, f, pretty=True)
         
         print(f"\n🎉 SEO生成完成!")
         print(f"📊 成功: {results['successful']}, 失败: {results['failed']}")
@@ -429,7 +429,7 @@ def main():
     
     print("🚀 加载GameMonetize游戏数据...")
     with open(data_file, 'r', encoding='utf-8') as f:
-        games_data = json.load(f)
+        games_data = json_codec.load(f)
     
     print(f"📊 加载了 {len(games_data)} 个游戏数据")
     
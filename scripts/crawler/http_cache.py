@@ -0,0 +1,287 @@
+# scripts/crawler/http_cache.py - 基于ETag/Last-Modified的条件请求HTTP缓存
+"""
+条件请求HTTP缓存
+按归一化URL在磁盘(SQLite)上保存页面内容、ETag和Last-Modified，
+重新采集时带If-None-Match/If-Modified-Since重新验证，
+未变化的页面只需一次304响应，并直接复用上次的解析结果；
+总大小超过上限时按最近访问时间淘汰
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+import json_codec
+
+# 默认缓存文件，跟随输出目录保存，跨运行保留
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output', 'http_cache.db')
+
+# 默认缓存上限(MB)
+DEFAULT_MAX_SIZE_MB = 512
+
+# 每保存多少个页面重新统计一次真实总大小(校正其他进程写入和替换造成的估算偏差)
+SIZE_RESYNC_INTERVAL = 1000
+
+
+def normalize_cache_url(url):
+    """
+    归一化缓存键：协议和主机小写、去掉片段、查询参数排序、去掉路径末尾斜杠
+
+    Args:
+        url (str): 页面URL
+
+    Returns:
+        str: 归一化后的URL
+    """
+    parts = urlparse(url.strip())
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), path, '', query, ''))
+
+
+class HttpCache:
+    """磁盘HTTP缓存
+
+    页面内容用zlib压缩保存，解析结果以JSON保存在同一行，页面内容更新时解析结果自动失效
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        """
+        初始化缓存
+
+        Args:
+            db_path (str): 缓存SQLite文件路径
+            max_size_mb (int): 页面内容压缩后的总大小上限(MB)
+        """
+        self.db_path = db_path
+        self.max_bytes = max_size_mb * 1024 * 1024
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # 本次运行统计信息
+        self.requests = 0
+        self.hits = 0          # 304未修改
+        self.misses = 0        # 200完整下载
+        self.parse_skips = 0   # 304且复用了解析结果
+        self.evictions = 0
+
+        # 页面内容总大小的估算值：每次保存累加新页面大小(替换时偏大，不会漏掉淘汰)，
+        # 只在估算超过上限或每SIZE_RESYNC_INTERVAL次保存后才对整表求和
+        self._size_estimate = None
+        self._stores_since_sync = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._connect()
+
+    def _connect(self):
+        """获取当前线程的SQLite连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "url TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, "
+                "etag TEXT, last_modified TEXT, parsed TEXT, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at)")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, url):
+        """
+        查询缓存条目
+
+        Args:
+            url (str): 页面URL
+
+        Returns:
+            dict or None: {'etag', 'last_modified'}，未缓存时返回None
+        """
+        row = self._connect().execute(
+            "SELECT etag, last_modified FROM pages WHERE url = ?", (normalize_cache_url(url),)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'etag': row[0], 'last_modified': row[1]}
+
+    def conditional_headers(self, entry):
+        """
+        根据缓存条目生成重新验证用的请求头
+
+        Args:
+            entry (dict): lookup返回的缓存条目
+
+        Returns:
+            dict: If-None-Match/If-Modified-Since请求头
+        """
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load_body(self, url):
+        """
+        读取304命中时的缓存页面内容，并更新访问时间
+
+        Returns:
+            bytes or None: 页面原始内容
+        """
+        key = normalize_cache_url(url)
+        conn = self._connect()
+        row = conn.execute("SELECT body FROM pages WHERE url = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), key))
+        return zlib.decompress(row[0])
+
+    def load_parsed(self, url):
+        """
+        读取缓存的解析结果
+
+        Returns:
+            dict or None: 上次的解析结果，没有时返回None
+        """
+        row = self._connect().execute(
+            "SELECT parsed FROM pages WHERE url = ?", (normalize_cache_url(url),)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json_codec.loads(row[0])
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """
+        保存新下载的页面，旧的解析结果随之失效
+
+        Args:
+            url (str): 页面URL
+            body (bytes): 页面原始内容
+            etag (str): 响应的ETag
+            last_modified (str): 响应的Last-Modified
+        """
+        # 源站没有任何验证器时无法重新验证，不缓存
+        if not etag and not last_modified:
+            return
+        compressed = zlib.compress(body)
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO pages (url, body, size, etag, last_modified, parsed, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, NULL, ?, ?)",
+            (normalize_cache_url(url), compressed, len(compressed), etag, last_modified, now, now)
+        )
+        self._evict_if_needed(len(compressed))
+
+    def store_parsed(self, url, parsed):
+        """
+        保存页面的解析结果，供下次304时跳过解析
+
+        Args:
+            url (str): 页面URL
+            parsed (dict): 解析结果
+        """
+        self._connect().execute(
+            "UPDATE pages SET parsed = ? WHERE url = ?",
+            (json_codec.dumps(parsed), normalize_cache_url(url))
+        )
+
+    def record(self, not_modified, parse_skipped=False):
+        """
+        记录一次请求的缓存结果
+
+        Args:
+            not_modified (bool): 是否为304命中
+            parse_skipped (bool): 是否复用了解析结果
+        """
+        with self._lock:
+            self.requests += 1
+            if not_modified:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if parse_skipped:
+                self.parse_skips += 1
+
+    def _evict_if_needed(self, added_size):
+        """
+        总大小超过上限时按最近访问时间淘汰，直到降到上限的90%
+
+        Args:
+            added_size (int): 本次保存的页面压缩后大小，累加到总大小估算值
+        """
+        with self._lock:
+            self._stores_since_sync += 1
+            if self._size_estimate is not None:
+                self._size_estimate += added_size
+                if self._size_estimate <= self.max_bytes and self._stores_since_sync < SIZE_RESYNC_INTERVAL:
+                    return
+            self._stores_since_sync = 0
+
+        conn = self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            with self._lock:
+                self._size_estimate = total
+            return
+
+        target = self.max_bytes * 0.9
+        removed = 0
+        for url, size in conn.execute("SELECT url, size FROM pages ORDER BY accessed_at").fetchall():
+            if total <= target:
+                break
+            conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+            removed += 1
+        with self._lock:
+            self._size_estimate = total
+            self.evictions += removed
+
+    def get_report(self):
+        """
+        获取本次运行的缓存统计
+
+        Returns:
+            dict: 请求数、304命中数、命中率、跳过解析数、淘汰数和缓存大小
+        """
+        row = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / self.requests, 4) if self.requests else 0,
+                "parse_skips": self.parse_skips,
+                "evictions": self.evictions,
+                "entries": row[0],
+                "size_mb": round(row[1] / (1024 * 1024), 1)
+            }
+
+    def print_report(self):
+        """打印缓存命中统计"""
+        report = self.get_report()
+        print(f"🗄️ HTTP缓存统计: 请求{report['requests']}次 | 304命中{report['hits']}次 "
+              f"({report['hit_rate'] * 100:.1f}%) | 跳过解析{report['parse_skips']}次 | "
+              f"淘汰{report['evictions']}条 | 缓存{report['entries']}页/{report['size_mb']}MB")
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_http_cache():
+    """
+    获取进程内共享的HTTP缓存实例
+
+    Returns:
+        HttpCache: 共享缓存
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = HttpCache()
+        return _shared_cache
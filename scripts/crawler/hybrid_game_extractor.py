@@ -0,0 +1,159 @@
+# scripts/crawler/hybrid_game_extractor.py - HTTP优先、按需回退Selenium的游戏详情提取器
+"""
+混合模式游戏详情提取器
+先用requests + BeautifulSoup获取并解析详情页，
+只有必需字段(如iframe_code、thumbnails)缺失时才借用浏览器补全，
+并按字段统计回退率，便于持续压缩浏览器使用比例
+"""
+
+import threading
+import requests
+from concurrency_controller import classify_exception, classify_result
+from game_detail_requests import fetch_and_parse_game
+
+
+class HybridGameDetailExtractor:
+    """HTTP优先的游戏详情提取器
+
+    与GameDetailExtractor.extract_game_details返回相同的数据结构，可在多线程中共享
+    """
+
+    # 默认必需字段，缺失时回退浏览器
+    REQUIRED_FIELDS = ('iframe_code', 'thumbnails')
+
+    def __init__(self, driver_pool, required_fields=None, timeout=15, cache=None):
+        """
+        初始化混合提取器
+
+        Args:
+            driver_pool (DriverPool): 回退时借用浏览器的池，浏览器按需创建
+            required_fields (tuple): 必需字段列表，默认REQUIRED_FIELDS
+            timeout (int): HTTP请求超时时间(秒)
+            cache (HttpCache): 条件请求缓存，未修改的页面复用上次结果，None时不使用
+        """
+        self.driver_pool = driver_pool
+        self.required_fields = tuple(required_fields or self.REQUIRED_FIELDS)
+        self.timeout = timeout
+        self.cache = cache
+
+        # 每个线程独立的requests会话，复用连接
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.total_pages = 0
+        self.http_failures = 0
+        self.browser_pages = 0
+        self.field_fallbacks = {field: 0 for field in self.required_fields}
+
+    def _get_session(self):
+        """获取当前线程的requests会话"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def get_last_signal(self):
+        """
+        获取当前线程最近一次提取的错误信号，供自适应并发控制器使用
+
+        Returns:
+            str or None: timeout、throttled、server_error、error或None(正常)
+        """
+        return getattr(self._local, 'last_signal', None)
+
+    def _is_missing(self, result, field):
+        """判断字段是否缺失(None、空列表、空字典或iframe没有src)"""
+        value = result.get(field)
+        if not value:
+            return True
+        if field == 'iframe_code' and isinstance(value, dict):
+            return not value.get('src')
+        return False
+
+    def extract_game_details(self, game_url, game_info):
+        """
+        提取游戏详细信息，必要时回退浏览器
+
+        Args:
+            game_url (str): 游戏详情页URL
+            game_info (dict): 游戏基本信息
+
+        Returns:
+            dict: 游戏详情数据，结构与Selenium版本一致
+        """
+        result = None
+        self._local.last_signal = None
+        try:
+            result = fetch_and_parse_game(game_url, game_info, session=self._get_session(),
+                                          timeout=self.timeout, cache=self.cache)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ HTTP获取失败，回退浏览器: {e}")
+            self._local.last_signal = classify_exception(e)
+            with self._lock:
+                self.http_failures += 1
+
+        if result is None:
+            missing = list(self.required_fields)
+        else:
+            missing = [field for field in self.required_fields if self._is_missing(result, field)]
+
+        with self._lock:
+            self.total_pages += 1
+            for field in missing:
+                self.field_fallbacks[field] += 1
+            if missing:
+                self.browser_pages += 1
+
+        if not missing:
+            return result
+
+        print(f"🌐 缺失字段 {', '.join(missing)}，使用浏览器补全: {game_url}")
+        with self.driver_pool.driver() as extractor:
+            browser_result = extractor.extract_game_details(game_url, game_info)
+        # HTTP已给出429/5xx等信号时保留该信号，否则使用浏览器的结果信号
+        self._local.last_signal = self._local.last_signal or classify_result(browser_result)
+
+        # HTTP完全失败时直接使用浏览器结果，浏览器出错时保留HTTP结果
+        if result is None:
+            return browser_result
+        if 'error' in browser_result:
+            return result
+
+        for field in missing:
+            if not self._is_missing(browser_result, field):
+                result[field] = browser_result[field]
+
+        # 缓存补全后的结果，页面未修改时下次无需再回退浏览器
+        if self.cache:
+            self.cache.store_parsed(game_url, result)
+        return result
+
+    def get_fallback_report(self):
+        """
+        获取回退统计报告
+
+        Returns:
+            dict: 总页面数、浏览器占比、HTTP失败数及各字段回退率
+        """
+        with self._lock:
+            total = self.total_pages
+            return {
+                "total_pages": total,
+                "http_failures": self.http_failures,
+                "browser_pages": self.browser_pages,
+                "browser_share": round(self.browser_pages / total, 4) if total else 0,
+                "field_fallback_rates": {
+                    field: round(count / total, 4) if total else 0
+                    for field, count in self.field_fallbacks.items()
+                }
+            }
+
+    def print_fallback_report(self):
+        """打印回退统计"""
+        report = self.get_fallback_report()
+        print(f"🔀 混合提取统计: 共{report['total_pages']}页 | 浏览器回退{report['browser_pages']}页 "
+              f"({report['browser_share'] * 100:.1f}%) | HTTP失败{report['http_failures']}次")
+        for field, rate in report['field_fallback_rates'].items():
+            print(f"   - {field}: 回退率 {rate * 100:.1f}%")
@@ -0,0 +1,151 @@
+# scripts/crawler/json_codec.py - 采集脚本共用的JSON编解码层
+"""
+JSON编解码
+所有保存/读取JSON文件和数据库中JSON字段的地方都经过这里：
+安装了orjson时使用orjson(编码和解码都快数倍)，否则回退到标准库json；
+默认输出紧凑格式，需要人工阅读的文件(报告、摘要)传pretty=True输出2空格缩进；
+两种后端输出的都是UTF-8、不转义非ASCII字符的JSON，可以互相读取；
+设置环境变量CRAWLER_JSON_BACKEND=json可强制使用标准库
+"""
+
+import io
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND_ORJSON = 'orjson'
+BACKEND_STDLIB = 'json'
+
+_backend = None
+
+
+def set_backend(name=None):
+    """
+    选择编解码后端
+
+    Args:
+        name (str): 'orjson'或'json'，None表示按环境变量CRAWLER_JSON_BACKEND选择，默认优先orjson
+
+    Returns:
+        str: 实际使用的后端(要求orjson但未安装时为'json')
+    """
+    global _backend
+    name = name or os.environ.get('CRAWLER_JSON_BACKEND') or BACKEND_ORJSON
+    _backend = BACKEND_ORJSON if name == BACKEND_ORJSON and orjson is not None else BACKEND_STDLIB
+    return _backend
+
+
+def get_backend():
+    """当前使用的后端名"""
+    return _backend
+
+
+def _stdlib_dumps(obj, pretty):
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps_bytes(obj, pretty=False):
+    """
+    编码为UTF-8字节
+
+    Args:
+        obj: 要编码的对象
+        pretty (bool): 是否输出2空格缩进格式
+
+    Returns:
+        bytes: JSON
+    """
+    if _backend == BACKEND_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except orjson.JSONEncodeError:
+            pass  # 超出64位的整数等orjson不支持的值，交给标准库
+    return _stdlib_dumps(obj, pretty).encode('utf-8')
+
+
+def dumps(obj, pretty=False):
+    """
+    编码为字符串
+
+    Args:
+        obj: 要编码的对象
+        pretty (bool): 是否输出2空格缩进格式
+
+    Returns:
+        str: JSON
+    """
+    if _backend == BACKEND_ORJSON:
+        return dumps_bytes(obj, pretty).decode('utf-8')
+    return _stdlib_dumps(obj, pretty)
+
+
+def loads(data):
+    """
+    解码JSON
+
+    Args:
+        data (str or bytes): JSON文本
+
+    Returns:
+        解码后的对象
+    """
+    if _backend == BACKEND_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump(obj, f, pretty=False):
+    """
+    写入已打开的文件，文本模式和二进制模式都可以
+
+    Args:
+        obj: 要编码的对象
+        f: 文件对象
+        pretty (bool): 是否输出2空格缩进格式
+    """
+    if isinstance(f, io.TextIOBase):
+        f.write(dumps(obj, pretty))
+    else:
+        f.write(dumps_bytes(obj, pretty))
+
+
+def load(f):
+    """从已打开的文件读取，文本模式和二进制模式都可以"""
+    return loads(f.read())
+
+
+def save_json(path, obj, pretty=False):
+    """
+    把对象写入JSON文件
+
+    Args:
+        path (str): 文件路径
+        obj: 要编码的对象
+        pretty (bool): 是否输出2空格缩进格式
+    """
+    with open(path, 'wb') as f:
+        f.write(dumps_bytes(obj, pretty))
+
+
+def load_json(path):
+    """
+    读取JSON文件
+
+    Args:
+        path (str): 文件路径
+
+    Returns:
+        解码后的对象
+    """
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+set_backend()
@@ -0,0 +1,133 @@
+# scripts/crawler/known_urls.py - 已知游戏URL的持久化索引
+"""
+已知游戏URL索引
+跨运行保存已采集过的游戏URL(SQLite)，供增量发现判断列表页上哪些是新游戏；
+对按发布时间倒序的列表，连续若干页都没有新游戏即可提前停止，
+日常刷新只需请求最前面几页
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from url_canonicalizer import url_key
+
+# 默认索引文件，跟随输出目录保存，跨运行保留
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output', 'known_urls.db')
+
+# 连续多少页没有新游戏后停止
+DEFAULT_STOP_AFTER = 3
+
+
+class KnownUrlIndex:
+    """已知URL索引，键为url_key(游戏页为站点:slug，其他为规范化URL)"""
+
+    def __init__(self, db_path=DEFAULT_INDEX_PATH):
+        """
+        初始化索引
+
+        Args:
+            db_path (str): 索引SQLite文件路径
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._connect()
+
+    def _connect(self):
+        """获取当前线程的SQLite连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS known_urls ("
+                "url TEXT PRIMARY KEY, source TEXT, first_seen REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM known_urls").fetchone()[0]
+
+    def __contains__(self, url):
+        return self._connect().execute(
+            "SELECT 1 FROM known_urls WHERE url = ?", (url_key(url),)
+        ).fetchone() is not None
+
+    def unknown(self, urls):
+        """
+        筛选出索引中没有的URL
+
+        Args:
+            urls (list): 候选URL
+
+        Returns:
+            list: 未知URL，保持原顺序
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        keys = [url_key(url) for url in urls]
+        known = set()
+        conn = self._connect()
+        # SQLite单条语句的参数数量有限，分块查询
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT url FROM known_urls WHERE url IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            known.update(row[0] for row in rows)
+        return [url for url, key in zip(urls, keys) if key not in known]
+
+    def add(self, urls, source=''):
+        """
+        把URL加入索引，已存在的保持首次出现时间
+
+        Args:
+            urls (iterable): URL列表
+            source (str): 来源站点或采集器名称
+        """
+        now = time.time()
+        rows = [(url_key(url), source, now) for url in urls if url]
+        if rows:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            conn.executemany("INSERT OR IGNORE INTO known_urls (url, source, first_seen) VALUES (?, ?, ?)", rows)
+            conn.execute("COMMIT")
+
+
+class EarlyStop:
+    """连续若干页没有新游戏时提前停止"""
+
+    def __init__(self, stop_after=DEFAULT_STOP_AFTER):
+        self.stop_after = max(1, stop_after)
+        self.quiet_pages = 0
+
+    def observe(self, new_count):
+        """
+        记录一页中新游戏的数量
+
+        Returns:
+            bool: 是否应停止继续翻页
+        """
+        self.quiet_pages = 0 if new_count else self.quiet_pages + 1
+        return self.quiet_pages >= self.stop_after
+
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+
+def get_known_url_index():
+    """
+    获取进程内共享的已知URL索引
+
+    Returns:
+        KnownUrlIndex: 共享索引
+    """
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = KnownUrlIndex()
+        return _shared_index
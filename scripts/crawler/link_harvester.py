@@ -0,0 +1,98 @@
+# scripts/crawler/link_harvester.py - 一次脚本调用批量获取页面中的链接
+"""
+批量链接收集
+对每个元素调用get_attribute('href')和.text都是一次chromedriver往返，列表页有几百个链接时需要数秒；
+这里用一次execute_script在页面内收集所有匹配元素的链接、文本和data-*属性，以JSON返回，
+每页只需一次往返(几十毫秒)；
+传入PageSnapshot等没有execute_script的页面时在本地查找，返回相同结构，调用方无需区分
+"""
+
+import json
+
+# 页面内执行的收集脚本
+# arguments: 定位方式('css selector'或'xpath')、选择器、最多返回数量、额外读取的属性名、链接选择器
+# 匹配元素本身不是链接时取其中第一个匹配链接选择器的<a>，与原来element.find_element(By.CSS_SELECTOR, ...)一致
+HARVEST_SCRIPT = """
+const [by, value, limit, extraAttributes, anchorSelector] = arguments;
+let nodes;
+if (by === 'xpath') {
+    const result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) {
+        if (result.snapshotItem(i).nodeType === Node.ELEMENT_NODE) nodes.push(result.snapshotItem(i));
+    }
+} else {
+    nodes = Array.from(document.querySelectorAll(value));
+}
+if (limit !== null) nodes = nodes.slice(0, limit);
+return JSON.stringify(nodes.map(node => {
+    const anchor = node.matches('a[href]') ? node : node.querySelector(anchorSelector);
+    const attributes = {};
+    for (const attr of node.attributes) {
+        if (attr.name.startsWith('data-') || extraAttributes.includes(attr.name)) attributes[attr.name] = attr.value;
+    }
+    return {
+        href: anchor ? anchor.href : null,
+        text: (node.innerText || '').trim(),
+        attributes: attributes
+    };
+}));
+"""
+
+# 默认额外读取的属性(data-*总是读取)
+DEFAULT_ATTRIBUTES = ('title', 'onclick')
+
+
+def _harvest_local(page, by, value, limit, attributes, anchor_selector):
+    """在PageSnapshot等本地页面上收集，返回结构与页面脚本一致"""
+    elements = page.find_elements(by, value)
+    if limit is not None:
+        elements = elements[:limit]
+
+    links = []
+    for element in elements:
+        if element.tag_name == 'a' and element.get_attribute('href'):
+            anchor = element
+        else:
+            anchors = element.find_elements('css selector', anchor_selector)
+            anchor = anchors[0] if anchors else None
+        links.append({
+            'href': anchor.get_attribute('href') if anchor is not None else None,
+            'text': element.text.strip(),
+            'attributes': {name: value for name, value in element.attributes.items()
+                           if name.startswith('data-') or name in attributes}
+        })
+    return links
+
+
+def harvest_links(page, by, value, limit=None, attributes=DEFAULT_ATTRIBUTES, anchor_selector='a[href]'):
+    """
+    批量获取匹配元素的链接、文本和属性
+
+    Args:
+        page: WebDriver或PageSnapshot
+        by (str): 定位方式，By.CSS_SELECTOR或By.XPATH
+        value (str): 选择器
+        limit (int): 最多返回多少个元素，None表示全部
+        attributes (tuple): 除data-*外额外读取的属性名
+        anchor_selector (str): 匹配元素本身不是链接时，在其中查找链接的CSS选择器
+
+    Returns:
+        list: [{'href': 绝对地址或None, 'text': 可见文本, 'attributes': {属性名: 值}}]，按页面顺序
+    """
+    if by not in ('css selector', 'xpath'):
+        raise ValueError(f"不支持的定位方式: {by}")
+    if not hasattr(page, 'execute_script'):
+        return _harvest_local(page, by, value, limit, attributes, anchor_selector)
+    result = page.execute_script(HARVEST_SCRIPT, by, value, limit, list(attributes), anchor_selector)
+    return json.loads(result) if result else []
+
+
+def harvest_hrefs(page, by, value, limit=None):
+    """
+    批量获取匹配元素的链接地址
+
+    Returns:
+        list: 非空的href，按页面顺序
+    """
+    return [link['href'] for link in harvest_links(page, by, value, limit, attributes=()) if link['href']]
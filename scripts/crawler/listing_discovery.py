@@ -0,0 +1,284 @@
+# scripts/crawler/listing_discovery.py - 无浏览器的GameMonetize列表页并发发现
+"""
+GameMonetize列表页URL发现
+直接用HTTP并发请求 /games?page=N，从原始HTML中用正则提取游戏链接，不启动浏览器；
+不设固定页数上限，按页码顺序处理结果，遇到第一个不再产生新链接的页面即停止
+(超出最后一页的页码通常只剩导航栏链接，全部是重复链接)；
+链接的规范化、分类和去重由url_canonicalizer完成
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from game_detail_requests import DEFAULT_HEADERS
+from rate_limiter import get_rate_limiter
+from known_urls import EarlyStop, DEFAULT_STOP_AFTER, get_known_url_index
+from url_canonicalizer import dedupe_game_urls
+from page_snapshot import PageSnapshot
+
+logger = logging.getLogger(__name__)
+
+GAMEMONETIZE_BASE_URL = "https://gamemonetize.com"
+GAMEMONETIZE_GAMES_URL = "https://gamemonetize.com/games"
+
+_HREF_PATTERN = re.compile(r'<a\b[^>]*?\bhref\s*=\s*["\']([^"\'#][^"\']*)["\']', re.IGNORECASE)
+
+
+def extract_game_links(html, page_url):
+    """
+    从列表页原始HTML中提取游戏链接
+
+    Args:
+        html (str): 页面HTML
+        page_url (str): 页面URL，用于解析相对链接
+
+    Returns:
+        list: 规范化后的游戏URL，按页面出现顺序、按游戏键去重
+    """
+    return dedupe_game_urls(_HREF_PATTERN.findall(html), page_url)
+
+
+class ListingDiscovery:
+    """列表页并发发现器"""
+
+    def __init__(self, games_url=GAMEMONETIZE_GAMES_URL, base_url=GAMEMONETIZE_BASE_URL,
+                 concurrency=8, timeout=15, retries=2, max_failures=3):
+        """
+        初始化发现器
+
+        Args:
+            games_url (str): 分页列表地址，页码以?page=N追加
+            base_url (str): 站点首页
+            concurrency (int): 同时请求的列表页数量
+            timeout (int): 单个请求超时时间(秒)
+            retries (int): 单页失败后的重试次数
+            max_failures (int): 连续多少页请求失败后放弃
+        """
+        self.games_url = games_url
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.retries = retries
+        self.max_failures = max_failures
+        self.rate_limiter = get_rate_limiter()
+        self._local = threading.local()
+        self.stats = {'pages_fetched': 0, 'pages_failed': 0, 'last_page': 0, 'elapsed_seconds': 0.0}
+
+    def page_url(self, page):
+        """第page页列表的URL"""
+        return f"{self.games_url}?page={page}"
+
+    def _session(self):
+        """每个线程一个会话，复用连接"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            self._local.session = session
+        return session
+
+    def fetch_html(self, url):
+        """
+        请求一个页面，失败时按retries重试
+
+        Returns:
+            str: 页面HTML，请求多次失败时返回None
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                self.rate_limiter.acquire(url)
+                response = self._session().get(url, timeout=self.timeout)
+                response.raise_for_status()
+                return response.text
+            except requests.exceptions.RequestException as e:
+                if attempt == self.retries:
+                    logger.warning(f"列表页请求失败 {url}: {e}")
+                    return None
+                time.sleep(0.5 * (attempt + 1))
+
+    def fetch_links(self, url):
+        """
+        请求一个页面并提取游戏链接
+
+        Returns:
+            list: 游戏链接，请求多次失败时返回None
+        """
+        html = self.fetch_html(url)
+        return extract_game_links(html, url) if html is not None else None
+
+    def fetch_snapshot(self, url):
+        """
+        请求一个页面并解析为PageSnapshot，可按WebDriver的方式查找元素
+
+        Returns:
+            PageSnapshot: 页面快照，请求多次失败时返回None
+        """
+        html = self.fetch_html(url)
+        return PageSnapshot(html, url) if html is not None else None
+
+    def discover(self, limit=None, start_page=1, known_urls=(), known_index=None, stop_after=DEFAULT_STOP_AFTER):
+        """
+        并发抓取列表页直到某一页不再产生新链接
+
+        Args:
+            limit (int): 收集到多少个新链接后提前停止，None表示抓取整个目录
+            start_page (int): 起始页码
+            known_urls (iterable): 已知链接(如首页推荐)，不计为新链接
+            known_index (KnownUrlIndex): 增量模式的已知URL索引，只返回索引中没有的游戏，
+                连续stop_after页没有新游戏时停止(列表需按发布时间倒序)
+            stop_after (int): 增量模式下连续多少页没有新游戏后停止
+
+        Returns:
+            list: 按页码顺序去重的新游戏URL
+        """
+        urls = []
+        for new_links in self.iter_discover(limit, start_page, known_urls, known_index, stop_after):
+            urls.extend(new_links)
+        return urls
+
+    def iter_discover(self, limit=None, start_page=1, known_urls=(), known_index=None, stop_after=DEFAULT_STOP_AFTER):
+        """
+        与discover相同，但每处理完一页就产出该页的新链接，调用方可以边发现边处理
+
+        Yields:
+            list: 一页中的新游戏URL(按页码顺序，总数不超过limit)
+        """
+        start = time.time()
+        # 列表结束只按列表页自身的链接判断；首页推荐等已知链接只从产出中过滤，
+        # 否则第1页若全是推荐游戏会被误判为列表结束
+        seen = set()
+        known = set(known_urls)
+        total = 0
+        failures = 0
+        early_stop = EarlyStop(stop_after) if known_index is not None else None
+        # 增量模式预计只需前几页，在途页数不超过停止阈值，避免多请求注定用不上的页面
+        window = min(self.concurrency, stop_after) if early_stop else self.concurrency
+        next_submit = start_page
+        next_page = start_page
+        futures = {}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                while True:
+                    # 保持concurrency个页面在途
+                    while len(futures) < window:
+                        futures[next_submit] = executor.submit(self.fetch_links, self.page_url(next_submit))
+                        next_submit += 1
+
+                    # 按页码顺序消费结果，保证停止位置和链接顺序确定
+                    links = futures.pop(next_page).result()
+                    if links is None:
+                        self.stats['pages_failed'] += 1
+                        failures += 1
+                        if failures >= self.max_failures:
+                            logger.warning(f"连续 {failures} 页请求失败，停止发现")
+                            break
+                        next_page += 1
+                        continue
+
+                    failures = 0
+                    self.stats['pages_fetched'] += 1
+                    new_links = [url for url in links if url not in seen]
+                    if not new_links:
+                        logger.info(f"第 {next_page} 页没有新游戏，列表结束")
+                        break
+
+                    seen.update(new_links)
+                    new_links = [url for url in new_links if url not in known]
+                    if known_index is not None:
+                        new_links = known_index.unknown(new_links)
+                    if limit is not None:
+                        new_links = new_links[:limit - total]
+                    total += len(new_links)
+                    self.stats['last_page'] = next_page
+                    logger.info(f"第 {next_page} 页发现 {len(new_links)} 个新游戏，累计 {total} 个")
+                    next_page += 1
+                    if new_links:
+                        yield new_links
+
+                    if limit is not None and total >= limit:
+                        break
+                    if early_stop and early_stop.observe(len(new_links)):
+                        logger.info(f"连续 {early_stop.quiet_pages} 页都是已知游戏，增量发现结束")
+                        break
+            finally:
+                for future in futures.values():
+                    future.cancel()
+
+        self.stats['elapsed_seconds'] = round(time.time() - start, 2)
+        logger.info(f"列表发现完成: {total} 个游戏，{self.stats['pages_fetched']} 页，"
+                    f"耗时 {self.stats['elapsed_seconds']} 秒")
+
+    def discover_featured(self):
+        """
+        获取首页推荐游戏
+
+        Returns:
+            list: 首页游戏链接，请求失败时为空列表
+        """
+        return self.fetch_links(self.base_url) or []
+
+
+def discover_game_urls(limit=None, concurrency=8, include_featured=True, known_index=None,
+                       stop_after=DEFAULT_STOP_AFTER):
+    """
+    发现GameMonetize游戏URL：首页推荐 + 全部列表页
+
+    Args:
+        limit (int): 最多返回多少个URL，None表示整个目录
+        concurrency (int): 同时请求的列表页数量
+        include_featured (bool): 是否把首页推荐排在最前
+        known_index (KnownUrlIndex): 增量模式的已知URL索引，只返回新游戏并提前停止
+        stop_after (int): 增量模式下连续多少页没有新游戏后停止
+
+    Returns:
+        list: 去重后的游戏URL
+    """
+    discovery = ListingDiscovery(concurrency=concurrency)
+    featured = discovery.discover_featured() if include_featured else []
+    new_featured = known_index.unknown(featured) if known_index is not None else featured
+    if limit is not None and len(new_featured) >= limit:
+        return new_featured[:limit]
+    remaining = None if limit is None else limit - len(new_featured)
+    return new_featured + discovery.discover(limit=remaining, known_urls=featured,
+                                             known_index=known_index, stop_after=stop_after)
+
+
+def main():
+    """命令行入口：发现整个目录的游戏URL并保存"""
+    import argparse
+    import json_codec
+    import os
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description='GameMonetize列表页并发发现(无浏览器)')
+    parser.add_argument('--limit', type=int, default=None, help='最多发现多少个游戏，默认整个目录')
+    parser.add_argument('--concurrency', type=int, default=8, help='同时请求的列表页数量')
+    parser.add_argument('--incremental', action='store_true',
+                        help='只输出已知URL索引中没有的游戏，连续--stop-after页没有新游戏即停止')
+    parser.add_argument('--stop-after', type=int, default=DEFAULT_STOP_AFTER, help='增量模式的停止页数')
+    parser.add_argument('--output', default=None, help='输出JSON文件路径')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    # 索引只在采集器成功处理游戏后更新，这里只读
+    known_index = get_known_url_index() if args.incremental else None
+    urls = discover_game_urls(limit=args.limit, concurrency=args.concurrency,
+                              known_index=known_index, stop_after=args.stop_after)
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output',
+                                         'gamemonetize_game_urls.json')
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    json_codec.save_json(output, {
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'total_urls': len(urls),
+        'urls': urls
+    })
+    print(f"✅ 发现 {len(urls)} 个游戏URL，已保存到 {output}")
+
+
+if __name__ == "__main__":
+    main()
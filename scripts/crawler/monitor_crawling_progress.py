@@ -5,25 +5,38 @@
 """
 
 import os
-import json
 import time
 import glob
 from datetime import datetime
+from checkpoint_store import CheckpointStore, STATUS_IN_PROGRESS, STATUS_COMPLETED, RECORD_SUCCESS, RECORD_FAILED
+from crawl_journal import iter_journal_records
+import json_codec
 
-def get_latest_progress_files():
-    """获取最新的进度文件"""
-    # 查找进度文件
-    progress_files = glob.glob("gamemonetize_enhanced_games_progress_*.json")
-    failed_files = glob.glob("gamemonetize_enhanced_failed_progress_*.json")
-    
-    # 获取最新文件
-    latest_progress = max(progress_files, key=os.path.getctime) if progress_files else None
-    latest_failed = max(failed_files, key=os.path.getctime) if failed_files else None
-    
-    return latest_progress, latest_failed
+# 增强爬虫的检查点名称，对应gamemonetize_enhanced_checkpoint.jsonl/.json
+ENHANCED_CHECKPOINT = 'gamemonetize_enhanced'
+
+def get_progress_checkpoint():
+    """
+    获取进行中的检查点(爬虫只保留一份检查点日志和清单)
+    
+    Returns:
+        tuple: (CheckpointStore, 清单dict)，没有进行中的采集时为(None, None)
+    """
+    store = CheckpointStore(ENHANCED_CHECKPOINT)
+    manifest = store.read_manifest()
+    if manifest is None or manifest.get('status') != STATUS_IN_PROGRESS:
+        return None, None
+    return store, manifest
 
 def get_final_result_files():
     """获取最终结果文件"""
+    # 检查点清单记录了最近一次完成的结果文件
+    manifest = CheckpointStore(ENHANCED_CHECKPOINT).read_manifest()
+    if manifest and manifest.get('status') == STATUS_COMPLETED and os.path.exists(manifest.get('result_file') or ''):
+        report_files = glob.glob("gamemonetize_enhanced_report_*.json")
+        latest_report = max(report_files, key=os.path.getctime) if report_files else None
+        return manifest['result_file'], manifest.get('failed_file'), latest_report
+    
     # 查找最终结果文件
     result_files = glob.glob("gamemonetize_enhanced_games_*.json")
     failed_files = glob.glob("gamemonetize_enhanced_failed_*.json")
@@ -40,28 +53,16 @@ def get_final_result_files():
     
     return latest_result, latest_failed, latest_report
 
-def analyze_progress_data(progress_file, failed_file):
-    """分析进度数据"""
-    games_data = []
-    failed_data = []
-    
-    # 读取成功的游戏数据
-    if progress_file and os.path.exists(progress_file):
-        try:
-            with open(progress_file, 'r', encoding='utf-8') as f:
-                games_data = json.load(f)
-        except Exception as e:
-            print(f"读取进度文件失败: {e}")
-    
-    # 读取失败的游戏数据
-    if failed_file and os.path.exists(failed_file):
-        try:
-            with open(failed_file, 'r', encoding='utf-8') as f:
-                failed_data = json.load(f)
-        except Exception as e:
-            print(f"读取失败文件失败: {e}")
-    
-    return games_data, failed_data
+def analyze_progress_data(store):
+    """分析进度数据：只读地从检查点日志读取成功和失败记录，不修复或追加打开正在写入的日志"""
+    games_data, failed_data = [], []
+    try:
+        for record_type, item in iter_journal_records(store.log_path, (RECORD_SUCCESS, RECORD_FAILED)):
+            (games_data if record_type == RECORD_SUCCESS else failed_data).append(item)
+        return games_data, failed_data
+    except Exception as e:
+        print(f"读取检查点日志失败: {e}")
+        return [], []
 
 def display_progress_stats(games_data, failed_data):
     """显示进度统计"""
@@ -107,17 +108,20 @@ def check_crawling_status():
     """检查爬虫状态"""
     print("🔍 检查爬虫采集状态...")
     
+    # 检查点清单为进行中时，即使有上次的结果文件也以检查点为准
+    store, manifest = get_progress_checkpoint()
+    
     # 检查是否有最终结果文件
     result_file, failed_file, report_file = get_final_result_files()
     
-    if result_file and os.path.exists(result_file):
+    if store is None and result_file and os.path.exists(result_file):
         print("✅ 发现最终结果文件，采集可能已完成！")
         
         # 显示最终报告
         if report_file and os.path.exists(report_file):
             try:
                 with open(report_file, 'r', encoding='utf-8') as f:
-                    report = json.load(f)
+                    report = json_codec.load(f)
                 
                 print(f"\n📋 最终采集报告:")
                 print(f"   采集时间: {report.get('采集时间', 'Unknown')}")
@@ -148,14 +152,13 @@ def check_crawling_status():
         
         return result_file, True
     
-    # 检查进度文件
-    progress_file, failed_file = get_latest_progress_files()
-    
-    if progress_file or failed_file:
-        print("🔄 发现进度文件，爬虫正在运行中...")
+    # 检查进度检查点
+    if store is not None:
+        print("🔄 发现进行中的检查点，爬虫正在运行中...")
+        progress_file = store.log_path
         
         # 分析进度数据
-        games_data, failed_data = analyze_progress_data(progress_file, failed_file)
+        games_data, failed_data = analyze_progress_data(store)
         
         if games_data or failed_data:
             display_progress_stats(games_data, failed_data)
@@ -0,0 +1,220 @@
+# scripts/crawler/page_snapshot.py - 页面快照，用本地lxml树模拟WebDriver的元素查找接口
+"""
+页面快照
+页面加载完成后只取一次page_source，之后所有find_element/find_elements、
+.text和get_attribute都在本地lxml树上完成，不再与浏览器往返；
+.text按浏览器的可见文本规则计算(跳过script/style和隐藏元素、块级元素换行、合并空白)，
+src/href等URL属性按页面地址解析为绝对URL，与WebDriver返回值保持一致
+"""
+
+import re
+from urllib.parse import urljoin
+import lxml.html
+from lxml.cssselect import CSSSelector
+
+try:
+    from selenium.common.exceptions import NoSuchElementException
+except ImportError:
+    class NoSuchElementException(Exception):
+        """未安装selenium时使用的同名异常"""
+
+# 不产生可见文本的标签
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'head', 'meta', 'link'}
+
+# 块级标签，前后产生换行
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'body', 'dd', 'details', 'dialog', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'html', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'table', 'tbody', 'td',
+    'tfoot', 'th', 'thead', 'tr', 'ul'
+}
+
+# WebDriver通过DOM属性返回绝对URL的属性
+URL_ATTRIBUTES = {'src', 'href', 'action', 'poster'}
+
+# WebDriver在属性缺失时返回空字符串的字符串属性
+STRING_PROPERTIES = {'alt', 'content', 'width', 'height', 'title', 'id', 'name', 'value'}
+
+HIDDEN_STYLE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden', re.I)
+WHITESPACE = re.compile(r'\s+')
+SPACES = re.compile(r' {2,}')
+
+# 编译后的CSS选择器缓存，同一选择器在所有页面间复用
+_selector_cache = {}
+
+
+def _compile_css(selector):
+    """编译并缓存CSS选择器"""
+    compiled = _selector_cache.get(selector)
+    if compiled is None:
+        compiled = CSSSelector(selector)
+        _selector_cache[selector] = compiled
+    return compiled
+
+
+def _is_hidden(node):
+    """判断元素本身是否通过属性或内联样式隐藏"""
+    if node.get('hidden') is not None:
+        return True
+    if node.tag == 'input' and (node.get('type') or '').lower() == 'hidden':
+        return True
+    return bool(HIDDEN_STYLE.search(node.get('style') or ''))
+
+
+def _find(root, by, value):
+    """按WebDriver的定位方式在lxml树中查找元素"""
+    if by == 'css selector':
+        return _compile_css(value)(root)
+    if by == 'xpath':
+        return [node for node in root.xpath(value) if isinstance(node, lxml.html.HtmlElement)]
+    if by == 'tag name':
+        return list(root.iterdescendants(value.lower()))
+    if by == 'id':
+        return root.xpath('.//*[@id=$value]', value=value)
+    if by == 'class name':
+        return _compile_css('.' + value)(root)
+    if by == 'name':
+        return root.xpath('.//*[@name=$value]', value=value)
+    raise ValueError(f"不支持的定位方式: {by}")
+
+
+class SnapshotElement:
+    """快照中的元素，提供与WebElement相同的text和get_attribute"""
+
+    def __init__(self, node, snapshot):
+        self._node = node
+        self._snapshot = snapshot
+
+    @property
+    def tag_name(self):
+        return self._node.tag
+
+    @property
+    def text(self):
+        """元素的可见文本，规则与WebElement.text一致"""
+        return self._snapshot.visible_text(self._node)
+
+    @property
+    def attributes(self):
+        """元素的全部原始属性 {属性名: 值}"""
+        return dict(self._node.attrib)
+
+    def get_attribute(self, name):
+        """
+        获取属性值
+
+        Args:
+            name (str): 属性名
+
+        Returns:
+            str or None: 属性值，URL属性解析为绝对地址
+        """
+        value = self._node.get(name)
+        if value is None:
+            return "" if name in STRING_PROPERTIES else None
+        if name in URL_ATTRIBUTES:
+            return urljoin(self._snapshot.base_url, value.strip())
+        return value
+
+    def find_element(self, by, value):
+        return self._snapshot._wrap_first(_find(self._node, by, value), by, value)
+
+    def find_elements(self, by, value):
+        return [SnapshotElement(node, self._snapshot) for node in _find(self._node, by, value)]
+
+
+class PageSnapshot:
+    """页面快照
+
+    接口与WebDriver的find_element、find_elements、title、current_url、page_source一致，
+    可直接替换提取函数中的self.driver
+    """
+
+    def __init__(self, page_source, current_url):
+        """
+        解析页面快照
+
+        Args:
+            page_source (str): driver.page_source
+            current_url (str): driver.current_url
+        """
+        self.page_source = page_source
+        self.current_url = current_url
+        self.root = lxml.html.document_fromstring(page_source)
+
+        base = self.root.find('.//base[@href]')
+        self.base_url = urljoin(current_url, base.get('href')) if base is not None else current_url
+
+        self._text_cache = {}
+
+    @property
+    def title(self):
+        """与document.title相同：合并空白后的<title>文本"""
+        title = self.root.find('.//title')
+        if title is None:
+            return ""
+        return WHITESPACE.sub(' ', title.text_content()).strip()
+
+    def find_element(self, by, value):
+        """
+        查找第一个匹配元素
+
+        Raises:
+            NoSuchElementException: 没有匹配元素
+        """
+        return self._wrap_first(_find(self.root, by, value), by, value)
+
+    def find_elements(self, by, value):
+        """查找所有匹配元素，没有时返回空列表"""
+        return [SnapshotElement(node, self) for node in _find(self.root, by, value)]
+
+    def _wrap_first(self, nodes, by, value):
+        if not nodes:
+            raise NoSuchElementException(f"Unable to locate element: {{\"method\":\"{by}\",\"selector\":\"{value}\"}}")
+        return SnapshotElement(nodes[0], self)
+
+    def visible_text(self, node):
+        """
+        计算元素的可见文本(带缓存)，隐藏元素及其后代返回空字符串
+
+        Args:
+            node (lxml.html.HtmlElement): 元素节点
+
+        Returns:
+            str: 可见文本
+        """
+        cached = self._text_cache.get(node)
+        if cached is not None:
+            return cached
+
+        for ancestor in node.iterancestors():
+            if ancestor.tag in SKIP_TAGS or _is_hidden(ancestor):
+                self._text_cache[node] = ""
+                return ""
+
+        parts = []
+        self._collect_text(node, parts)
+        lines = (SPACES.sub(' ', line).strip() for line in ''.join(parts).split('\n'))
+        text = '\n'.join(line for line in lines if line)
+        self._text_cache[node] = text
+        return text
+
+    def _collect_text(self, node, parts):
+        """按浏览器规则收集文本片段，块级元素和<br>产生换行"""
+        if not isinstance(node.tag, str) or node.tag in SKIP_TAGS or _is_hidden(node):
+            return
+        if node.tag == 'br':
+            parts.append('\n')
+            return
+
+        block = node.tag in BLOCK_TAGS
+        if block:
+            parts.append('\n')
+        if node.text:
+            parts.append(WHITESPACE.sub(' ', node.text))
+        for child in node:
+            self._collect_text(child, parts)
+            if child.tail:
+                parts.append(WHITESPACE.sub(' ', child.tail))
+        if block:
+            parts.append('\n')
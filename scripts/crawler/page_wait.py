@@ -0,0 +1,190 @@
+# scripts/crawler/page_wait.py - 基于页面就绪条件的等待，替代driver.get之后的固定休眠
+"""
+页面就绪等待
+driver.get之后轮询document.readyState和站点特定的关键元素(如.copy-input、#descriptionId)，
+条件满足立即返回；readyState已complete但关键元素迟迟不出现时(如404页面)只再宽限grace秒，
+最长不超过timeout，并记录每个页面实际的就绪耗时
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# GameDistribution详情页：嵌入代码输入框出现即表示详情区已渲染
+GAMEDISTRIBUTION_DETAIL_SELECTORS = ('.copy-input',)
+# GameDistribution列表页：游戏卡片或游戏链接
+GAMEDISTRIBUTION_LISTING_SELECTORS = ("[class*='ProductItem'], a[href*='/games/']",)
+# GameMonetize详情页：描述区域
+GAMEMONETIZE_DETAIL_SELECTORS = ('#descriptionId',)
+# GameMonetize首页和列表页：游戏链接
+GAMEMONETIZE_LISTING_SELECTORS = ("a[href*='/game'], a[href*='-game']",)
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_GRACE = 2.0
+POLL_INTERVAL = 0.1
+
+# 标记当前文档，导航后标记消失即表示已经是新页面(页面加载策略为none时driver.get会立即返回)
+_MARK_SCRIPT = "window.__pageWaitStale = true;"
+
+# 一次往返同时取旧文档标记、readyState和所有关键元素是否存在
+_READY_SCRIPT = """
+var selectors = arguments[0];
+var stale = window.__pageWaitStale === true;
+for (var i = 0; i < selectors.length; i++) {
+    if (!document.querySelector(selectors[i])) { return [stale, document.readyState, false]; }
+}
+return [stale, document.readyState, true];
+"""
+
+_stats_lock = threading.Lock()
+_stats = {'pages': 0, 'timeouts': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+
+
+class ReadinessTracker:
+    """单个页面的就绪判断
+
+    每次poll对浏览器做一次脚本调用，供wait_for_page_ready和多标签页流水线共用
+    """
+
+    def __init__(self, selectors=(), ready_states=('interactive', 'complete'),
+                 timeout=DEFAULT_TIMEOUT, grace=DEFAULT_GRACE, new_document=False):
+        """
+        Args:
+            selectors (tuple): 必须全部出现的CSS选择器
+            ready_states (tuple): 可接受的document.readyState
+            timeout (float): 最长等待时间(秒)
+            grace (float): readyState为complete后关键元素仍未出现时的额外宽限(秒)
+            new_document (bool): 是否要求导航前用mark_current_document标记的旧文档已被替换
+        """
+        self.selectors = list(selectors)
+        self.ready_states = ready_states
+        self.grace = grace
+        self.new_document = new_document
+        self.start = time.time()
+        self.deadline = self.start + timeout
+        self.complete_at = None
+        self.ready = False
+
+    def poll(self, driver):
+        """
+        检查一次页面状态
+
+        Returns:
+            bool: 是否结束等待(就绪、宽限结束或超时)
+        """
+        try:
+            stale, state, found = driver.execute_script(_READY_SCRIPT, self.selectors)
+        except Exception:
+            # 导航过程中脚本可能执行失败，继续轮询
+            stale, state, found = True, None, False
+
+        now = time.time()
+        if self.new_document and stale:
+            return now >= self.deadline
+        if state in self.ready_states and found:
+            self.ready = True
+            return True
+        if state == 'complete':
+            self.complete_at = self.complete_at or now
+            if now - self.complete_at >= self.grace:
+                return True
+        return now >= self.deadline
+
+    def finish(self, label=''):
+        """
+        结束等待，记录并输出就绪耗时
+
+        Returns:
+            tuple: (是否满足就绪条件, 实际等待秒数)
+        """
+        elapsed = time.time() - self.start
+        _record(elapsed, self.ready)
+        if self.ready:
+            logger.info(f"页面就绪耗时 {elapsed:.2f}秒: {label}")
+        else:
+            logger.warning(f"页面未满足就绪条件 {self.selectors}，等待 {elapsed:.2f}秒 后继续: {label}")
+        return self.ready, elapsed
+
+
+def mark_current_document(driver):
+    """标记当前文档，之后可用new_document=True区分导航后的新页面"""
+    try:
+        driver.execute_script(_MARK_SCRIPT)
+    except Exception:
+        pass
+
+
+def wait_for_page_ready(driver, selectors=(), ready_states=('interactive', 'complete'),
+                        timeout=DEFAULT_TIMEOUT, grace=DEFAULT_GRACE, label=None, new_document=False):
+    """
+    等待页面就绪
+
+    Args:
+        driver (WebDriver): 刚执行过driver.get的浏览器
+        selectors (tuple): 必须全部出现的CSS选择器
+        ready_states (tuple): 可接受的document.readyState
+        timeout (float): 最长等待时间(秒)
+        grace (float): readyState为complete后关键元素仍未出现时的额外宽限(秒)
+        label (str): 日志中显示的页面标识，默认为当前URL
+        new_document (bool): 是否要求旧文档已被替换(配合mark_current_document使用)
+
+    Returns:
+        tuple: (是否满足就绪条件, 实际等待秒数)
+    """
+    tracker = ReadinessTracker(selectors, ready_states, timeout, grace, new_document)
+    while not tracker.poll(driver):
+        time.sleep(POLL_INTERVAL)
+
+    if label is None:
+        try:
+            label = driver.current_url
+        except Exception:
+            label = ''
+    return tracker.finish(label)
+
+
+def load_page(driver, url, selectors=(), **kwargs):
+    """
+    打开页面并等待新页面就绪，页面加载策略为none时也不会误判旧页面
+
+    Args:
+        driver (WebDriver): 浏览器
+        url (str): 页面URL
+        selectors (tuple): 必须全部出现的CSS选择器
+        **kwargs: 传给wait_for_page_ready的其他参数
+
+    Returns:
+        tuple: (是否满足就绪条件, 实际等待秒数)
+    """
+    mark_current_document(driver)
+    driver.get(url)
+    return wait_for_page_ready(driver, selectors, label=url, new_document=True, **kwargs)
+
+
+def _record(elapsed, ready):
+    """记录就绪耗时统计"""
+    with _stats_lock:
+        _stats['pages'] += 1
+        _stats['total_seconds'] += elapsed
+        _stats['max_seconds'] = max(_stats['max_seconds'], elapsed)
+        if not ready:
+            _stats['timeouts'] += 1
+
+
+def get_wait_stats():
+    """
+    获取本进程的页面就绪统计
+
+    Returns:
+        dict: 页面数、未就绪次数、平均和最长就绪耗时(秒)
+    """
+    with _stats_lock:
+        pages = _stats['pages']
+        return {
+            "pages": pages,
+            "timeouts": _stats['timeouts'],
+            "avg_seconds": round(_stats['total_seconds'] / pages, 2) if pages else 0,
+            "max_seconds": round(_stats['max_seconds'], 2)
+        }
@@ -0,0 +1,224 @@
+# scripts/crawler/rate_limiter.py - 按主机划分的令牌桶限速器，本机所有线程和进程共享
+"""
+按主机的令牌桶限速器
+令牌桶状态保存在系统临时目录下的SQLite文件中，
+同一台机器上的所有线程、所有爬虫进程共享同一份请求预算，
+只有预算真正耗尽时才需要等待，替代各处的time.sleep(random.uniform(1, 3))
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+# 默认共享状态文件，放在系统临时目录保证本机所有进程使用同一份
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), 'littlegames_rate_limiter.db')
+
+# 默认每个主机每秒补充的令牌数和桶容量
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10
+
+
+def normalize_host(url_or_host):
+    """
+    从URL或主机名得到限速使用的主机键
+
+    Args:
+        url_or_host (str): 完整URL或主机名
+
+    Returns:
+        str: 小写且去掉www.前缀的主机名
+    """
+    host = urlparse(url_or_host).netloc if '://' in url_or_host else url_or_host
+    host = host.lower().split('@')[-1].split(':')[0]
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+class HostRateLimiter:
+    """按主机的令牌桶限速器
+
+    采用预约方式：每次请求先扣一个令牌(允许扣成负数)，再按欠额等待，
+    因此所有线程和进程的合计请求速率不会超过rate，且突发不超过burst
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, host_limits=None,
+                 db_path=DEFAULT_DB_PATH):
+        """
+        初始化限速器
+
+        Args:
+            rate (float): 默认每秒令牌数(即每秒请求数)
+            burst (int): 默认桶容量(允许的突发请求数)
+            host_limits (dict): 按主机覆盖的配置 {host: (rate, burst)}
+            db_path (str): 共享状态SQLite文件路径
+        """
+        self.rate = rate
+        self.burst = burst
+        self.host_limits = {normalize_host(h): limits for h, limits in (host_limits or {}).items()}
+        self.db_path = db_path
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # 本进程统计信息 {host: {'requests': n, 'waits': n, 'wait_seconds': s}}
+        self.stats = {}
+
+        self._connect()
+
+    def _connect(self):
+        """获取当前线程的SQLite连接(sqlite3连接不能跨线程共享)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "host TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get_limits(self, host):
+        """
+        获取主机的限速配置
+
+        Returns:
+            tuple: (rate, burst)
+        """
+        return self.host_limits.get(host, (self.rate, self.burst))
+
+    def set_host_limit(self, host, rate, burst):
+        """为指定主机设置独立的速率和突发量"""
+        self.host_limits[normalize_host(host)] = (rate, burst)
+
+    def reserve(self, url_or_host):
+        """
+        预约一个令牌，返回需要等待的秒数(不阻塞)
+
+        Args:
+            url_or_host (str): 请求URL或主机名
+
+        Returns:
+            float: 需要等待的秒数，0表示可立即请求
+        """
+        host = normalize_host(url_or_host)
+        rate, burst = self.get_limits(host)
+        conn = self._connect()
+
+        # BEGIN IMMEDIATE获取写锁，保证跨进程的读-改-写是原子的
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE host = ?", (host,)).fetchone()
+            if row is None:
+                tokens = float(burst)
+            else:
+                tokens = min(float(burst), row[0] + max(0.0, now - row[1]) * rate)
+            tokens -= 1
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (host, tokens, updated_at) VALUES (?, ?, ?)",
+                (host, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        wait = -tokens / rate if tokens < 0 else 0.0
+        self._record(host, wait)
+        return wait
+
+    def acquire(self, url_or_host):
+        """
+        获取请求许可，预算耗尽时阻塞到可以请求为止
+
+        Args:
+            url_or_host (str): 请求URL或主机名
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        wait = self.reserve(url_or_host)
+        if wait > 0:
+            time.sleep(wait)
+        self._local.wait_total = getattr(self._local, 'wait_total', 0.0) + wait
+        return wait
+
+    async def acquire_async(self, url_or_host):
+        """
+        asyncio版本的acquire，预约(SQLite写事务，可能等锁)在默认线程池中执行，
+        等待期间也不阻塞事件循环
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        loop = asyncio.get_running_loop()
+        wait = await loop.run_in_executor(None, self.reserve, url_or_host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def thread_wait_seconds(self):
+        """
+        获取当前线程累计的限速等待时间，用于从页面耗时中扣除排队时间
+
+        Returns:
+            float: 当前线程通过acquire累计等待的秒数
+        """
+        return getattr(self._local, 'wait_total', 0.0)
+
+    def _record(self, host, wait):
+        """记录本进程的限速统计"""
+        with self._lock:
+            host_stats = self.stats.setdefault(host, {'requests': 0, 'waits': 0, 'wait_seconds': 0.0})
+            host_stats['requests'] += 1
+            if wait > 0:
+                host_stats['waits'] += 1
+                host_stats['wait_seconds'] += wait
+
+    def get_stats(self):
+        """
+        获取本进程的限速统计
+
+        Returns:
+            dict: {host: {'requests', 'waits', 'wait_seconds'}}
+        """
+        with self._lock:
+            return {host: dict(values) for host, values in self.stats.items()}
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    获取进程内共享的限速器实例(跨进程共享由SQLite状态文件保证)
+
+    Returns:
+        HostRateLimiter: 共享限速器
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = HostRateLimiter()
+        return _shared_limiter
+
+
+def configure_rate_limiter(rate=DEFAULT_RATE, burst=DEFAULT_BURST, host_limits=None,
+                           db_path=DEFAULT_DB_PATH):
+    """
+    重新配置进程内共享的限速器，一般在命令行参数解析后调用
+
+    Returns:
+        HostRateLimiter: 新的共享限速器
+    """
+    global _shared_limiter
+    with _shared_lock:
+        _shared_limiter = HostRateLimiter(rate=rate, burst=burst, host_limits=host_limits, db_path=db_path)
+        return _shared_limiter
@@ -0,0 +1,159 @@
+# scripts/crawler/seen_set.py - 基于内存映射布隆过滤器的已见URL集合
+"""
+已见URL集合
+用持久化的布隆过滤器代替内存中的URL字符串集合：位数组保存在磁盘文件中并通过mmap映射，
+启动时无需解析历史数据，内存占用只取决于预设容量，与已采集的URL数量和站点数量无关；
+键为url_key(游戏页为站点:slug)，误判率在容量内不超过设定值，
+误判的后果是把极少数新游戏当作已见而跳过，不会重复采集
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from url_canonicalizer import url_key
+
+# 默认文件目录，跟随输出目录保存，跨运行保留
+DEFAULT_SEEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output')
+
+# 默认容量和误判率：500万个URL、万分之一误判，位数组约12MB
+DEFAULT_CAPACITY = 5_000_000
+DEFAULT_ERROR_RATE = 0.0001
+
+# 文件头：魔数、位数m、哈希函数个数k、已加入数量、容量
+_MAGIC = b'LGBLOOM1'
+_HEADER = struct.Struct('<8sQIQQ')
+_HEADER_SIZE = 64
+
+
+def optimal_parameters(capacity, error_rate):
+    """
+    计算布隆过滤器的位数和哈希函数个数
+
+    Returns:
+        tuple: (位数m, 哈希函数个数k)
+    """
+    bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class BloomSeenSet:
+    """磁盘上的布隆过滤器，支持in和add"""
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        """
+        打开或创建过滤器文件；文件已存在时沿用文件中的参数
+
+        Args:
+            path (str): 过滤器文件路径
+            capacity (int): 预计最多加入的URL数量
+            error_rate (float): 达到容量时的误判率
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        if not os.path.exists(path):
+            bits, hashes = optimal_parameters(capacity, error_rate)
+            with open(path, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, bits, hashes, 0, capacity).ljust(_HEADER_SIZE, b'\0'))
+                f.truncate(_HEADER_SIZE + (bits + 7) // 8)
+
+        self._file = open(path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, self.bits, self.hashes, self._count, self.capacity = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"不是有效的已见URL集合文件: {path}")
+
+    def _positions(self, url):
+        """双重哈希生成k个位位置"""
+        digest = hashlib.blake2b(url_key(url).encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        h2 |= 1  # 保证步长为奇数，避免位置重复
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, url):
+        mm = self._mm
+        for pos in self._positions(url):
+            if not mm[_HEADER_SIZE + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def add(self, url):
+        """
+        加入URL
+
+        Returns:
+            bool: 加入前是否不存在(已存在或误判时返回False)
+        """
+        positions = self._positions(url)
+        mm = self._mm
+        with self._lock:
+            added = False
+            for pos in positions:
+                offset = _HEADER_SIZE + (pos >> 3)
+                bit = 1 << (pos & 7)
+                byte = mm[offset]
+                if not byte & bit:
+                    mm[offset] = byte | bit
+                    added = True
+            if added:
+                self._count += 1
+                struct.pack_into('<Q', mm, 20, self._count)
+        return added
+
+    def update(self, urls):
+        """
+        批量加入URL
+
+        Returns:
+            int: 新加入的数量
+        """
+        return sum(1 for url in urls if self.add(url))
+
+    def __len__(self):
+        """已加入的URL数量(误判的重复加入不计入)"""
+        return self._count
+
+    def false_positive_rate(self):
+        """按当前数量估算的误判率"""
+        return (1 - math.exp(-self.hashes * self._count / self.bits)) ** self.hashes
+
+    def flush(self):
+        """把修改写回磁盘"""
+        self._mm.flush()
+
+    def close(self):
+        """写回并关闭文件"""
+        if getattr(self, '_mm', None) is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        if getattr(self, '_file', None) is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_seen_set(name, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE, directory=DEFAULT_SEEN_DIR):
+    """
+    打开输出目录下的已见URL集合
+
+    Args:
+        name (str): 集合名，文件为seen_<name>.bloom
+        capacity (int): 新建时的容量
+        error_rate (float): 新建时的误判率
+
+    Returns:
+        BloomSeenSet: 已见URL集合
+    """
+    return BloomSeenSet(os.path.join(directory, f"seen_{name}.bloom"), capacity, error_rate)
@@ -0,0 +1,283 @@
+# scripts/crawler/sitemap_discovery.py - 基于sitemap的流式游戏URL发现
+"""
+sitemap流式URL发现
+从robots.txt找到站点地图(找不到时用/sitemap.xml)，流式下载sitemap索引和子sitemap
+(支持.gz压缩)，用iterparse增量解析，每处理完一个<url>就清理已解析的元素，
+内存占用与sitemap大小无关；产出(游戏URL, lastmod)，可只保留上次采集之后更新过的条目
+"""
+
+import gzip
+import io
+import logging
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+import requests
+from game_detail_requests import DEFAULT_HEADERS
+from listing_discovery import GAMEMONETIZE_BASE_URL
+from url_canonicalizer import classify_url, url_key, KIND_GAME
+from rate_limiter import get_rate_limiter
+import json_codec
+
+logger = logging.getLogger(__name__)
+
+# 记录每个站点上次采集时间，用于只采集更新过的条目
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output', 'sitemap_state.json')
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def parse_lastmod(value):
+    """
+    解析W3C日期格式的lastmod(2024-05-01 / 2024-05-01T10:00:00+08:00 / ...Z)
+
+    Returns:
+        datetime: 带时区的UTC时间，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value[:10], '%Y-%m-%d')
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _local_name(tag):
+    """去掉命名空间的标签名"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_sitemap(stream):
+    """
+    增量解析sitemap或sitemap索引
+
+    Args:
+        stream (file): 二进制流，gzip压缩的内容会自动解压
+
+    Yields:
+        tuple: (类型'url'/'sitemap', loc, lastmod字符串或None)
+    """
+    if not hasattr(stream, 'peek'):
+        stream = io.BufferedReader(stream)
+    if stream.peek(2)[:2] == _GZIP_MAGIC:
+        stream = gzip.GzipFile(fileobj=stream)
+
+    root = None
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            continue
+        kind = _local_name(elem.tag)
+        if kind not in ('url', 'sitemap'):
+            continue
+        loc = lastmod = None
+        for child in elem:
+            name = _local_name(child.tag)
+            if name == 'loc':
+                loc = (child.text or '').strip()
+            elif name == 'lastmod':
+                lastmod = (child.text or '').strip()
+        # 已处理的条目从根节点上移除，保持内存恒定
+        root.clear()
+        if loc:
+            yield kind, loc, lastmod
+
+
+class SitemapDiscovery:
+    """站点sitemap遍历器"""
+
+    def __init__(self, base_url=GAMEMONETIZE_BASE_URL, timeout=30):
+        """
+        初始化遍历器
+
+        Args:
+            base_url (str): 站点首页
+            timeout (int): 请求超时时间(秒)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.rate_limiter = get_rate_limiter()
+        self.stats = {'sitemaps': 0, 'entries': 0, 'games': 0, 'skipped_old': 0, 'failed': 0}
+        self.failed_sitemaps = []  # 请求或解析失败的sitemap，其中的条目可能没有全部产出
+
+    def root_sitemaps(self):
+        """
+        从robots.txt读取Sitemap声明
+
+        Returns:
+            list: sitemap地址，robots.txt中没有声明时返回/sitemap.xml
+        """
+        robots_url = self.base_url + '/robots.txt'
+        try:
+            self.rate_limiter.acquire(robots_url)
+            response = self.session.get(robots_url, timeout=self.timeout)
+            if response.ok:
+                sitemaps = [line.split(':', 1)[1].strip() for line in response.text.splitlines()
+                            if line.lower().startswith('sitemap:')]
+                if sitemaps:
+                    return sitemaps
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"读取robots.txt失败: {e}")
+        return [self.base_url + '/sitemap.xml']
+
+    def _stream(self, url):
+        """流式请求一个sitemap并逐条解析"""
+        self.rate_limiter.acquire(url)
+        with self.session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True  # 处理Content-Encoding: gzip，.gz文件本身由parse_sitemap解压
+            self.stats['sitemaps'] += 1
+            yield from parse_sitemap(response.raw)
+
+    def iter_game_urls(self, since=None):
+        """
+        遍历站点所有sitemap，产出游戏URL
+
+        Args:
+            since (datetime): 只产出lastmod晚于该时间的条目；没有lastmod的条目始终产出
+
+        Yields:
+            tuple: (规范化后的游戏URL, lastmod的datetime或None)；不同sitemap之间的重复条目不去重；
+                单个sitemap失败时记录到failed_sitemaps并继续，调用方据此判断是否完整遍历
+        """
+        pending = list(self.root_sitemaps())
+        visited = set()
+        while pending:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            try:
+                for kind, loc, lastmod in self._stream(sitemap_url):
+                    modified = parse_lastmod(lastmod)
+                    if kind == 'sitemap':
+                        # 子sitemap本身的lastmod早于since时，其中不会有更新的条目
+                        if since and modified and modified <= since:
+                            continue
+                        pending.append(urljoin(sitemap_url, loc))
+                        continue
+                    self.stats['entries'] += 1
+                    info = classify_url(loc)
+                    if info is None or info.kind != KIND_GAME:
+                        continue
+                    if since and modified and modified <= since:
+                        self.stats['skipped_old'] += 1
+                        continue
+                    self.stats['games'] += 1
+                    yield info.url, modified
+            except (requests.exceptions.RequestException, ET.ParseError, OSError) as e:
+                logger.warning(f"解析sitemap失败 {sitemap_url}: {e}")
+                self.stats['failed'] += 1
+                self.failed_sitemaps.append(sitemap_url)
+
+        logger.info(f"sitemap遍历完成: {self.stats['sitemaps']} 个sitemap，{self.stats['games']} 个游戏，"
+                    f"跳过未更新 {self.stats['skipped_old']} 个，失败 {self.stats['failed']} 个sitemap")
+
+    def is_complete(self):
+        """上次遍历是否没有失败的sitemap(只有这时才能推进增量时间点)"""
+        return not self.failed_sitemaps
+
+
+def load_last_crawl(base_url, path=DEFAULT_STATE_PATH):
+    """
+    读取站点上次采集的时间
+
+    Returns:
+        datetime: 上次采集时间，没有记录时返回None
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return parse_lastmod(json_codec.load(f).get(base_url.rstrip('/')))
+    except (OSError, ValueError) as e:
+        logger.warning(f"读取sitemap状态失败: {e}")
+        return None
+
+
+def save_last_crawl(base_url, crawled_at=None, path=DEFAULT_STATE_PATH):
+    """记录站点本次采集的开始时间，下次只采集此后更新的条目"""
+    state = {}
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json_codec.load(f)
+        except (OSError, ValueError):
+            state = {}
+    state[base_url.rstrip('/')] = (crawled_at or datetime.now(timezone.utc)).isoformat()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json_codec.dump(state, f, pretty=True)
+
+
+def discover_sitemap_urls(base_url=GAMEMONETIZE_BASE_URL, limit=None, since=None):
+    """
+    从sitemap获取游戏URL列表
+
+    Args:
+        base_url (str): 站点首页
+        limit (int): 最多返回多少个URL
+        since (datetime): 只返回lastmod晚于该时间的游戏
+
+    Returns:
+        list: 按游戏键去重后的游戏URL
+    """
+    urls = {}
+    for url, _ in SitemapDiscovery(base_url).iter_game_urls(since=since):
+        urls.setdefault(url_key(url), url)
+        if limit is not None and len(urls) >= limit:
+            break
+    return list(urls.values())
+
+
+def main():
+    """命令行入口：导出站点sitemap中的游戏URL"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='基于sitemap的游戏URL发现')
+    parser.add_argument('--site', default=GAMEMONETIZE_BASE_URL, help='站点首页地址')
+    parser.add_argument('--since', default=None, help='只导出lastmod晚于该时间的游戏(如2024-05-01)')
+    parser.add_argument('--incremental', action='store_true', help='只导出上次导出之后更新的游戏')
+    parser.add_argument('--output', default=None, help='输出JSON Lines文件路径')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    since = parse_lastmod(args.since) if args.since else None
+    if args.incremental:
+        since = load_last_crawl(args.site)
+        print(f"📅 上次导出时间: {since.isoformat() if since else '无，导出全部'}")
+
+    started_at = datetime.now(timezone.utc)
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output',
+                                         'sitemap_game_urls.jsonl')
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    count = 0
+    discovery = SitemapDiscovery(args.site)
+    # 逐行写出，不在内存中保留完整列表
+    with open(output, 'w', encoding='utf-8') as f:
+        for url, modified in discovery.iter_game_urls(since=since):
+            f.write(json_codec.dumps({'url': url, 'lastmod': modified.isoformat() if modified else None}) + '\n')
+            count += 1
+
+    if discovery.is_complete():
+        save_last_crawl(args.site, started_at)
+    else:
+        print(f"⚠️ {len(discovery.failed_sitemaps)} 个sitemap失败，保留上次的增量时间点")
+    print(f"✅ 导出 {count} 个游戏URL到 {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# scripts/crawler/tab_pipeline.py - 单个Chrome内的多标签页流水线
+"""
+多标签页流水线
+同一个浏览器保持N个标签页同时加载页面，轮询各标签页的就绪状态，
+哪个先就绪就先在哪个标签页提取，提取完立即装入下一个URL；
+要求浏览器的页面加载策略为none(driver.get立即返回)，否则导航会逐个阻塞
+"""
+
+import logging
+import time
+from collections import deque
+from page_wait import ReadinessTracker, mark_current_document, DEFAULT_TIMEOUT, DEFAULT_GRACE, POLL_INTERVAL
+from rate_limiter import get_rate_limiter
+from resource_blocker import install_resource_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class TabPipeline:
+    """多标签页流水线
+
+    所有WebDriver调用都在调用线程中完成，一个流水线只能被一个线程使用
+    """
+
+    def __init__(self, driver, tabs=4, ready_selectors=(), timeout=DEFAULT_TIMEOUT, grace=DEFAULT_GRACE,
+                 resource_allow=None):
+        """
+        初始化流水线
+
+        Args:
+            driver (WebDriver): 页面加载策略为none的Chrome浏览器
+            tabs (int): 同时加载的标签页数量
+            ready_selectors (tuple): 页面就绪时必须出现的CSS选择器
+            timeout (float): 单个页面最长等待时间(秒)
+            grace (float): readyState为complete后关键元素仍未出现时的额外宽限(秒)
+            resource_allow (tuple): 资源拦截的放行列表，新打开的标签页按此启用拦截(CDP规则按标签页生效)；
+                None表示不拦截
+        """
+        self.driver = driver
+        self.tabs = max(1, tabs)
+        self.ready_selectors = ready_selectors
+        self.timeout = timeout
+        self.grace = grace
+        self.resource_allow = resource_allow
+        self.rate_limiter = get_rate_limiter()
+        self.handles = []
+
+    def _ensure_tabs(self):
+        """打开足够数量的标签页，复用上一次运行留下的标签页"""
+        existing = set(self.driver.window_handles)
+        self.handles = [handle for handle in self.handles if handle in existing]
+        if not self.handles:
+            self.handles = [self.driver.current_window_handle]
+        while len(self.handles) < self.tabs:
+            self.driver.switch_to.new_window('tab')
+            if self.resource_allow is not None:
+                install_resource_blocking(self.driver, self.resource_allow)
+            self.handles.append(self.driver.current_window_handle)
+
+    def _start(self, handle, url):
+        """在指定标签页开始加载页面(不等待加载完成)"""
+        self.driver.switch_to.window(handle)
+        mark_current_document(self.driver)
+        self.rate_limiter.acquire(url)
+        self.driver.get(url)
+        return ReadinessTracker(self.ready_selectors, timeout=self.timeout, grace=self.grace, new_document=True)
+
+    def run(self, items, url_of, extract):
+        """
+        流水线处理所有条目
+
+        Args:
+            items (iterable): 待处理条目
+            url_of (callable): 从条目得到页面URL
+            extract (callable): 在当前标签页上提取数据的函数，参数为条目
+
+        Yields:
+            tuple: (条目, 提取结果, 从开始加载到提取完成的秒数)，按完成顺序产出
+        """
+        pending = deque(items)
+        active = {}  # {handle: (item, url, tracker)}
+        self._ensure_tabs()
+
+        while pending or active:
+            for handle in self.handles:
+                if handle not in active and pending:
+                    item = pending.popleft()
+                    url = url_of(item)
+                    active[handle] = (item, url, self._start(handle, url))
+
+            finished = None
+            for handle, (item, url, tracker) in active.items():
+                self.driver.switch_to.window(handle)
+                if tracker.poll(self.driver):
+                    finished = handle
+                    break
+
+            if finished is None:
+                time.sleep(POLL_INTERVAL)
+                continue
+
+            item, url, tracker = active.pop(finished)
+            tracker.finish(url)
+            try:
+                result = extract(item)
+            except Exception as e:
+                logger.error(f"标签页提取失败 {url}: {e}")
+                result = None
+            yield item, result, time.time() - tracker.start
+
+    def close_tabs(self):
+        """关闭额外的标签页，只保留第一个"""
+        if not self.handles:
+            return
+        for handle in self.handles[1:]:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                continue
+        self.driver.switch_to.window(self.handles[0])
+        self.handles = self.handles[:1]
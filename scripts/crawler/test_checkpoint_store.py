@@ -0,0 +1,88 @@
+# scripts/crawler/test_checkpoint_store.py - 测试采集器的追加日志+清单检查点
+"""
+测试检查点存储
+验证中断后从日志恢复、完成后合并为结果文件并清空日志、下次运行重新开始（无需网络和浏览器）
+"""
+
+import os
+import tempfile
+import json_codec
+from checkpoint_store import CheckpointStore, STATUS_IN_PROGRESS, STATUS_COMPLETED
+
+def test_resume_after_interrupt():
+    """未完成的采集重新start时恢复成功和失败记录，残缺的最后一行被忽略"""
+    print("🧪 测试中断后恢复...")
+    directory = tempfile.mkdtemp()
+    store = CheckpointStore('test', directory)
+    assert store.start() == ([], [])
+    assert store.in_progress()
+    store.record_success({'name': 'A'})
+    store.record_success({'name': 'B'})
+    store.record_failure({'url': 'https://example.com/c', 'error': 'timeout'})
+    store.save_manifest(2, 1, last_url='https://example.com/c')
+    store.close()
+    with open(store.log_path, 'ab') as f:
+        f.write(b'{"type":"success","data":{"na')
+
+    # 监控等只读方读取时不修复日志
+    size = os.path.getsize(store.log_path)
+    successes, failures = CheckpointStore('test', directory).load()
+    assert [item['name'] for item in successes] == ['A', 'B'] and len(failures) == 1
+    assert os.path.getsize(store.log_path) == size
+
+    resumed = CheckpointStore('test', directory)
+    successes, failures = resumed.start()
+    assert [item['name'] for item in successes] == ['A', 'B']
+    assert failures == [{'url': 'https://example.com/c', 'error': 'timeout'}]
+    manifest = resumed.read_manifest()
+    assert (manifest['status'], manifest['success'], manifest['last_url']) == (STATUS_IN_PROGRESS, 2,
+                                                                               'https://example.com/c')
+    resumed.record_success({'name': 'D'})
+    assert [item['name'] for item in resumed.load()[0]] == ['A', 'B', 'D']
+    resumed.close()
+    print("✅ 恢复了2个成功、1个失败记录")
+
+def test_finalize_and_restart():
+    """finalize写出结果文件、标记完成并清空日志，下次start从空记录开始"""
+    print("🧪 测试完成与重新开始...")
+    directory = tempfile.mkdtemp()
+    store = CheckpointStore('test', directory)
+    store.start()
+    store.record_success({'name': 'A'})
+    store.record_failure({'url': 'https://example.com/b'})
+    success_file = os.path.join(directory, 'games.json')
+    failed_file = os.path.join(directory, 'failed.json')
+    assert store.finalize(success_file, failed_file) == (1, 1)
+    store.close()
+
+    assert json_codec.load_json(success_file) == [{'name': 'A'}]
+    assert json_codec.load_json(failed_file) == [{'url': 'https://example.com/b'}]
+    manifest = store.read_manifest()
+    assert (manifest['status'], manifest['result_file']) == (STATUS_COMPLETED, success_file)
+    assert os.path.getsize(store.log_path) == 0
+    assert not store.in_progress()
+
+    again = CheckpointStore('test', directory)
+    assert again.start() == ([], [])
+    assert again.read_manifest()['status'] == STATUS_IN_PROGRESS
+    again.close()
+    print("✅ 完成后日志已清空，重新开始")
+
+def test_finalize_without_failed_file():
+    """不写失败结果文件时只统计失败数量，空结果写为[]"""
+    print("🧪 测试不写失败文件...")
+    directory = tempfile.mkdtemp()
+    store = CheckpointStore('test', directory)
+    store.start()
+    store.record_failure({'url': 'https://example.com/a'})
+    success_file = os.path.join(directory, 'games.json')
+    assert store.finalize(success_file) == (0, 1)
+    store.close()
+    assert json_codec.load_json(success_file) == []
+    print("✅ 失败数量正确")
+
+if __name__ == "__main__":
+    test_resume_after_interrupt()
+    test_finalize_and_restart()
+    test_finalize_without_failed_file()
+    print("\n🎉 检查点存储测试全部通过！")
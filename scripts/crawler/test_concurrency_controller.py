@@ -0,0 +1,81 @@
+# scripts/crawler/test_concurrency_controller.py - 测试AIMD自适应并发控制器
+"""
+测试AIMD自适应并发控制器
+验证健康窗口加性增长、错误信号成倍回退以及并发名额阻塞（无需网络和浏览器）
+"""
+
+import threading
+import time
+from concurrency_controller import AdaptiveConcurrencyController, classify_result, classify_status
+
+def test_classify_signals():
+    """测试状态码和结果归类"""
+    print("🧪 测试信号归类...")
+    assert classify_status(429) == 'throttled'
+    assert classify_status(503) == 'server_error'
+    assert classify_status(404) is None
+    assert classify_result({'error': 'Timed out receiving message from renderer'}) == 'timeout'
+    assert classify_result({'error': 'no such element'}) == 'error'
+    assert classify_result({'title': 'ok'}) is None
+    print("✅ 信号归类正确")
+
+def test_additive_increase():
+    """健康窗口逐个增加并发，不超过上限"""
+    print("🧪 测试加性增长...")
+    controller = AdaptiveConcurrencyController(initial_limit=2, max_limit=4, window_size=5)
+    for _ in range(5 * 10):
+        controller.record(1.0)
+    assert controller.limit == 4
+    assert controller.get_stats()['increases'] == 2
+    print(f"✅ 并发增长到 {controller.limit}")
+
+def test_multiplicative_decrease():
+    """429/5xx/超时立即减半，冷却期内不重复减半"""
+    print("🧪 测试成倍回退...")
+    controller = AdaptiveConcurrencyController(initial_limit=8, max_limit=8, cooldown=60)
+    controller.record(1.0, 'throttled')
+    assert controller.limit == 4
+    controller.record(1.0, 'server_error')
+    assert controller.limit == 4
+    print("✅ 回退到 4，冷却期内保持不变")
+
+def test_slow_window_decreases():
+    """窗口p95超过目标时回退"""
+    print("🧪 测试p95超标回退...")
+    controller = AdaptiveConcurrencyController(initial_limit=6, max_limit=10, target_p95=2.0,
+                                               window_size=10, cooldown=0)
+    for _ in range(10):
+        controller.record(5.0)
+    assert controller.limit == 3
+    assert controller.get_stats()['last_p95_seconds'] == 5.0
+    print("✅ p95超标后并发降到 3")
+
+def test_slot_blocks_at_limit():
+    """在途任务达到上限时阻塞，放宽上限后继续"""
+    print("🧪 测试并发名额阻塞...")
+    controller = AdaptiveConcurrencyController(initial_limit=1, max_limit=2, window_size=1)
+    controller.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        with controller.slot():
+            acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    time.sleep(0.1)
+    assert not acquired.is_set()
+    controller.record(0.1)  # 健康样本使上限增加到2
+    assert acquired.wait(1)
+    thread.join()
+    controller.release()
+    assert controller.in_flight == 0
+    print("✅ 上限增加后等待的任务被唤醒")
+
+if __name__ == "__main__":
+    test_classify_signals()
+    test_additive_increase()
+    test_multiplicative_decrease()
+    test_slow_window_decreases()
+    test_slot_blocks_at_limit()
+    print("\n🎉 自适应并发控制器测试全部通过！")
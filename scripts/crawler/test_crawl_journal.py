@@ -0,0 +1,109 @@
+# scripts/crawler/test_crawl_journal.py - 测试只追加的采集日志
+"""
+测试采集日志
+验证重新打开时截掉残缺行、跨读取块边界查找最后检查点、只读读取不修改正在写入的日志以及合并快照（无需网络）
+"""
+
+import os
+import tempfile
+import crawl_journal
+import json_codec
+from crawl_journal import CrawlJournal, iter_journal_records, compact_journal, RECORD_GAME
+
+def _path():
+    return os.path.join(tempfile.mkdtemp(), 'journal.jsonl')
+
+def _games(start, count):
+    return [{'name': f'Game {i}', 'url': f'https://html5.gamedistribution.com/game-{i}/'}
+            for i in range(start, start + count)]
+
+def test_repair_truncates_partial_line():
+    """崩溃留下的残缺行在重新打开时被截掉，之后的追加从完整行继续"""
+    print("🧪 测试截掉残缺行...")
+    path = _path()
+    journal = CrawlJournal(path)
+    journal.append_games(_games(0, 3))
+    journal.close()
+    complete_size = os.path.getsize(path)
+    with open(path, 'ab') as f:
+        f.write(b'{"type":"game","data":{"name":"Gam')
+
+    journal = CrawlJournal(path)
+    assert os.path.getsize(path) == complete_size
+    journal.append_games(_games(3, 1))
+    assert [game['name'] for game in journal.iter_games()] == ['Game 0', 'Game 1', 'Game 2', 'Game 3']
+    journal.close()
+
+    # 整个文件都没有换行时清空
+    with open(path, 'wb') as f:
+        f.write(b'{"type":"game"')
+    CrawlJournal(path).close()
+    assert os.path.getsize(path) == 0
+    print("✅ 残缺行已截掉")
+
+def test_last_checkpoint_across_blocks():
+    """检查点和游戏记录跨越读取块边界时仍能找到最后一个检查点并正确计数"""
+    print("🧪 测试跨块查找检查点...")
+    previous = crawl_journal._TAIL_BLOCK_SIZE
+    # 块比单行还小，每行都会被块边界截断
+    crawl_journal._TAIL_BLOCK_SIZE = 16
+    try:
+        path = _path()
+        journal = CrawlJournal(path)
+        assert journal.last_checkpoint() == (None, 0)
+        journal.append_games(_games(0, 5))
+        assert journal.last_checkpoint() == (None, 5)
+        journal.checkpoint(1, 5, status='running')
+        journal.append_games(_games(5, 7))
+        checkpoint, games_after = journal.last_checkpoint()
+        assert checkpoint['page'] == 1 and checkpoint['status'] == 'running'
+        assert games_after == 7
+        journal.checkpoint(2, 12)
+        checkpoint, games_after = journal.last_checkpoint()
+        assert (checkpoint['page'], checkpoint['total_games'], games_after) == (2, 12, 0)
+        journal.close()
+    finally:
+        crawl_journal._TAIL_BLOCK_SIZE = previous
+    print("✅ 跨块查找正确")
+
+def test_read_only_iteration():
+    """只读读取跳过正在写入的最后一行，不截断也不改动文件"""
+    print("🧪 测试只读读取...")
+    path = _path()
+    journal = CrawlJournal(path)
+    journal.append_games(_games(0, 2))
+    journal.checkpoint(1, 2)
+    journal.append('failed', [{'url': 'https://example.com/x'}])
+    journal.close()
+    with open(path, 'ab') as f:
+        f.write(b'{"type":"game","da')
+    size = os.path.getsize(path)
+
+    records = list(iter_journal_records(path))
+    assert [record_type for record_type, _ in records] == [RECORD_GAME, RECORD_GAME, 'failed']
+    assert [data for _, data in iter_journal_records(path, ('failed',))] == [{'url': 'https://example.com/x'}]
+    assert os.path.getsize(path) == size
+    print("✅ 只读读取不修改日志")
+
+def test_compact_snapshot():
+    """快照包含全部游戏和取自最后检查点的页码，可用普通JSON读取"""
+    print("🧪 测试合并快照...")
+    path = _path()
+    journal = CrawlJournal(path)
+    journal.append_games(_games(0, 3))
+    journal.checkpoint(4, 3)
+    journal.close()
+    snapshot = os.path.join(os.path.dirname(path), 'snapshot.json')
+    assert compact_journal(path, snapshot, source='test') == 3
+    data = json_codec.load_json(snapshot)
+    assert [game['name'] for game in data['games']] == ['Game 0', 'Game 1', 'Game 2']
+    assert (data['source'], data['last_page'], data['total_games']) == ('test', 4, 3)
+    assert not os.path.exists(snapshot + '.tmp')
+    print("✅ 快照正确")
+
+if __name__ == "__main__":
+    test_repair_truncates_partial_line()
+    test_last_checkpoint_across_blocks()
+    test_read_only_iteration()
+    test_compact_snapshot()
+    print("\n🎉 采集日志测试全部通过！")
@@ -0,0 +1,116 @@
+# scripts/crawler/test_discovery_feed.py - 测试边发现边提取的URL生产者
+"""
+测试发现与提取流水线
+验证跨批次去重、提取在发现结束前开始、待领取上限、提前停止和再次运行时重新采集（无需网络和浏览器）
+"""
+
+import os
+import tempfile
+import time
+from discovery_feed import DiscoveryFeed, dedupe_batches
+from url_frontier import UrlFrontier, PRIORITY_NEW
+
+def _frontier():
+    return UrlFrontier(os.path.join(tempfile.mkdtemp(), 'frontier.db'))
+
+def _slow_batches(count, size, delay):
+    """每隔delay秒产出一批URL，模拟逐页发现"""
+    for page in range(count):
+        time.sleep(delay)
+        yield [f'https://gamemonetize.com/game-{page}-{i}-game' for i in range(size)]
+
+def test_dedupe_batches():
+    """跨批次按游戏键去重，并在达到上限时停止"""
+    print("🧪 测试跨批次去重...")
+    batches = [
+        ['https://gamemonetize.com/a-game', 'https://gamemonetize.com/about'],
+        ['https://www.gamemonetize.com/a-game/', 'https://gamemonetize.com/b-game'],
+        ['https://gamemonetize.com/c-game', 'https://gamemonetize.com/d-game'],
+    ]
+    result = list(dedupe_batches(batches, limit=3))
+    assert result == [['https://gamemonetize.com/a-game'],
+                      ['https://gamemonetize.com/b-game'],
+                      ['https://gamemonetize.com/c-game']]
+    print("✅ 去重和上限正确")
+
+def test_extraction_starts_before_discovery_ends():
+    """第一批URL入队后即可领取，总耗时接近max(发现, 提取)"""
+    print("🧪 测试边发现边提取...")
+    frontier = _frontier()
+    start = time.time()
+    feed = DiscoveryFeed(frontier, 'detail', _slow_batches(5, 4, 0.1), priority=PRIORITY_NEW).start()
+    first_claim = None
+    processed = 0
+    while True:
+        claimed = frontier.claim('detail', 'w1', limit=4)
+        if not claimed:
+            if feed.wait_for_urls(timeout=1.0):
+                continue
+            break
+        first_claim = first_claim or time.time() - start
+        feed.notify_claimed()
+        time.sleep(0.1)  # 模拟提取耗时
+        processed += len(claimed)
+    elapsed = time.time() - start
+    assert processed == 20 and feed.added == 20
+    assert first_claim < 0.3
+    assert elapsed < 0.9, elapsed  # 串行需要0.5 + 0.5秒
+    print(f"✅ {first_claim:.2f} 秒开始提取，总耗时 {elapsed:.2f} 秒")
+
+def test_max_pending_and_stop():
+    """待领取达到上限时发现暂停，stop后线程退出"""
+    print("🧪 测试待领取上限...")
+    frontier = _frontier()
+    feed = DiscoveryFeed(frontier, 'detail', _slow_batches(100, 5, 0), priority=PRIORITY_NEW,
+                         max_pending=10).start()
+    time.sleep(0.3)
+    assert frontier.pending_count('detail') == 10
+    feed.stop()
+    assert feed.done
+    print("✅ 发现暂停在10个待领取URL，停止后退出")
+
+def test_unbounded_feed_enqueues_everything():
+    """max_pending为None时不暂停，wait等到全部入队"""
+    print("🧪 测试不限待领取数量...")
+    frontier = _frontier()
+    feed = DiscoveryFeed(frontier, 'detail', _slow_batches(50, 10, 0), priority=PRIORITY_NEW,
+                         max_pending=None).start()
+    assert feed.wait(timeout=5.0)
+    assert frontier.pending_count('detail') == 500 and feed.error is None
+    print("✅ 500个URL全部入队")
+
+def _run_once(frontier, urls, refresh_after):
+    """模拟一次采集运行：边发现边领取，全部标记完成，返回领取数量"""
+    feed = DiscoveryFeed(frontier, 'detail', iter([urls]), priority=PRIORITY_NEW,
+                         refresh_after=refresh_after).start()
+    processed = 0
+    while True:
+        claimed = frontier.claim('detail', 'w1', limit=10)
+        if not claimed:
+            if feed.wait_for_urls(timeout=1.0):
+                continue
+            break
+        for item in claimed:
+            frontier.complete('detail', item['url'])
+        processed += len(claimed)
+    feed.stop()
+    return processed
+
+def test_second_run_recollects():
+    """第二次运行重新发现的已完成URL按refresh_after放回队列"""
+    print("🧪 测试两次运行...")
+    urls = [f'https://gamemonetize.com/game-{i}-game' for i in range(5)]
+    frontier = _frontier()
+    assert _run_once(frontier, urls, refresh_after=0) == 5
+    assert _run_once(frontier, urls, refresh_after=0) == 5
+    assert _run_once(frontier, urls, refresh_after=3600) == 0
+    assert _run_once(frontier, urls, refresh_after=None) == 0
+    print("✅ 第二次运行重新采集了全部5个URL，刷新间隔内不重复采集")
+
+if __name__ == "__main__":
+    test_dedupe_batches()
+    test_extraction_starts_before_discovery_ends()
+    test_max_pending_and_stop()
+    test_unbounded_feed_enqueues_everything()
+    test_second_run_recollects()
+    print("\n🎉 发现与提取流水线测试全部通过！")
@@ -0,0 +1,93 @@
+# scripts/crawler/test_driver_pool.py - 测试常驻WebDriver池的复用与回收
+"""
+测试WebDriver池
+验证空闲浏览器复用、达到页面数上限后回收重建、健康检查失败时丢弃重建以及按借用处理的页面数计数（无需浏览器）
+"""
+
+from driver_pool import DriverPool
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("invalid session id")
+        return 1
+
+class FakeExtractor:
+    """代替GameDetailExtractor，记录是否被关闭"""
+
+    def __init__(self):
+        self.driver = FakeDriver()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+def _make_pool(**kwargs):
+    created = []
+
+    def factory():
+        extractor = FakeExtractor()
+        created.append(extractor)
+        return extractor
+
+    return DriverPool(factory=factory, **kwargs), created
+
+def test_reuse_and_recycle_after_max_pages():
+    """空闲浏览器被复用，处理max_pages_per_driver个页面后关闭，下次借出时重建"""
+    print("🧪 测试页面数上限回收...")
+    pool, created = _make_pool(max_size=1, max_pages_per_driver=3)
+    for _ in range(3):
+        with pool.driver() as extractor:
+            assert extractor is created[0]
+    assert created[0].closed
+
+    with pool.driver() as extractor:
+        assert extractor is created[1]
+    stats = pool.get_stats()
+    assert (stats['pages_processed'], stats['drivers_started'], stats['drivers_recycled']) == (4, 2, 1)
+    pool.close_all()
+    print("✅ 第3页后回收，重建了1个浏览器")
+
+def test_unhealthy_driver_discarded():
+    """空闲浏览器会话失效时丢弃并重建，不借出失效的浏览器"""
+    print("🧪 测试健康检查失败...")
+    pool, created = _make_pool(max_size=2)
+    first = pool.acquire()
+    pool.release(first)
+    first.driver.alive = False
+
+    extractor = pool.acquire()
+    assert extractor is created[1]
+    assert first.closed
+    pool.release(extractor)
+    stats = pool.get_stats()
+    assert (stats['health_check_failures'], stats['drivers_started'], stats['drivers_recycled']) == (1, 2, 0)
+    pool.close_all()
+    print("✅ 失效的浏览器已丢弃重建")
+
+def test_release_counts_pages():
+    """多标签页模式一次借用处理多个页面，按pages计数并触发回收"""
+    print("🧪 测试按页面数归还...")
+    pool, created = _make_pool(max_size=1, max_pages_per_driver=10)
+    extractor = pool.acquire()
+    pool.release(extractor, pages=6)
+    assert not extractor.closed
+    assert pool.acquire() is extractor
+    pool.release(extractor, pages=4)
+    assert extractor.closed
+    assert pool.get_stats()['pages_processed'] == 10
+
+    # 名额在回收后归还，池大小为1时仍可再次借出
+    assert pool.acquire() is created[1]
+    pool.close_all()
+    assert created[1].closed
+    print("✅ 累计10个页面后回收")
+
+if __name__ == "__main__":
+    test_reuse_and_recycle_after_max_pages()
+    test_unhealthy_driver_discarded()
+    test_release_counts_pages()
+    print("\n🎉 WebDriver池测试全部通过！")
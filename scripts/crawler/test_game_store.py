@@ -0,0 +1,122 @@
+# scripts/crawler/test_game_store.py - 测试游戏详情SQLite存储
+"""
+测试游戏详情存储
+验证按规范化URL覆盖写入、索引字段查询、批次清单增量更新、批次文件导出格式和已有批次文件的导入（无需网络和浏览器）
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+from game_store import GameStore
+
+def _game(slug, global_id, batch_id, genre='Action', publisher='Studio A', name=None):
+    """构造与提取结果结构一致的游戏数据"""
+    url = f'https://html5.gamedistribution.com/{slug}/'
+    return {
+        'basic_info': {'name': name or slug, 'url': url},
+        'extraction_time': f'2024-01-0{global_id}T00:00:00',
+        'url': url,
+        'game_info': {'title': name or slug, 'publisher': publisher},
+        'genres': [genre],
+        'success': True,
+        'game_id': {'global_id': global_id, 'batch_id': batch_id, 'extraction_order': global_id}
+    }
+
+def _store():
+    return GameStore(os.path.join(tempfile.mkdtemp(), 'games.db'))
+
+def test_upsert_by_canonical_url():
+    """同一游戏(URL写法不同)再次提取时覆盖原有行并移到新批次"""
+    print("🧪 测试按规范化URL覆盖写入...")
+    store = _store()
+    store.save_batch(1, [_game('alpha', 1, 1), _game('beta', 2, 2)], {'batch_number': 1})
+    again = _game('alpha', 1, 1, genre='Puzzle')
+    again['url'] = again['basic_info']['url'] = 'https://html5.gamedistribution.com/alpha?utm_source=x'
+    written, moved_from = store.save_batch(2, [again], {'batch_number': 2})
+    assert written == 1 and moved_from == {1}
+    assert store.get_by_url('https://html5.gamedistribution.com/alpha/')['genres'] == ['Puzzle']
+    assert [(n, total) for n, _, total, _ in store.batch_summaries()] == [(1, 1), (2, 1)]
+    assert store.processed_names() == {'alpha', 'beta'}
+    assert store.next_batch_number() == 3
+    print("✅ 覆盖写入正确，原批次只剩1个游戏")
+
+def test_find_by_indexed_fields():
+    """按名称、分类、发布商和提取时间查询"""
+    print("🧪 测试索引字段查询...")
+    store = _store()
+    store.save_batch(1, [_game('alpha', 1, 1), _game('beta', 2, 2, genre='Puzzle'),
+                         _game('gamma', 3, 3, publisher='Studio B')], {'batch_number': 1})
+    assert [g['url'] for g in store.find(name='beta')] == ['https://html5.gamedistribution.com/beta/']
+    assert len(store.find(category='Action')) == 2
+    assert len(store.find(publisher='Studio B')) == 1
+    assert [g['game_id']['global_id'] for g in store.find(extracted_after='2024-01-01T23:00:00')] == [3, 2]
+    assert store.get_by_global_id(3)['basic_info']['name'] == 'gamma'
+    print("✅ 查询结果正确")
+
+def test_export_and_import_batch_files():
+    """导出的批次文件保持原有格式，并可重新导入"""
+    print("🧪 测试批次文件导出与导入...")
+    store = _store()
+    games = [_game('alpha', 1, 1), _game('beta', 2, 2)]
+    metadata = {'batch_number': 7, 'total_games': 2, 'success_count': 2,
+                'game_id_range': {'start_id': 1, 'end_id': 2}}
+    store.save_batch(7, games, metadata)
+    batch_dir = tempfile.mkdtemp()
+    path = store.export_batch(7, batch_dir)
+    assert os.path.basename(path) == 'games_batch_007.json'
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    assert data == {'metadata': metadata, 'games': games}
+
+    imported = _store()
+    assert imported.import_batch_files(batch_dir) == 2
+    assert list(imported.iter_batch_games(7)) == games
+    print("✅ 批次文件格式一致，导入后内容相同")
+
+def test_incremental_manifest():
+    """清单随写入增量更新，只导出内容有变化的批次"""
+    print("🧪 测试批次清单...")
+    store = _store()
+    batch_dir = tempfile.mkdtemp()
+    store.save_batch(1, [_game('alpha', 1, 1), _game('beta', 2, 2)], {'batch_number': 1})
+    store.save_batch(2, [_game('gamma', 3, 1)], {'batch_number': 2})
+    assert len(store.export_batches(batch_dir)) == 2
+    assert store.export_batches(batch_dir) == []
+
+    manifest = store.batch_manifest(1)
+    assert manifest['game_keys'] == ['https://html5.gamedistribution.com/alpha', 'https://html5.gamedistribution.com/beta']
+    assert manifest['game_id_range'] == {'start_id': 1, 'end_id': 2}
+    old_hash = manifest['content_hash']
+
+    # beta重新提取到批次3，批次1的清单同步更新，批次2保持不变不重新导出
+    store.save_batch(3, [_game('beta', 2, 1, genre='Puzzle')], {'batch_number': 3})
+    manifest = store.batch_manifest(1)
+    assert manifest['total_games'] == 1 and manifest['content_hash'] != old_hash
+    exported = store.export_batches(batch_dir)
+    assert [os.path.basename(p) for p in exported] == ['games_batch_001.json', 'games_batch_003.json']
+    print("✅ 清单增量更新，只导出了变化的批次")
+
+def test_upgrade_legacy_batches_table():
+    """旧版存储(batches表只有元数据)打开时补齐清单"""
+    print("🧪 测试旧版存储升级...")
+    db_path = os.path.join(tempfile.mkdtemp(), 'games.db')
+    GameStore(db_path).save_batch(1, [_game('alpha', 1, 1)], {'batch_number': 1})
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE legacy AS SELECT batch_number, metadata FROM batches")
+    conn.execute("DROP TABLE batches")
+    conn.execute("ALTER TABLE legacy RENAME TO batches")
+    conn.commit()
+    conn.close()
+
+    manifest = GameStore(db_path).batch_manifest(1)
+    assert manifest['total_games'] == 1 and manifest['content_hash']
+    print("✅ 旧版存储已补齐清单")
+
+if __name__ == "__main__":
+    test_upsert_by_canonical_url()
+    test_find_by_indexed_fields()
+    test_incremental_manifest()
+    test_upgrade_legacy_batches_table()
+    test_export_and_import_batch_files()
+    print("\n🎉 游戏存储测试全部通过！")
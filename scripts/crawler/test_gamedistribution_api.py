@@ -0,0 +1,90 @@
+# scripts/crawler/test_gamedistribution_api.py - 测试GameDistribution分页接口的解析与重放
+"""
+测试GameDistribution分页接口
+验证页码/偏移量字段定位、按页码生成请求、游戏记录转换以及增量分页的提前停止（无需网络和浏览器）
+"""
+
+import json
+import os
+import tempfile
+from urllib.parse import parse_qs, urlsplit
+from gamedistribution_api import ListingEndpoint, ListingApiClient, find_game_list, to_game_record
+from known_urls import KnownUrlIndex
+
+def test_query_page_field():
+    """查询参数中的页码字段"""
+    print("🧪 测试查询参数页码...")
+    endpoint = ListingEndpoint.from_request(
+        {'url': 'https://api.example.com/games?page=2&size=30', 'method': 'GET', 'headers': {}}, ui_page=2)
+    assert endpoint.location == 'query' and endpoint.kind == 'page'
+    _, url, _ = endpoint.request_for(5)
+    assert parse_qs(urlsplit(url).query) == {'page': ['5'], 'size': ['30']}
+    print("✅ 第5页请求生成正确")
+
+def test_graphql_body_offset():
+    """GraphQL请求体variables中的偏移量字段"""
+    print("🧪 测试请求体偏移量...")
+    body = json.dumps({'query': 'query Games', 'variables': {'filters': {'offset': 30, 'limit': 30}}})
+    endpoint = ListingEndpoint.from_request(
+        {'url': 'https://api.example.com/graphql', 'method': 'POST', 'headers': {}, 'postData': body}, ui_page=2)
+    assert endpoint.location == 'body' and endpoint.kind == 'offset' and endpoint.param == 30
+    _, _, page_body = endpoint.request_for(4)
+    assert json.loads(page_body)['variables']['filters'] == {'offset': 90, 'limit': 30}
+    print("✅ 第4页偏移量为90")
+
+def test_zero_based_page():
+    """接口页码从0开始时记录偏差"""
+    print("🧪 测试从0开始的页码...")
+    endpoint = ListingEndpoint.from_request(
+        {'url': 'https://api.example.com/games?pageIndex=1', 'method': 'GET', 'headers': {}}, ui_page=2)
+    assert endpoint.field_value(1) == 0
+    restored = ListingEndpoint.from_dict(endpoint.to_dict())
+    assert restored.request_for(3) == endpoint.request_for(3)
+    print("✅ 页码偏差和保存/读取正确")
+
+def test_game_records():
+    """接口返回的游戏转换为列表页相同结构的记录"""
+    print("🧪 测试游戏记录转换...")
+    data = {'data': {'games': {'items': [
+        {'title': 'Fruit Merge', 'slug': 'fruit-merge', 'company': {'name': 'Studio A'}},
+        {'title': 'Car Race', 'url': '/games/car-race/'}
+    ], 'tags': [{'name': 'puzzle'}]}}}
+    records = [to_game_record(item) for item in find_game_list(data)]
+    assert [record['id'] for record in records] == ['fruit-merge', 'car-race']
+    assert records[0]['url'] == 'https://gamedistribution.com/games/fruit-merge'
+    assert records[0]['company'] == 'Studio A'
+    assert records[1]['company'] == '未知开发商'
+    assert set(records[0]) == {'id', 'name', 'url', 'company', 'collected_at'}
+    print("✅ 记录结构一致")
+
+class FakeApiClient(ListingApiClient):
+    """用固定页面代替接口请求"""
+
+    def __init__(self, pages):
+        super().__init__(endpoint=None, concurrency=2)
+        self.pages = pages
+
+    def fetch_page(self, page):
+        return [{'url': f'https://gamedistribution.com/games/{slug}'} for slug in self.pages.get(page, [])]
+
+def test_incremental_pages():
+    """增量分页只产出未知游戏，连续stop_after页没有新游戏时停止，有新游戏的页面重新计数"""
+    print("🧪 测试增量分页提前停止...")
+    index = KnownUrlIndex(os.path.join(tempfile.mkdtemp(), 'known_urls.db'))
+    index.add(f'https://gamedistribution.com/games/{slug}' for slug in ('a', 'b', 'c', 'd', 'e'))
+    client = FakeApiClient({1: ['a', 'n1'], 2: ['b'], 3: ['c', 'n2'], 4: ['d'], 5: ['e'], 6: ['n3']})
+    pages = [(page, [record['url'].rsplit('/', 1)[1] for record in records])
+             for page, records in client.iter_pages(known_index=index, stop_after=2)]
+    assert pages == [(1, ['n1']), (2, []), (3, ['n2']), (4, []), (5, [])]
+
+    # 非增量模式直到某一页没有新游戏才结束
+    assert len(list(client.iter_pages())) == 6
+    print("✅ 第5页后停止")
+
+if __name__ == "__main__":
+    test_query_page_field()
+    test_graphql_body_offset()
+    test_zero_based_page()
+    test_game_records()
+    test_incremental_pages()
+    print("\n🎉 GameDistribution分页接口测试全部通过！")
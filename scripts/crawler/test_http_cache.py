@@ -0,0 +1,113 @@
+# scripts/crawler/test_http_cache.py - 测试基于ETag/Last-Modified的条件请求缓存
+"""
+测试条件请求HTTP缓存
+验证缓存键归一化、重新验证请求头与304命中读取、解析结果失效、按访问时间淘汰以及总大小估算的定期校正（无需网络）
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+import http_cache
+from http_cache import HttpCache, normalize_cache_url
+
+def _make_cache(max_bytes=None):
+    """在临时目录创建独立文件的缓存"""
+    cache = HttpCache(os.path.join(tempfile.mkdtemp(), 'http_cache_test.db'))
+    if max_bytes is not None:
+        cache.max_bytes = max_bytes
+    return cache
+
+def _total_size(cache):
+    return sqlite3.connect(cache.db_path).execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+def test_normalize_cache_url():
+    """协议和主机小写、去片段、查询参数排序、去末尾斜杠"""
+    print("🧪 测试缓存键归一化...")
+    assert normalize_cache_url('HTTPS://Example.COM/games/a/?b=2&a=1#top') == 'https://example.com/games/a?a=1&b=2'
+    assert normalize_cache_url('https://example.com') == 'https://example.com/'
+    assert normalize_cache_url(' https://example.com/a/ ') == normalize_cache_url('https://example.com/a')
+    print("✅ 缓存键归一化正确")
+
+def test_revalidation_and_304():
+    """缓存条目生成条件请求头，304时读取原页面内容；没有验证器的响应不缓存"""
+    print("🧪 测试重新验证...")
+    cache = _make_cache()
+    body = '<html>游戏页面</html>'.encode('utf-8')
+    cache.store('https://example.com/game/', body, etag='"v1"', last_modified='Wed, 01 May 2024 10:00:00 GMT')
+    entry = cache.lookup('https://EXAMPLE.com/game#details')
+    assert cache.conditional_headers(entry) == {'If-None-Match': '"v1"',
+                                                'If-Modified-Since': 'Wed, 01 May 2024 10:00:00 GMT'}
+    assert cache.load_body('https://example.com/game') == body
+
+    cache.store('https://example.com/no-validators', body)
+    assert cache.lookup('https://example.com/no-validators') is None
+    assert cache.conditional_headers(None) == {}
+
+    cache.record(not_modified=True, parse_skipped=True)
+    cache.record(not_modified=False)
+    report = cache.get_report()
+    assert (report['requests'], report['hits'], report['parse_skips'], report['entries']) == (2, 1, 1, 1)
+    print("✅ 304命中返回缓存内容")
+
+def test_parsed_result_invalidated():
+    """页面重新下载后旧的解析结果失效"""
+    print("🧪 测试解析结果失效...")
+    cache = _make_cache()
+    cache.store('https://example.com/game', b'v1', etag='"v1"')
+    cache.store_parsed('https://example.com/game/', {'title': '游戏'})
+    assert cache.load_parsed('https://example.com/game') == {'title': '游戏'}
+    cache.store('https://example.com/game', b'v2', etag='"v2"')
+    assert cache.load_parsed('https://example.com/game') is None
+    print("✅ 解析结果随页面更新失效")
+
+def test_lru_eviction():
+    """超过上限时淘汰最久未访问的页面，降到上限的90%以下"""
+    print("🧪 测试按访问时间淘汰...")
+    cache = _make_cache(max_bytes=5000)
+    urls = [f'https://example.com/game-{i}' for i in range(4)]
+    for url in urls:
+        cache.store(url, os.urandom(1000), etag='"e"')
+        time.sleep(0.01)
+    cache.load_body(urls[0])  # 最早保存但最近访问
+    time.sleep(0.01)
+    cache.store('https://example.com/game-4', os.urandom(1000), etag='"e"')
+
+    assert cache.evictions == 1
+    assert cache.lookup(urls[1]) is None
+    assert cache.lookup(urls[0]) is not None
+    assert _total_size(cache) <= 5000 * 0.9
+    print(f"✅ 淘汰了最久未访问的页面，剩余 {_total_size(cache)} 字节")
+
+def test_size_estimate_resync():
+    """总大小按估算值判断，只在超过上限或每SIZE_RESYNC_INTERVAL次保存时求和，校正其他进程的写入"""
+    print("🧪 测试总大小估算校正...")
+    previous = http_cache.SIZE_RESYNC_INTERVAL
+    http_cache.SIZE_RESYNC_INTERVAL = 3
+    try:
+        cache = _make_cache(max_bytes=5000)
+        cache.store('https://example.com/first', os.urandom(1000), etag='"e"')
+        # 另一个进程写入同一缓存文件，本进程的估算值不知道这些写入
+        other = HttpCache(cache.db_path)
+        for i in range(4):
+            other.store(f'https://example.com/other-{i}', os.urandom(1000), etag='"e"')
+        assert _total_size(cache) > 5000
+
+        cache.store('https://example.com/small-1', b'x', etag='"e"')
+        cache.store('https://example.com/small-2', b'x', etag='"e"')
+        assert cache.evictions == 0  # 估算值未超过上限，不对整表求和
+        cache.store('https://example.com/small-3', b'x', etag='"e"')
+        assert cache.evictions > 0   # 第3次保存时重新求和并淘汰
+        assert _total_size(cache) <= 5000 * 0.9
+        assert cache._size_estimate == _total_size(cache)
+    finally:
+        http_cache.SIZE_RESYNC_INTERVAL = previous
+    print(f"✅ 校正后淘汰 {cache.evictions} 条")
+
+if __name__ == "__main__":
+    test_normalize_cache_url()
+    test_revalidation_and_304()
+    test_parsed_result_invalidated()
+    test_lru_eviction()
+    test_size_estimate_resync()
+    print("\n🎉 HTTP缓存测试全部通过！")
@@ -0,0 +1,70 @@
+# scripts/crawler/test_json_codec.py - 测试JSON编解码层
+"""
+测试JSON编解码层
+验证两种后端输出可以互相读取、紧凑/缩进格式、文本与二进制文件读写以及orjson不支持时回退标准库
+"""
+
+import io
+import json
+import os
+import tempfile
+import json_codec
+
+SAMPLE = {'name': '游戏 Game', 'tags': ['html5', 'mobile'], 'rating': 4.5, 'plays': 12, 'found': True, 'extra': None}
+
+def _backends():
+    backends = [json_codec.BACKEND_STDLIB]
+    if json_codec.orjson is not None:
+        backends.append(json_codec.BACKEND_ORJSON)
+    return backends
+
+def test_round_trip_across_backends():
+    """每种后端的输出都能被另一种后端和标准库读取"""
+    print("🧪 测试后端互通...")
+    previous = json_codec.get_backend()
+    try:
+        for writer in _backends():
+            json_codec.set_backend(writer)
+            compact = json_codec.dumps(SAMPLE)
+            pretty = json_codec.dumps(SAMPLE, pretty=True)
+            assert '\n' not in compact and '游戏' in compact
+            assert pretty == json.dumps(SAMPLE, ensure_ascii=False, indent=2)
+            for reader in _backends():
+                json_codec.set_backend(reader)
+                assert json_codec.loads(compact) == SAMPLE
+                assert json_codec.loads(compact.encode('utf-8')) == SAMPLE
+    finally:
+        json_codec.set_backend(previous)
+    print(f"✅ 后端 {', '.join(_backends())} 输出一致")
+
+def test_file_helpers():
+    """dump/load支持文本和二进制文件，save_json/load_json读写路径"""
+    print("🧪 测试文件读写...")
+    text = io.StringIO()
+    json_codec.dump(SAMPLE, text)
+    binary = io.BytesIO()
+    json_codec.dump(SAMPLE, binary, pretty=True)
+    assert json_codec.loads(text.getvalue()) == SAMPLE
+    assert json_codec.load(io.BytesIO(binary.getvalue())) == SAMPLE
+
+    path = os.path.join(tempfile.mkdtemp(), 'data.json')
+    json_codec.save_json(path, {'games': [SAMPLE]})
+    with open(path, 'r', encoding='utf-8') as f:
+        assert json_codec.load(f) == {'games': [SAMPLE]}
+    assert json_codec.load_json(path) == {'games': [SAMPLE]}
+    print("✅ 文件读写正确")
+
+def test_fallback_to_stdlib():
+    """orjson不支持的值(超出64位的整数)交给标准库编码"""
+    print("🧪 测试回退标准库...")
+    value = {'big': 2 ** 70}
+    assert json_codec.loads(json_codec.dumps(value)) == value
+    assert json_codec.set_backend('unknown') == json_codec.BACKEND_STDLIB
+    json_codec.set_backend()
+    print(f"✅ 回退正确，当前后端: {json_codec.get_backend()}")
+
+if __name__ == "__main__":
+    test_round_trip_across_backends()
+    test_file_helpers()
+    test_fallback_to_stdlib()
+    print("\n🎉 JSON编解码层测试全部通过！")
@@ -0,0 +1,87 @@
+# scripts/crawler/test_link_harvester.py - 测试一次脚本调用批量获取链接
+"""
+测试批量链接收集
+验证浏览器页面只执行一次脚本、本地页面返回相同结构（无需网络和浏览器）
+"""
+
+import json
+from link_harvester import harvest_links, harvest_hrefs, HARVEST_SCRIPT
+
+class FakeDriver:
+    """记录execute_script调用的驱动"""
+
+    def __init__(self, links):
+        self.links = links
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(args)
+        return json.dumps(self.links)
+
+class FakeElement:
+    """与SnapshotElement接口相同的元素"""
+
+    def __init__(self, tag_name, attributes, text='', children=()):
+        self.tag_name = tag_name
+        self.attributes = attributes
+        self.text = text
+        self.children = list(children)
+
+    def get_attribute(self, name):
+        return self.attributes.get(name)
+
+    def find_elements(self, by, value):
+        return [child for child in self.children if child.tag_name == 'a' and child.get_attribute('href')]
+
+class FakeSnapshot:
+    """没有execute_script的本地页面"""
+
+    def __init__(self, elements):
+        self.elements = elements
+
+    def find_elements(self, by, value):
+        return self.elements
+
+def test_single_script_call():
+    """浏览器页面只往返一次"""
+    print("🧪 测试单次脚本调用...")
+    links = [{'href': f'https://a.com/game-{i}', 'text': f'Game {i}', 'attributes': {}} for i in range(300)]
+    driver = FakeDriver(links)
+    assert harvest_links(driver, 'xpath', '//a', limit=300) == links
+    assert len(driver.calls) == 1
+    assert driver.calls[0] == ('xpath', '//a', 300, ['title', 'onclick'], 'a[href]')
+    assert 'document.evaluate' in HARVEST_SCRIPT and 'querySelectorAll' in HARVEST_SCRIPT
+    print("✅ 300个链接一次取回")
+
+def test_local_page_same_structure():
+    """本地页面：容器元素取其中的链接，只保留data-*和指定属性"""
+    print("🧪 测试本地页面收集...")
+    page = FakeSnapshot([
+        FakeElement('a', {'href': 'https://a.com/game-1', 'data-id': '1', 'class': 'card'}, ' Game 1 '),
+        FakeElement('div', {'onclick': "open('/games/x')"}, 'Game 2',
+                    [FakeElement('a', {'href': 'https://a.com/game-2'})]),
+        FakeElement('div', {}, 'No link'),
+    ])
+    links = harvest_links(page, 'css selector', '.card')
+    assert links[0] == {'href': 'https://a.com/game-1', 'text': 'Game 1', 'attributes': {'data-id': '1'}}
+    assert links[1]['href'] == 'https://a.com/game-2'
+    assert links[1]['attributes'] == {'onclick': "open('/games/x')"}
+    assert links[2]['href'] is None
+    assert harvest_hrefs(page, 'css selector', '.card', limit=2) == ['https://a.com/game-1', 'https://a.com/game-2']
+    print("✅ 结构与页面脚本一致")
+
+def test_unsupported_locator():
+    """只支持CSS选择器和XPath"""
+    print("🧪 测试不支持的定位方式...")
+    try:
+        harvest_links(FakeSnapshot([]), 'tag name', 'a')
+    except ValueError:
+        print("✅ 不支持的定位方式抛出ValueError")
+        return
+    raise AssertionError("应抛出ValueError")
+
+if __name__ == "__main__":
+    test_single_script_call()
+    test_local_page_same_structure()
+    test_unsupported_locator()
+    print("\n🎉 批量链接收集测试全部通过！")
@@ -0,0 +1,104 @@
+# scripts/crawler/test_listing_discovery.py - 测试无浏览器的列表页发现
+"""
+测试列表页发现
+验证列表结束只按列表页自身的链接判断、首页推荐等已知链接只从产出中过滤，
+以及增量模式的已知URL索引和连续无新游戏页数的提前停止（无需网络）
+"""
+
+import os
+import tempfile
+from listing_discovery import ListingDiscovery
+from known_urls import KnownUrlIndex, EarlyStop
+
+def _game(name):
+    return f'https://gamemonetize.com/{name}-game'
+
+class FakeDiscovery(ListingDiscovery):
+    """用固定页面代替HTTP请求的发现器，超出最后一页时只剩导航栏链接"""
+
+    def __init__(self, pages, navigation=()):
+        super().__init__(concurrency=2)
+        self.pages = pages
+        self.navigation = list(navigation)
+
+    def fetch_links(self, url):
+        page = int(url.rsplit('=', 1)[1])
+        return self.pages.get(page, []) + self.navigation
+
+def test_first_page_subset_of_featured():
+    """第1页全是首页推荐游戏时继续发现后续页面，推荐游戏不重复产出"""
+    print("🧪 测试第1页全是推荐游戏...")
+    featured = [_game('a'), _game('b'), _game('c')]
+    pages = {1: [_game('a'), _game('b')], 2: [_game('c'), _game('d')], 3: [_game('e')]}
+    discovery = FakeDiscovery(pages, navigation=[_game('a')])
+
+    batches = list(discovery.iter_discover(known_urls=featured))
+    assert batches == [[_game('d')], [_game('e')]]
+    assert discovery.stats['last_page'] == 3
+    assert discovery.stats['pages_fetched'] == 4
+    print(f"✅ 发现 {sum(len(batch) for batch in batches)} 个新游戏，第4页判定列表结束")
+
+def test_limit_counts_only_new_links():
+    """limit只计算推荐之外的新游戏"""
+    print("🧪 测试上限不计推荐游戏...")
+    featured = [_game('a')]
+    pages = {1: [_game('a'), _game('b')], 2: [_game('c'), _game('d')]}
+    urls = FakeDiscovery(pages).discover(limit=2, known_urls=featured)
+    assert urls == [_game('b'), _game('c')]
+    print("✅ 上限正确")
+
+def _known_index(urls):
+    index = KnownUrlIndex(os.path.join(tempfile.mkdtemp(), 'known_urls.db'))
+    index.add(urls, source='test')
+    return index
+
+def test_known_url_index():
+    """索引按游戏键判断，同一游戏的不同写法都算已知，重复加入不计数"""
+    print("🧪 测试已知URL索引...")
+    index = _known_index([_game('a'), 'https://www.gamemonetize.com/B-Game/'])
+    index.add([_game('a')])
+    assert len(index) == 2
+    assert 'https://www.gamemonetize.com/a-game/?utm_source=x' in index
+    assert index.unknown([_game('b'), _game('c'), _game('a'), _game('d')]) == [_game('c'), _game('d')]
+    # 超过单条语句参数上限时分块查询
+    many = [_game(f'n{i}') for i in range(1200)]
+    assert index.unknown(many) == many
+    print("✅ 已知URL索引正确")
+
+def test_early_stop_counter():
+    """连续stop_after页没有新游戏才停止，有新游戏的页面清零计数"""
+    print("🧪 测试提前停止计数...")
+    early_stop = EarlyStop(stop_after=3)
+    assert [early_stop.observe(count) for count in (0, 0, 2, 0, 0)] == [False] * 5
+    assert early_stop.quiet_pages == 2
+    assert early_stop.observe(0)
+    assert EarlyStop(stop_after=0).observe(0)  # 至少为1页
+    print("✅ 提前停止计数正确")
+
+def test_incremental_stops_after_known_pages():
+    """增量模式只产出未知游戏，连续K页都是已知游戏时停止，中间出现新游戏会重新计数"""
+    print("🧪 测试增量发现提前停止...")
+    index = _known_index([_game(name) for name in 'abcdfg'])
+    pages = {
+        1: [_game('a'), _game('n1')],
+        2: [_game('b'), _game('c')],
+        3: [_game('d'), _game('n2')],   # 有新游戏，计数清零
+        4: [_game('f')],
+        5: [_game('g')],                # 连续第2页全是已知游戏，停止
+        6: [_game('n3')],
+    }
+    discovery = FakeDiscovery(pages, navigation=[_game('nav')])
+    index.add([_game('nav')])
+    batches = list(discovery.iter_discover(known_index=index, stop_after=2))
+    assert batches == [[_game('n1')], [_game('n2')]]
+    assert discovery.stats['last_page'] == 5
+    assert _game('n3') not in discovery.discover(known_index=index, stop_after=2)
+    print("✅ 第5页后停止，只产出2个新游戏")
+
+if __name__ == "__main__":
+    test_first_page_subset_of_featured()
+    test_limit_counts_only_new_links()
+    test_known_url_index()
+    test_early_stop_counter()
+    test_incremental_stops_after_known_pages()
+    print("\n🎉 列表页发现测试全部通过！")
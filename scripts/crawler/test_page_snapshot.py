@@ -0,0 +1,79 @@
+# scripts/crawler/test_page_snapshot.py - 测试页面快照的元素查找和可见文本
+"""
+测试页面快照
+验证快照在本地lxml树上的查找结果、可见文本和属性值与WebDriver的返回规则一致（无需网络和浏览器）
+"""
+
+from page_snapshot import PageSnapshot, NoSuchElementException
+
+SAMPLE_HTML = """
+<html>
+<head>
+  <title>  Moto   Racer - GameMonetize </title>
+  <meta name="keywords" content="racing, moto, 3d">
+  <script>var hidden = "script text";</script>
+</head>
+<body>
+  <h1>Moto
+      Racer</h1>
+  <div id="descriptionId">Race <b>fast</b>&nbsp;and win.<br>Collect coins.</div>
+  <div class="filters"><ul><li><a href="/tags/racing">Racing</a></li><li><a href="/tags/3d">3D</a></li></ul></div>
+  <div class="instructions" style="display: none">Hidden text</div>
+  <img class="cover" src="/images/moto-512x384.jpg" alt="moto game">
+  <iframe src="https://html5.gamemonetize.com/abc/" width="800" height="600"></iframe>
+</body>
+</html>
+"""
+
+def _snapshot():
+    return PageSnapshot(SAMPLE_HTML, "https://gamemonetize.com/moto-racer-game")
+
+def test_title_and_text():
+    """标题和元素文本合并空白，块级元素和<br>换行"""
+    print("🧪 测试标题和可见文本...")
+    page = _snapshot()
+    assert page.title == "Moto Racer - GameMonetize"
+    assert page.find_element("css selector", "h1").text == "Moto Racer"
+    assert page.find_element("css selector", "#descriptionId").text == "Race fast and win.\nCollect coins."
+    print("✅ 文本规则正确")
+
+def test_hidden_and_script_text():
+    """隐藏元素返回空文本，script内容不计入body文本"""
+    print("🧪 测试隐藏元素...")
+    page = _snapshot()
+    assert page.find_element("css selector", ".instructions").text == ""
+    body_text = page.find_element("tag name", "body").text
+    assert "Hidden text" not in body_text
+    assert "script text" not in body_text
+    print("✅ 隐藏内容已排除")
+
+def test_attributes():
+    """URL属性解析为绝对地址，缺失的字符串属性返回空字符串"""
+    print("🧪 测试属性值...")
+    page = _snapshot()
+    img = page.find_element("css selector", "img[alt*='game']")
+    assert img.get_attribute("src") == "https://gamemonetize.com/images/moto-512x384.jpg"
+    assert page.find_element("tag name", "iframe").get_attribute("width") == "800"
+    assert page.find_element("css selector", 'meta[name="keywords"]').get_attribute("content") == "racing, moto, 3d"
+    assert page.find_element("css selector", "h1").get_attribute("alt") == ""
+    assert [a.text for a in page.find_elements("css selector", ".filters li a")] == ["Racing", "3D"]
+    print("✅ 属性值正确")
+
+def test_missing_element():
+    """找不到元素时抛出NoSuchElementException，find_elements返回空列表"""
+    print("🧪 测试缺失元素...")
+    page = _snapshot()
+    assert page.find_elements("css selector", ".rating") == []
+    try:
+        page.find_element("css selector", ".rating")
+        assert False, "应抛出NoSuchElementException"
+    except NoSuchElementException:
+        pass
+    print("✅ 缺失元素处理正确")
+
+if __name__ == "__main__":
+    test_title_and_text()
+    test_hidden_and_script_text()
+    test_attributes()
+    test_missing_element()
+    print("\n🎉 页面快照测试全部通过！")
@@ -0,0 +1,110 @@
+# scripts/crawler/test_rate_limiter.py - 测试按主机令牌桶限速器
+"""
+测试按主机令牌桶限速器
+验证突发额度、跨线程共享预算、主机独立计数以及异步获取不阻塞事件循环（无需网络和浏览器）
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from rate_limiter import HostRateLimiter, normalize_host
+
+def _make_limiter(rate, burst, **kwargs):
+    """在临时目录创建独立状态文件的限速器"""
+    db_path = os.path.join(tempfile.mkdtemp(), 'rate_limiter_test.db')
+    return HostRateLimiter(rate=rate, burst=burst, db_path=db_path, **kwargs)
+
+def test_normalize_host():
+    """测试主机键归一化"""
+    print("🧪 测试主机键归一化...")
+    assert normalize_host("https://www.GameMonetize.com/games?page=2") == "gamemonetize.com"
+    assert normalize_host("http://gamedistribution.com:443/games/") == "gamedistribution.com"
+    assert normalize_host("gamedistribution.com") == "gamedistribution.com"
+    print("✅ 主机键归一化正确")
+
+def test_burst_then_wait():
+    """突发额度内不等待，耗尽后按速率等待"""
+    print("🧪 测试突发额度与等待...")
+    limiter = _make_limiter(rate=10.0, burst=3)
+    waits = [limiter.reserve("https://example.com/a") for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 0.05 < waits[3] <= 0.11
+    assert 0.15 < waits[4] <= 0.21
+    print(f"✅ 等待时间: {[round(w, 3) for w in waits]}")
+
+def test_hosts_are_independent():
+    """不同主机使用独立的令牌桶"""
+    print("🧪 测试主机独立计数...")
+    limiter = _make_limiter(rate=1.0, burst=1)
+    assert limiter.reserve("https://a.example.com/") == 0.0
+    assert limiter.reserve("https://b.example.com/") == 0.0
+    assert limiter.reserve("https://a.example.com/") > 0
+    print("✅ 主机之间互不影响")
+
+def test_host_override():
+    """按主机覆盖的速率生效"""
+    print("🧪 测试按主机覆盖配置...")
+    limiter = _make_limiter(rate=1.0, burst=1, host_limits={"fast.example.com": (100.0, 5)})
+    assert all(limiter.reserve("https://fast.example.com/") == 0.0 for _ in range(5))
+    print("✅ 覆盖配置生效")
+
+def test_shared_budget_across_threads():
+    """多线程共享同一份预算，总速率不超过设定值"""
+    print("🧪 测试多线程共享预算...")
+    limiter = _make_limiter(rate=50.0, burst=5)
+    start = time.time()
+
+    def worker():
+        for _ in range(5):
+            limiter.acquire("https://example.com/")
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    elapsed = time.time() - start
+    # 20个请求，突发5个，其余15个按50/秒需要约0.3秒
+    assert elapsed >= 0.25
+    assert limiter.get_stats()["example.com"]["requests"] == 20
+    print(f"✅ 20个请求耗时 {elapsed:.2f} 秒")
+
+def test_acquire_async_does_not_block_loop():
+    """其他进程持有写锁时，acquire_async等锁期间事件循环仍可运行其他协程"""
+    print("🧪 测试异步获取不阻塞事件循环...")
+    limiter = _make_limiter(rate=10.0, burst=3)
+    limiter.reserve("https://example.com/")  # 先建表
+    holder = sqlite3.connect(limiter.db_path, isolation_level=None, check_same_thread=False)
+    holder.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.3, lambda: holder.execute("COMMIT")).start()
+
+    async def ticker(ticks):
+        for _ in range(5):
+            await asyncio.sleep(0.02)
+            ticks.append(time.time())
+
+    async def run():
+        ticks = []
+        start = time.time()
+        wait, _ = await asyncio.gather(limiter.acquire_async("https://example.com/"), ticker(ticks))
+        return wait, ticks, start
+
+    wait, ticks, start = asyncio.run(run())
+    holder.close()
+    assert wait == 0.0
+    # 写锁释放前ticker已经全部运行完
+    assert ticks[-1] - start < 0.25
+    print(f"✅ 等锁期间事件循环运行了 {len(ticks)} 次")
+
+if __name__ == "__main__":
+    test_normalize_host()
+    test_burst_then_wait()
+    test_hosts_are_independent()
+    test_host_override()
+    test_shared_budget_across_threads()
+    test_acquire_async_does_not_block_loop()
+    print("\n🎉 限速器测试全部通过！")
@@ -0,0 +1,77 @@
+# scripts/crawler/test_seen_set.py - 测试基于布隆过滤器的已见URL集合
+"""
+测试已见URL集合
+验证按url_key去重、重新打开后沿用文件头参数和计数、误判率在设定范围内（无需网络）
+"""
+
+import os
+import tempfile
+from seen_set import BloomSeenSet, open_seen_set, optimal_parameters
+
+def _path():
+    return os.path.join(tempfile.mkdtemp(), 'seen_test.bloom')
+
+def test_url_key_dedupe():
+    """同一游戏的不同写法只计一次"""
+    print("🧪 测试按游戏键去重...")
+    with BloomSeenSet(_path(), capacity=1000, error_rate=0.001) as seen:
+        assert seen.add('https://gamemonetize.com/cool-game')
+        assert not seen.add('http://www.gamemonetize.com/Cool-Game/?utm_source=x')
+        assert 'https://gamemonetize.com/COOL-GAME#top' in seen
+        assert 'https://gamemonetize.com/other-game' not in seen
+        assert seen.update(['https://gamemonetize.com/a-game', 'https://gamemonetize.com/a-game/',
+                            'https://gamemonetize.com/b-game']) == 2
+        assert len(seen) == 3
+    print("✅ 游戏键去重正确")
+
+def test_reopen_keeps_header_and_count():
+    """重新打开时沿用文件中的位数、哈希个数、容量和已加入数量，忽略新传入的参数"""
+    print("🧪 测试重新打开...")
+    path = _path()
+    seen = BloomSeenSet(path, capacity=1000, error_rate=0.001)
+    urls = [f'https://gamemonetize.com/game-{i}-game' for i in range(100)]
+    seen.update(urls)
+    bits, hashes = seen.bits, seen.hashes
+    assert (bits, hashes) == optimal_parameters(1000, 0.001)
+    seen.close()
+
+    reopened = BloomSeenSet(path, capacity=50, error_rate=0.1)
+    assert (reopened.bits, reopened.hashes, reopened.capacity) == (bits, hashes, 1000)
+    assert len(reopened) == 100
+    assert all(url in reopened for url in urls)
+    reopened.add('https://gamemonetize.com/new-game')
+    reopened.close()
+    assert len(BloomSeenSet(path)) == 101
+    print(f"✅ 重新打开后参数和计数不变: m={bits}, k={hashes}")
+
+def test_invalid_file():
+    """不是过滤器文件时抛出ValueError"""
+    print("🧪 测试无效文件...")
+    path = _path()
+    with open(path, 'wb') as f:
+        f.write(b'\0' * 128)
+    try:
+        BloomSeenSet(path)
+    except ValueError:
+        print("✅ 无效文件被拒绝")
+        return
+    raise AssertionError("无效文件未被拒绝")
+
+def test_false_positive_rate():
+    """容量内的实际误判率不超过设定值的数倍"""
+    print("🧪 测试误判率...")
+    directory = tempfile.mkdtemp()
+    with open_seen_set('fp', capacity=5000, error_rate=0.01, directory=directory) as seen:
+        seen.update(f'https://gamemonetize.com/known-{i}-game' for i in range(5000))
+        false_positives = sum(f'https://gamemonetize.com/unknown-{i}-game' in seen for i in range(5000))
+        assert os.path.exists(os.path.join(directory, 'seen_fp.bloom'))
+    rate = false_positives / 5000
+    assert rate < 0.03
+    print(f"✅ 实际误判率 {rate:.4f}")
+
+if __name__ == "__main__":
+    test_url_key_dedupe()
+    test_reopen_keeps_header_and_count()
+    test_invalid_file()
+    test_false_positive_rate()
+    print("\n🎉 已见URL集合测试全部通过！")
@@ -0,0 +1,130 @@
+# scripts/crawler/test_sitemap_discovery.py - 测试基于sitemap的流式游戏URL发现
+"""
+测试sitemap发现
+验证gzip和命名空间的解析、sitemap索引遍历、按上次采集时间过滤以及子sitemap失败时不算完整遍历（无需网络）
+"""
+
+import gzip
+import io
+from datetime import datetime, timezone
+from sitemap_discovery import SitemapDiscovery, parse_sitemap, parse_lastmod
+
+URLSET = b'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url><loc> https://gamemonetize.com/old-game </loc><lastmod>2024-01-01</lastmod>
+    <image:image><image:loc>https://img.gamemonetize.com/old.jpg</image:loc></image:image></url>
+  <url><loc>https://www.gamemonetize.com/new-game/</loc><lastmod>2024-06-01T10:00:00+08:00</lastmod></url>
+  <url><loc>https://gamemonetize.com/undated-game</loc></url>
+  <url><loc>https://gamemonetize.com/about</loc><lastmod>2024-06-01</lastmod></url>
+</urlset>'''
+
+INDEX = b'''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://gamemonetize.com/sitemap-games.xml.gz</loc><lastmod>2024-06-01</lastmod></sitemap>
+  <sitemap><loc>/sitemap-archive.xml</loc><lastmod>2023-01-01</lastmod></sitemap>
+</sitemapindex>'''
+
+ARCHIVE = b'''<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://gamemonetize.com/archived-game</loc><lastmod>2022-12-01</lastmod></url>
+</urlset>'''
+
+class LocalSitemapDiscovery(SitemapDiscovery):
+    """从内存中的sitemap读取，代替robots.txt和HTTP请求"""
+
+    def __init__(self, sitemaps):
+        super().__init__()
+        self.sitemaps = sitemaps
+        self.requested = []
+
+    def root_sitemaps(self):
+        return ['https://gamemonetize.com/sitemap.xml']
+
+    def _stream(self, url):
+        self.requested.append(url)
+        self.stats['sitemaps'] += 1
+        yield from parse_sitemap(io.BytesIO(self.sitemaps[url]))
+
+def test_parse_urlset_with_namespaces():
+    """带命名空间的urlset按条目产出loc和lastmod，忽略图片等扩展标签"""
+    print("🧪 测试解析urlset...")
+    entries = list(parse_sitemap(io.BytesIO(URLSET)))
+    assert entries == [
+        ('url', 'https://gamemonetize.com/old-game', '2024-01-01'),
+        ('url', 'https://www.gamemonetize.com/new-game/', '2024-06-01T10:00:00+08:00'),
+        ('url', 'https://gamemonetize.com/undated-game', None),
+        ('url', 'https://gamemonetize.com/about', '2024-06-01'),
+    ]
+    print(f"✅ 解析出 {len(entries)} 个条目")
+
+def test_parse_gzip_index():
+    """gzip压缩的sitemap索引自动解压，产出子sitemap"""
+    print("🧪 测试解析gzip索引...")
+    entries = list(parse_sitemap(io.BytesIO(gzip.compress(INDEX))))
+    assert [(kind, loc) for kind, loc, _ in entries] == [
+        ('sitemap', 'https://gamemonetize.com/sitemap-games.xml.gz'),
+        ('sitemap', '/sitemap-archive.xml'),
+    ]
+    print("✅ gzip索引解析正确")
+
+def test_parse_lastmod():
+    """W3C日期格式统一转换为UTC"""
+    print("🧪 测试解析lastmod...")
+    assert parse_lastmod('2024-06-01T10:00:00+08:00') == datetime(2024, 6, 1, 2, 0, tzinfo=timezone.utc)
+    assert parse_lastmod('2024-06-01T02:00:00Z') == datetime(2024, 6, 1, 2, 0, tzinfo=timezone.utc)
+    assert parse_lastmod('2024-06-01') == datetime(2024, 6, 1, tzinfo=timezone.utc)
+    assert parse_lastmod('not a date') is None
+    assert parse_lastmod(None) is None
+    print("✅ lastmod解析正确")
+
+def test_since_filter():
+    """只产出lastmod晚于since的游戏，没有lastmod的始终产出，过期的子sitemap不再请求"""
+    print("🧪 测试按上次采集时间过滤...")
+    sitemaps = {
+        'https://gamemonetize.com/sitemap.xml': gzip.compress(INDEX),
+        'https://gamemonetize.com/sitemap-games.xml.gz': gzip.compress(URLSET),
+        'https://gamemonetize.com/sitemap-archive.xml': ARCHIVE,
+    }
+
+    discovery = LocalSitemapDiscovery(sitemaps)
+    urls = [url for url, _ in discovery.iter_game_urls()]
+    assert urls == ['https://gamemonetize.com/old-game', 'https://gamemonetize.com/new-game',
+                    'https://gamemonetize.com/undated-game', 'https://gamemonetize.com/archived-game']
+
+    discovery = LocalSitemapDiscovery(sitemaps)
+    since = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    results = list(discovery.iter_game_urls(since=since))
+    assert [url for url, _ in results] == ['https://gamemonetize.com/new-game',
+                                           'https://gamemonetize.com/undated-game']
+    assert results[1][1] is None
+    assert 'https://gamemonetize.com/sitemap-archive.xml' not in discovery.requested
+    assert discovery.stats['skipped_old'] == 1
+    print(f"✅ 增量过滤后剩 {len(results)} 个游戏")
+
+def test_failed_child_sitemap():
+    """子sitemap被截断时继续遍历其他sitemap，但记录失败，调用方不应推进增量时间点"""
+    print("🧪 测试子sitemap失败...")
+    truncated = URLSET[:URLSET.index(b'<url><loc>https://www.gamemonetize.com/new-game')] + b'<url><loc>https://gamemon'
+    discovery = LocalSitemapDiscovery({
+        'https://gamemonetize.com/sitemap.xml': INDEX,
+        'https://gamemonetize.com/sitemap-games.xml.gz': gzip.compress(truncated),
+        'https://gamemonetize.com/sitemap-archive.xml': ARCHIVE,
+    })
+    urls = [url for url, _ in discovery.iter_game_urls()]
+    assert urls == ['https://gamemonetize.com/old-game', 'https://gamemonetize.com/archived-game']
+    assert discovery.failed_sitemaps == ['https://gamemonetize.com/sitemap-games.xml.gz']
+    assert discovery.stats['failed'] == 1
+    assert not discovery.is_complete()
+
+    complete = LocalSitemapDiscovery({'https://gamemonetize.com/sitemap.xml': ARCHIVE})
+    list(complete.iter_game_urls())
+    assert complete.is_complete()
+    print("✅ 失败的sitemap已记录，遍历不算完整")
+
+if __name__ == "__main__":
+    test_parse_urlset_with_namespaces()
+    test_parse_gzip_index()
+    test_parse_lastmod()
+    test_since_filter()
+    test_failed_child_sitemap()
+    print("\n🎉 sitemap发现测试全部通过！")
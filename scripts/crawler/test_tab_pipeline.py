@@ -0,0 +1,61 @@
+# scripts/crawler/test_tab_pipeline.py - 测试多标签页流水线的标签页准备
+"""
+测试多标签页流水线
+验证新打开的标签页按放行列表启用资源拦截、复用已有标签页（无需浏览器）
+"""
+
+from tab_pipeline import TabPipeline
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, kind):
+        handle = f'tab-{len(self.driver.window_handles)}'
+        self.driver.window_handles.append(handle)
+        self.driver.current_window_handle = handle
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+class FakeDriver:
+    """记录每个标签页收到的CDP命令"""
+
+    def __init__(self):
+        self.window_handles = ['tab-0']
+        self.current_window_handle = 'tab-0'
+        self.switch_to = FakeSwitchTo(self)
+        self.cdp_commands = {}
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_commands.setdefault(self.current_window_handle, []).append(cmd)
+        return {}
+
+def test_new_tabs_block_resources():
+    """第一个标签页由setup_driver启用拦截，其余新标签页由流水线启用"""
+    print("🧪 测试新标签页启用资源拦截...")
+    driver = FakeDriver()
+    pipeline = TabPipeline(driver, tabs=3, resource_allow=())
+    pipeline._ensure_tabs()
+    assert pipeline.handles == ['tab-0', 'tab-1', 'tab-2']
+    assert 'tab-0' not in driver.cdp_commands
+    for handle in ('tab-1', 'tab-2'):
+        assert driver.cdp_commands[handle] == ['Network.enable', 'Network.setBlockedURLs']
+
+    # 再次运行复用已有标签页，不重复打开
+    pipeline._ensure_tabs()
+    assert len(driver.window_handles) == 3
+    print("✅ 新标签页都启用了资源拦截")
+
+def test_no_blocking_without_allow_list():
+    """未传入放行列表时不发送CDP命令"""
+    print("🧪 测试不拦截资源...")
+    driver = FakeDriver()
+    TabPipeline(driver, tabs=2)._ensure_tabs()
+    assert driver.cdp_commands == {}
+    print("✅ 未启用拦截")
+
+if __name__ == "__main__":
+    test_new_tabs_block_resources()
+    test_no_blocking_without_allow_list()
+    print("\n🎉 多标签页流水线测试全部通过！")
@@ -0,0 +1,61 @@
+# scripts/crawler/test_url_canonicalizer.py - 测试URL规范化与分类
+"""
+测试URL规范化与分类
+验证规范化规则、排除规则优先于游戏规则、游戏键和按游戏键去重（无需网络）
+"""
+
+from url_canonicalizer import (canonicalize_url, classify_url, is_game_url, url_key, dedupe_game_urls,
+                               KIND_GAME, KIND_EXCLUDED, KIND_OTHER, KIND_OFFSITE)
+
+def test_canonicalize_url():
+    """https、小写主机、去www/默认端口/片段/跟踪参数/重复和末尾斜杠、查询参数排序"""
+    print("🧪 测试URL规范化...")
+    assert canonicalize_url('HTTP://WWW.GameMonetize.com:443//foo//bar/?utm_source=x&b=2&a=1&fbclid=z#frag') \
+        == 'https://gamemonetize.com/foo/bar?a=1&b=2'
+    assert canonicalize_url('../cool-game/', 'https://gamemonetize.com/games/page') == 'https://gamemonetize.com/cool-game'
+    assert canonicalize_url('http://example.com:8080/a') == 'https://example.com:8080/a'
+    assert canonicalize_url('javascript:void(0)') is None
+    assert canonicalize_url('mailto:a@b.c') is None
+    assert canonicalize_url('') is None
+    print("✅ 规范化正确")
+
+def test_exclude_before_game():
+    """同时符合游戏规则的排除路径按排除处理"""
+    print("🧪 测试排除规则优先...")
+    for path in ('/about-game', '/game-walkthrough-x', '/games', '/games-editor-picks', '/login-game'):
+        info = classify_url('https://gamemonetize.com' + path)
+        assert info.kind == KIND_EXCLUDED and info.key is None, path
+        assert not is_game_url('https://gamemonetize.com' + path)
+    assert classify_url('https://gamemonetize.com/cool-game').kind == KIND_GAME
+    assert classify_url('https://gamedistribution.com/about').kind == KIND_OTHER
+    assert classify_url('https://example.com/x-game').kind == KIND_OFFSITE
+    print("✅ 排除规则优先于游戏规则")
+
+def test_game_key():
+    """同一游戏的不同写法得到相同游戏键，游戏页去掉查询参数"""
+    print("🧪 测试游戏键...")
+    info = classify_url('https://www.gamemonetize.com/Cool-Game/?page=2')
+    assert info.url == 'https://gamemonetize.com/Cool-Game'
+    assert info.key == 'gamemonetize:cool-game'
+    assert url_key('https://gamemonetize.com/cool-game') == url_key('http://www.gamemonetize.com/COOL-GAME/#top')
+    assert url_key('https://gamedistribution.com/games/foo/') == 'gamedistribution:foo'
+    # 非游戏页以规范化URL为键，无法解析时原样返回
+    assert url_key('https://example.com/a/?utm_source=1') == 'https://example.com/a'
+    assert url_key(' not a url ') == 'not a url'
+    print("✅ 游戏键正确")
+
+def test_dedupe_game_urls():
+    """保持顺序按游戏键去重，只保留已知站点的游戏页"""
+    print("🧪 测试按游戏键去重...")
+    urls = ['/a-game', 'https://www.gamemonetize.com/A-Game/', '/about', '/b-game?ref=x',
+            'https://example.com/c-game']
+    assert dedupe_game_urls(urls, 'https://gamemonetize.com/') == [
+        'https://gamemonetize.com/a-game', 'https://gamemonetize.com/b-game']
+    print("✅ 去重正确")
+
+if __name__ == "__main__":
+    test_canonicalize_url()
+    test_exclude_before_game()
+    test_game_key()
+    test_dedupe_game_urls()
+    print("\n🎉 URL规范化测试全部通过！")
@@ -0,0 +1,108 @@
+# scripts/crawler/test_url_frontier.py - 测试持久化优先级URL队列
+"""
+测试持久化URL队列
+验证按优先级领取、领取互斥、失败重试、租约过期回收和刷新排队（无需网络和浏览器）
+"""
+
+import os
+import tempfile
+import threading
+import time
+from url_frontier import UrlFrontier, PRIORITY_HOT, PRIORITY_REFRESH, STATE_FAILED, DEFAULT_REFRESH_AFTER_SECONDS
+
+def _frontier(**kwargs):
+    return UrlFrontier(os.path.join(tempfile.mkdtemp(), 'frontier.db'), **kwargs)
+
+def test_priority_order():
+    """热门URL先于新URL被领取，重复加入只提升优先级"""
+    print("🧪 测试优先级顺序...")
+    frontier = _frontier()
+    assert frontier.add('detail', ['https://a.com/game-1', 'https://a.com/game-2']) == 2
+    assert frontier.add('detail', ['https://a.com/game-2/', 'https://a.com/game-3'], priority=PRIORITY_HOT) == 1
+    urls = [item['url'] for item in frontier.claim('detail', 'w1', limit=3)]
+    assert urls == ['https://a.com/game-2', 'https://a.com/game-3', 'https://a.com/game-1']
+    print("✅ 领取顺序正确")
+
+def test_concurrent_claims_are_exclusive():
+    """多个线程同时领取不会拿到同一个URL"""
+    print("🧪 测试领取互斥...")
+    frontier = _frontier()
+    frontier.add('detail', [f'https://a.com/game-{i}' for i in range(200)])
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(name):
+        while True:
+            items = frontier.claim('detail', name, limit=5)
+            if not items:
+                return
+            with lock:
+                claimed.extend(item['url'] for item in items)
+
+    threads = [threading.Thread(target=worker, args=(f'w{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(claimed) == 200 and len(set(claimed)) == 200
+    print("✅ 200个URL各被领取一次")
+
+def test_fail_retry_and_lease():
+    """失败后延迟重试，超过次数标记失败；租约过期的URL可被重新领取"""
+    print("🧪 测试失败重试与租约...")
+    frontier = _frontier(lease_seconds=0.2, max_attempts=2)
+    frontier.add('detail', ['https://a.com/game-1', 'https://a.com/game-2'])
+    frontier.claim('detail', 'w1', limit=2)
+    assert frontier.fail('detail', 'https://a.com/game-1', 'timeout') != STATE_FAILED
+    assert frontier.fail('detail', 'https://a.com/game-1', 'timeout') == STATE_FAILED
+    assert frontier.claim('detail', 'w2') == []
+    time.sleep(0.3)
+    assert [item['url'] for item in frontier.claim('detail', 'w2')] == ['https://a.com/game-2']
+    print("✅ 重试次数和租约回收正确")
+
+def test_complete_and_refresh():
+    """完成的URL不再领取，刷新后重新排队"""
+    print("🧪 测试完成与刷新...")
+    frontier = _frontier()
+    frontier.add('detail', ['https://a.com/game-1'])
+    frontier.claim('detail', 'w1')
+    frontier.complete('detail', 'https://a.com/game-1')
+    assert frontier.is_done('detail', 'https://a.com/game-1')
+    assert frontier.add('detail', ['https://a.com/game-1']) == 0
+    assert frontier.pending_count('detail') == 0
+    assert frontier.schedule_refresh('detail', older_than_seconds=0) == 1
+    assert frontier.pending_count('detail') == 1
+    frontier.claim('detail', 'w1')
+    frontier.complete('detail', 'https://a.com/game-1')
+    assert frontier.add('detail', ['https://a.com/game-1'], refresh_after=3600) == 0
+    assert frontier.add('detail', ['https://a.com/game-1'], refresh_after=0) == 1
+    assert frontier.pending_count('detail') == 1
+    print("✅ 完成和刷新状态正确")
+
+def test_refreshed_after_unfetched():
+    """中断后重新发现时，按刷新放回的已完成URL排在从未采集过的URL之后"""
+    print("🧪 测试刷新URL的领取顺序...")
+    frontier = _frontier()
+    urls = [f'https://a.com/game-{i}' for i in range(10)]
+    frontier.add('detail', urls)
+    for item in frontier.claim('detail', 'w1', limit=4):
+        frontier.complete('detail', item['url'])
+    # 默认刷新间隔内重新发现：已完成的不放回
+    assert frontier.add('detail', urls, refresh_after=DEFAULT_REFRESH_AFTER_SECONDS) == 0
+    assert frontier.pending_count('detail') == 6
+    # 刷新间隔已过：放回但排在未采集的URL之后
+    assert frontier.add('detail', urls, refresh_after=0) == 4
+    claimed = frontier.claim('detail', 'w1', limit=6)
+    assert [item['url'] for item in claimed] == urls[4:]
+    refreshed = frontier.claim('detail', 'w1', limit=4)
+    assert [item['url'] for item in refreshed] == urls[:4]
+    assert {item['priority'] for item in refreshed} == {PRIORITY_REFRESH}
+    print("✅ 未采集的URL先被领取")
+
+if __name__ == "__main__":
+    test_priority_order()
+    test_concurrent_claims_are_exclusive()
+    test_fail_retry_and_lease()
+    test_complete_and_refresh()
+    test_refreshed_after_unfetched()
+    print("\n🎉 URL队列测试全部通过！")
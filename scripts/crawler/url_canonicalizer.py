@@ -0,0 +1,190 @@
+# scripts/crawler/url_canonicalizer.py - 发现链接的URL规范化与分类
+"""
+URL规范化与分类
+所有发现途径(列表页、分页接口、sitemap、浏览器)共用：
+规范化URL(https、小写主机、去掉www/默认端口/片段/跟踪参数/末尾斜杠、查询参数排序)，
+每个站点的包含/排除规则预编译成一个正则，一次匹配完成分类，
+并把游戏页映射为稳定的游戏键(站点:slug)，同一游戏的不同写法只采集一次
+"""
+
+import re
+from collections import namedtuple
+from urllib.parse import urlsplit, urlunsplit, urljoin, parse_qsl, urlencode
+
+# 跟踪/来源类查询参数，不影响页面内容
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_ga', '_gl',
+    'ref', 'ref_src', 'referer', 'referrer', 'source', 'spm'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# 分类结果
+KIND_GAME = 'game'
+KIND_EXCLUDED = 'excluded'
+KIND_OTHER = 'other'
+KIND_OFFSITE = 'offsite'
+
+UrlInfo = namedtuple('UrlInfo', ['url', 'kind', 'site', 'key'])
+
+
+class SiteRules:
+    """单个站点的分类规则
+
+    排除规则和游戏规则合并为一个正则，对规范化后的路径做一次fullmatch，
+    命中的命名分组即分类结果；排除分组在前，优先于游戏规则；匹配不区分大小写
+    """
+
+    def __init__(self, name, hosts, game_pattern, exclude_patterns=()):
+        """
+        Args:
+            name (str): 站点名，作为游戏键前缀
+            hosts (tuple): 站点主机名(不含www.)
+            game_pattern (str): 游戏页路径的正则，须包含命名分组slug
+            exclude_patterns (tuple): 排除路径的正则片段，路径中任意位置出现即排除
+        """
+        self.name = name
+        self.hosts = tuple(hosts)
+        alternatives = []
+        if exclude_patterns:
+            alternatives.append(f"(?P<excluded>.*(?:{'|'.join(exclude_patterns)}).*)")
+        alternatives.append(f"(?P<game>{game_pattern})")
+        self.pattern = re.compile('|'.join(alternatives), re.IGNORECASE)
+
+    def classify_path(self, path):
+        """
+        分类规范化后的路径
+
+        Returns:
+            tuple: (分类, slug)，非游戏页的slug为None
+        """
+        match = self.pattern.fullmatch(path)
+        if match is None:
+            return KIND_OTHER, None
+        if match.group('game') is not None:
+            return KIND_GAME, match.group('slug').lower()
+        return KIND_EXCLUDED, None
+
+
+SITE_RULES = [
+    SiteRules(
+        'gamemonetize', ('gamemonetize.com',),
+        # 详情页为 /<slug>-game，与原来的"包含/game或-game"规则一致
+        r'/(?P<slug>[^/]*(?:-game|game)[^/]*)',
+        exclude_patterns=(
+            r'/games$', r'/game-walkthrough', r'/games-editor-picks',
+            r'/login', r'/register', r'/contact', r'/about', r'/privacy', r'/terms'
+        )
+    ),
+    SiteRules(
+        'gamedistribution', ('gamedistribution.com',),
+        r'/games/(?P<slug>[^/]+)',
+    ),
+]
+
+_RULES_BY_HOST = {host: rules for rules in SITE_RULES for host in rules.hosts}
+
+
+def _is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url, base_url=None):
+    """
+    规范化URL
+
+    Args:
+        url (str): 原始链接，可以是相对链接
+        base_url (str): 解析相对链接的基准地址
+
+    Returns:
+        str: 规范化后的绝对URL，无法解析为http(s)地址时返回None
+    """
+    if not url:
+        return None
+    url = url.strip()
+    if base_url:
+        url = urljoin(base_url, url)
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _is_tracking_param(key)))
+    return urlunsplit(('https', host, path, query, ''))
+
+
+def classify_url(url, base_url=None):
+    """
+    规范化并分类URL
+
+    Args:
+        url (str): 原始链接
+        base_url (str): 解析相对链接的基准地址
+
+    Returns:
+        UrlInfo: (规范化URL, 分类, 站点名, 游戏键)；非游戏页的游戏键为None，无效链接返回None
+    """
+    canonical = canonicalize_url(url, base_url)
+    if canonical is None:
+        return None
+    parts = urlsplit(canonical)
+    rules = _RULES_BY_HOST.get(parts.hostname)
+    if rules is None:
+        return UrlInfo(canonical, KIND_OFFSITE, None, None)
+    kind, slug = rules.classify_path(parts.path)
+    if kind != KIND_GAME:
+        return UrlInfo(canonical, kind, rules.name, None)
+    # 游戏页的查询参数不影响内容，统一去掉
+    return UrlInfo(urlunsplit((parts.scheme, parts.netloc, parts.path, '', '')), kind, rules.name,
+                   f"{rules.name}:{slug}")
+
+
+def is_game_url(url, base_url=None):
+    """链接是否为已知站点的游戏详情页"""
+    info = classify_url(url, base_url)
+    return info is not None and info.kind == KIND_GAME
+
+
+def url_key(url):
+    """
+    持久化去重用的键：游戏页为游戏键，其他链接为规范化URL
+
+    Returns:
+        str: 去重键
+    """
+    info = classify_url(url)
+    if info is None:
+        return url.strip()
+    return info.key or info.url
+
+
+def dedupe_game_urls(urls, base_url=None):
+    """
+    保持顺序按游戏键去重，只保留游戏页
+
+    Args:
+        urls (iterable): 原始链接
+        base_url (str): 解析相对链接的基准地址
+
+    Returns:
+        list: 规范化后的游戏URL，同一游戏只保留第一次出现
+    """
+    seen = set()
+    result = []
+    for url in urls:
+        info = classify_url(url, base_url)
+        if info is None or info.kind != KIND_GAME or info.key in seen:
+            continue
+        seen.add(info.key)
+        result.append(info.url)
+    return result
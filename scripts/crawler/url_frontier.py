@@ -0,0 +1,279 @@
+# scripts/crawler/url_frontier.py - 所有采集器共享的持久化优先级URL队列
+"""
+持久化URL队列(frontier)
+用SQLite保存待采集URL的队列名、优先级、状态、尝试次数和时间戳，
+领取(claim)在单个写事务中完成，多个进程/采集器同时运行也不会重复领取同一个URL；
+采集器重启时直接从队列继续，超过租约时间未完成的URL自动回到可领取状态
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from url_canonicalizer import url_key
+import json_codec
+
+# 默认队列文件，跟随输出目录保存，跨运行保留
+DEFAULT_FRONTIER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'output', 'url_frontier.db')
+
+# 优先级，数值越小越先领取
+PRIORITY_HOT = 0        # 热门/趋势游戏
+PRIORITY_NEW = 10       # 新发现的游戏
+PRIORITY_REFRESH = 20   # 已采集但过期需要刷新
+PRIORITY_RETRY = 30     # 失败后重试
+
+# 状态
+STATE_PENDING = 'pending'
+STATE_IN_PROGRESS = 'in_progress'
+STATE_DONE = 'done'
+STATE_FAILED = 'failed'
+
+# 默认参数
+DEFAULT_LEASE_SECONDS = 1800   # 领取后多久未完成视为采集器已退出
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_REFRESH_AFTER_SECONDS = 24 * 3600  # 已完成的URL重新发现时，完成超过该时长才重新采集
+RETRY_BACKOFF_SECONDS = 300    # 第n次失败后延迟n*300秒再重试
+
+
+class UrlFrontier:
+    """持久化优先级URL队列
+
+    同一URL在不同队列(如详情提取、可访问性检测)中相互独立，
+    同一队列内以url_key去重(游戏页为站点:slug)
+    """
+
+    def __init__(self, db_path=DEFAULT_FRONTIER_PATH, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        初始化队列
+
+        Args:
+            db_path (str): 队列SQLite文件路径
+            lease_seconds (int): 领取租约时长(秒)，超时未完成的URL可被重新领取
+            max_attempts (int): 最多尝试次数，超过后标记为failed
+        """
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._connect()
+
+    def _connect(self):
+        """获取当前线程的SQLite连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS frontier ("
+                "queue TEXT NOT NULL, url_key TEXT NOT NULL, url TEXT NOT NULL, "
+                "priority INTEGER NOT NULL, state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "added_at REAL NOT NULL, updated_at REAL NOT NULL, available_at REAL NOT NULL, "
+                "claimed_at REAL, claimed_by TEXT, last_error TEXT, payload TEXT, "
+                "PRIMARY KEY (queue, url_key))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_frontier_claim ON frontier (queue, state, priority, added_at)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def add(self, queue, urls, priority=PRIORITY_NEW, payload=None, refresh_after=None):
+        """
+        加入URL；已在队列中且未完成的URL只提升优先级，已完成的URL默认保持不变；
+        按refresh_after重新排队的URL使用刷新优先级，排在从未采集过的URL之后
+
+        Args:
+            queue (str): 队列名
+            urls (iterable): URL列表
+            priority (int): 优先级
+            payload (dict): 附带的数据(如列表页上的游戏名称)
+            refresh_after (float): 已完成或已失败超过该秒数的URL重新发现时以PRIORITY_REFRESH放回队列
+                (重置尝试次数)，None表示不放回
+
+        Returns:
+            int: 新加入和重新排队的URL数量
+        """
+        now = time.time()
+        data = json_codec.dumps(payload) if payload is not None else None
+        rows = [(queue, url_key(url), url, priority, STATE_PENDING, now, now, now, data)
+                for url in urls if url]
+        if not rows:
+            return 0
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO frontier (queue, url_key, url, priority, state, added_at, updated_at, available_at, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (queue, url_key) DO UPDATE SET priority = excluded.priority, updated_at = excluded.updated_at "
+                "WHERE frontier.state = 'pending' AND excluded.priority < frontier.priority",
+                rows
+            )
+            # 在插入之后放回已完成的URL，避免上面的优先级提升把刷新优先级改回新URL的优先级
+            refreshed = 0
+            if refresh_after is not None:
+                refreshed = conn.executemany(
+                    "UPDATE frontier SET state = 'pending', priority = ?, attempts = 0, available_at = ?, "
+                    "updated_at = ?, claimed_at = NULL, last_error = NULL "
+                    "WHERE queue = ? AND url_key = ? AND state IN ('done', 'failed') AND updated_at < ?",
+                    [(max(priority, PRIORITY_REFRESH), now, now, queue, row[1], now - refresh_after) for row in rows]
+                ).rowcount
+            # 新插入的行added_at等于本次时间戳，已有行保持原值
+            added = conn.execute(
+                "SELECT COUNT(*) FROM frontier WHERE queue = ? AND added_at = ?", (queue, now)
+            ).fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return added + refreshed
+
+    def claim(self, queue, worker, limit=1):
+        """
+        原子领取优先级最高的可领取URL
+
+        Args:
+            queue (str): 队列名
+            worker (str): 领取者标识，用于排查
+            limit (int): 最多领取数量
+
+        Returns:
+            list: [{'url', 'priority', 'attempts', 'payload'}]，队列为空时为空列表
+        """
+        now = time.time()
+        conn = self._connect()
+        # BEGIN IMMEDIATE立即取得写锁，查询和更新之间不会被其他进程插入领取
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT url_key, url, priority, attempts, payload FROM frontier "
+                "WHERE queue = ? AND ((state = 'pending' AND available_at <= ?) "
+                "OR (state = 'in_progress' AND claimed_at < ?)) "
+                "ORDER BY priority, added_at LIMIT ?",
+                (queue, now, now - self.lease_seconds, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE frontier SET state = 'in_progress', claimed_at = ?, claimed_by = ?, updated_at = ? "
+                "WHERE queue = ? AND url_key = ?",
+                [(now, worker, now, queue, row[0]) for row in rows]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [{'url': row[1], 'priority': row[2], 'attempts': row[3],
+                 'payload': json_codec.loads(row[4]) if row[4] else None} for row in rows]
+
+    def complete(self, queue, url):
+        """标记URL采集完成"""
+        now = time.time()
+        self._connect().execute(
+            "UPDATE frontier SET state = 'done', attempts = attempts + 1, updated_at = ?, last_error = NULL "
+            "WHERE queue = ? AND url_key = ?",
+            (now, queue, url_key(url))
+        )
+
+    def fail(self, queue, url, error=None):
+        """
+        记录一次失败：未超过最大尝试次数时以重试优先级延迟回到队列，否则标记为failed
+
+        Returns:
+            str: 失败后的状态
+        """
+        now = time.time()
+        key = url_key(url)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT attempts FROM frontier WHERE queue = ? AND url_key = ?", (queue, key)
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            state = STATE_FAILED if attempts >= self.max_attempts else STATE_PENDING
+            conn.execute(
+                "UPDATE frontier SET state = ?, attempts = ?, priority = ?, available_at = ?, "
+                "updated_at = ?, last_error = ?, claimed_at = NULL WHERE queue = ? AND url_key = ?",
+                (state, attempts, PRIORITY_RETRY, now + attempts * RETRY_BACKOFF_SECONDS,
+                 now, str(error)[:500] if error else None, queue, key)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return state
+
+    def release(self, queue, url):
+        """放回未处理的URL(如采集器提前退出)，不计尝试次数"""
+        self._connect().execute(
+            "UPDATE frontier SET state = 'pending', claimed_at = NULL, updated_at = ? "
+            "WHERE queue = ? AND url_key = ? AND state = 'in_progress'",
+            (time.time(), queue, url_key(url))
+        )
+
+    def schedule_refresh(self, queue, older_than_seconds):
+        """
+        把完成时间早于指定时长的URL重新放回队列
+
+        Returns:
+            int: 重新排队的URL数量
+        """
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE frontier SET state = 'pending', priority = ?, available_at = ?, updated_at = ? "
+            "WHERE queue = ? AND state = 'done' AND updated_at < ?",
+            (PRIORITY_REFRESH, now, now, queue, now - older_than_seconds)
+        )
+        return cursor.rowcount
+
+    def is_done(self, queue, url):
+        """URL是否已在该队列中完成"""
+        row = self._connect().execute(
+            "SELECT state FROM frontier WHERE queue = ? AND url_key = ?", (queue, url_key(url))
+        ).fetchone()
+        return row is not None and row[0] == STATE_DONE
+
+    def pending_count(self, queue):
+        """可领取(含租约过期)的URL数量"""
+        now = time.time()
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM frontier WHERE queue = ? AND ((state = 'pending' AND available_at <= ?) "
+            "OR (state = 'in_progress' AND claimed_at < ?))",
+            (queue, now, now - self.lease_seconds)
+        ).fetchone()[0]
+
+    def get_stats(self, queue):
+        """
+        队列各状态的URL数量
+
+        Returns:
+            dict: {state: count}
+        """
+        rows = self._connect().execute(
+            "SELECT state, COUNT(*) FROM frontier WHERE queue = ? GROUP BY state", (queue,)
+        ).fetchall()
+        return {state: count for state, count in rows}
+
+
+_shared_frontier = None
+_shared_lock = threading.Lock()
+
+
+def get_url_frontier():
+    """
+    获取进程内共享的URL队列
+
+    Returns:
+        UrlFrontier: 共享队列
+    """
+    global _shared_frontier
+    with _shared_lock:
+        if _shared_frontier is None:
+            _shared_frontier = UrlFrontier()
+        return _shared_frontier
+
+
+def worker_id(name):
+    """生成领取者标识：采集器名-进程号"""
+    return f"{name}-{os.getpid()}"